@@ -0,0 +1,26 @@
+"""Add users.tokens_revoked_before
+
+Revision ID: b4e8f2a61c07
+Revises: 9c41d2e7a3b5
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e8f2a61c07'
+down_revision: Union[str, None] = '9c41d2e7a3b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('tokens_revoked_before', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'tokens_revoked_before')
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from app.api.business_card.dependencies import get_business_card_service
 from app.api.users.implementations import PasswordChangeAPI
 from app.api.users.dependencies import (
@@ -12,7 +12,7 @@ from app.api.users.dependencies import (
     get_user_service,
 )
 from app.schemas.users import PasswordChangeRequest, UserCreate, UserLogin, ActivationCodeConfirm, TokenRefresh, UserProfileResponse
-from app.core.security import JWTAuth, jwt_bearer, verify_api_key
+from app.core.security import JWTAuth, jwt_bearer
 from fastapi_jwt import JwtAuthorizationCredentials
 from app.core.security import JWTAuth
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -23,6 +23,7 @@ from app.services.user_service import UserService
 from app.core.database import get_db
 from app.schemas.business_card import BusinessCardCreate, BusinessCardResponse
 from app.services.business_card.abstract_business_card_service import AbstractBusinessCardService
+from app.services.business_card.card_cache import etag_matches
 
 def get_business_card_router() -> APIRouter:
     router = APIRouter()
@@ -32,7 +33,6 @@ def get_business_card_router() -> APIRouter:
     @router.post(
         "/business-card/create",
         response_model=BusinessCardResponse,
-        dependencies=[Depends(verify_api_key)]
     )
     async def create_or_update_business_card(
         data: BusinessCardCreate,
@@ -46,7 +46,6 @@ def get_business_card_router() -> APIRouter:
     @router.get(
         "/business-card/view",
         response_model=BusinessCardResponse,
-        dependencies=[Depends(verify_api_key)]
     )
     async def get_business_card(
         credentials: JwtAuthorizationCredentials = Depends(jwt_bearer),
@@ -54,7 +53,10 @@ def get_business_card_router() -> APIRouter:
         jwt_auth: JWTAuth = Depends(get_jwt_auth_service),
     ):
         user_id = jwt_auth.extract_user_id(credentials)
-        return await service.get_card(user_id)
+        card = await service.get_card(user_id)
+        if card is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business card not found")
+        return card
 
 
 
@@ -64,9 +66,17 @@ def get_business_card_router() -> APIRouter:
     )
     async def get_card_by_subdomain(
         subdomain: str,
+        request: Request,
         service: AbstractBusinessCardService = Depends(get_business_card_service),
     ):
-        return await service.get_card_by_subdomain(subdomain)
+        # Готовое JSON-тело из кэша отдаётся без повторной сериализации
+        card = await service.get_public_card(subdomain)
+        if card is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business card not found")
+        headers = {"ETag": card.etag, "Cache-Control": "public, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), card.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=card.body, media_type="application/json", headers=headers)
 
     return router
 
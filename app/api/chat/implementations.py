@@ -1,6 +1,6 @@
 from app.api.chat.abstract_apis import AbstractChatAPI
 from app.services.chat_service.abstract_chat_service import AbstractChatService  # Импортируем абстрактный класс
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class ChatAPI(AbstractChatAPI):
     def __init__(self, chat_service: AbstractChatService):  # Используем абстрактный класс
@@ -28,10 +28,15 @@ class ChatAPI(AbstractChatAPI):
         """
         return await self.chat_service.add_message(chat_id, sender_id, message)
 
-    async def get_chat_messages(self, chat_id: str) -> List[Dict]:
+    async def get_chat_messages(
+        self, chat_id: str, before: Optional[str] = None, after: Optional[str] = None, limit: int = 50
+    ) -> Dict:
         """
-        Получение всех сообщений из чата.
+        Получение страницы сообщений из чата.
         :param chat_id: Идентификатор чата.
-        :return: Список сообщений.
+        :param before: Курсор для сообщений старше указанного.
+        :param after: Курсор для сообщений новее указанного.
+        :param limit: Размер страницы.
+        :return: Страница сообщений с курсорами.
         """
-        return await self.chat_service.get_messages(chat_id)
\ No newline at end of file
+        return await self.chat_service.get_messages(chat_id, before=before, after=after, limit=limit)
\ No newline at end of file
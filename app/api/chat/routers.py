@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.services.chat_service import ChatService
-from typing import List, Dict, Union
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from app.services.chat_service import ChatService, ChatNotFoundError, ChatAccessDeniedError
+from app.services.chat_service.message_service import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from typing import List, Dict, Optional, Union
 from pydantic import BaseModel
 from app.core.security import JWTAuth
 
@@ -76,41 +79,56 @@ def get_chat_router() -> APIRouter:
         Отправить сообщение в указанный чат.
         """
         try:
-            chat = await chat_service.get_chat(chat_id)
-            if not chat or current_user_id not in chat["participants"]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You do not have permission to send messages in this chat.",
-                )
-
-            return await chat_service.add_message(chat_id, request.sender_id, request.message)
-        except HTTPException as e:
-            raise e
+            return await chat_service.add_message(
+                chat_id, request.sender_id, request.message, user_id=current_user_id
+            )
+        except ChatNotFoundError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e),
+            )
+        except ChatAccessDeniedError:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have permission to send messages in this chat.",
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error sending message.",
             )
 
-    @router.post("/chats/{chat_id}/messages/view/", response_model=List[Dict], status_code=status.HTTP_200_OK)
+    @router.post("/chats/{chat_id}/messages/view/", response_model=Dict, status_code=status.HTTP_200_OK)
     async def get_chat_messages(
         chat_id: str,
+        before: Optional[str] = Query(None, description="Курсор: сообщения старше указанного message_id."),
+        after: Optional[str] = Query(None, description="Курсор: сообщения новее указанного message_id."),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
         current_user_id: int = Depends(jwt_auth.get_current_user_id),
         chat_service: ChatService = Depends(),
     ):
         """
-        Получить сообщения из указанного чата. Только для участников.
+        Получить страницу сообщений из указанного чата. Только для участников.
+        Без курсоров возвращаются последние сообщения.
         """
         try:
-            chat = await chat_service.get_chat(chat_id)
-            if not chat or current_user_id not in chat["participants"]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Access to this chat is denied.",
-                )
-            return await chat_service.get_messages(chat_id)
-        except HTTPException as e:
-            raise e
+            await chat_service.check_membership(chat_id, current_user_id)
+            return await chat_service.get_messages(chat_id, before=before, after=after, limit=limit)
+        except (ChatNotFoundError, ChatAccessDeniedError):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access to this chat is denied.",
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -160,6 +178,46 @@ def get_chat_router() -> APIRouter:
                 detail="Could not fetch user chats.",
             )
 
+    @router.websocket("/ws/chats/{chat_id}")
+    async def chat_websocket(
+        websocket: WebSocket,
+        chat_id: str,
+        token: Optional[str] = Query(None),
+        chat_service: ChatService = Depends(),
+    ):
+        """
+        WebSocket-канал чата: участники получают новые сообщения сразу после отправки
+        и могут отправлять сообщения тем же соединением (JSON вида {"message": "..."}).
+        Токен передаётся в query-параметре token или в заголовке Authorization.
+        """
+        authorization = websocket.headers.get("authorization", "")
+        if not token and authorization.lower().startswith("bearer "):
+            token = authorization[7:]
+        try:
+            if not token:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credentials are not provided")
+            current_user_id = jwt_auth.get_user_id_from_token(token)
+            await chat_service.check_membership(chat_id, current_user_id)
+        except Exception as e:
+            logger.warning(f"Отклонено WebSocket-подключение к чату {chat_id}: {e}")
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
+        await websocket.accept()
+        await chat_service.broadcaster.connect(chat_id, websocket)
+        try:
+            while True:
+                data = await websocket.receive_text()
+                try:
+                    message = json.loads(data).get("message", "")
+                    await chat_service.add_message(chat_id, current_user_id, message, user_id=current_user_id)
+                except (ValueError, AttributeError) as e:
+                    await websocket.send_text(json.dumps({"type": "error", "detail": str(e)}))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await chat_service.broadcaster.disconnect(chat_id, websocket)
+
     return router
 
 
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from app.schemas.users import PasswordChangeRequest, UserCreate, UserLogin, ActivationCodeConfirm, TokenRefresh, UserProfileResponse
+from typing import AsyncIterator
+from app.schemas.users import PasswordChangeRequest, UserCreate, UserLogin, ActivationCodeConfirm, TokenRefresh, UserProfileResponse, SessionsRevokeRequest
 
 
 class AbstractRegisterAPI(ABC):
@@ -26,6 +27,22 @@ class AbstractTokenAPI(ABC):
         raise NotImplementedError
 
 
+class AbstractSessionAdminAPI(ABC):
+    @abstractmethod
+    async def revoke_sessions(self, data: SessionsRevokeRequest) -> dict:
+        raise NotImplementedError
+
+
+class AbstractUserBulkAPI(ABC):
+    @abstractmethod
+    async def import_users(self, chunks: AsyncIterator[bytes], fmt: str, send_verification: bool) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def export_users(self, fmt: str) -> AsyncIterator[bytes]:
+        raise NotImplementedError
+
+
 class AbstractProfileAPI(ABC):
     @abstractmethod
     async def get_profile(self, user_id: int) -> UserProfileResponse:
@@ -4,6 +4,7 @@ from fastapi import Depends
 
 from app.services.user_service import AbstractUserService, UserService
 from app.core.database import get_db
+from app.core.db_routing import use_primary
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.users.implementations import (
@@ -12,6 +13,8 @@ from app.api.users.implementations import (
     LoginAPI,
     EmailConfirmAPI,
     TokenAPI,
+    SessionAdminAPI,
+    UserBulkAPI,
     ProfileAPI,
 )
 from app.core.security import AbstractUserStatusChecker, JWTAuth, UserStatusChecker
@@ -19,6 +22,9 @@ from app.services.profile_service import AbstractProfileService
 from app.services.token_service import AbstractTokenService
 from app.services.profile_service import ProfileService
 from app.services.token_service import TokenService
+from app.services.token_store import create_token_store
+from app.services.user_bulk_service import UserBulkService
+from app.crud.users.user_crud import UserCRUD
 
 
 
@@ -37,16 +43,22 @@ def get_user_status_checker() -> UserStatusChecker:
 def get_user_service(db: AsyncSession = Depends(get_db)) -> AbstractUserService:
     return UserService(db=db)
 
+
+def get_primary_user_service(db: AsyncSession = Depends(get_db)) -> AbstractUserService:
+    # Регистрация и коды подтверждения проверяют строку и сразу меняют её — только основная база
+    use_primary(db)
+    return UserService(db=db)
+
 def get_profile_service(db: AsyncSession = Depends(get_db)) -> AbstractProfileService:
     return ProfileService(db=db)
 
 
-def get_token_service() -> AbstractTokenService:
-    return TokenService()
+def get_token_service(db: AsyncSession = Depends(get_db)) -> AbstractTokenService:
+    return TokenService(token_store=create_token_store(db), user_crud=UserCRUD(db))
 
 
 
-def get_register_api(service: AbstractUserService = Depends(get_user_service)) -> RegisterAPI:
+def get_register_api(service: AbstractUserService = Depends(get_primary_user_service)) -> RegisterAPI:
     return RegisterAPI(service=service)
 
 
@@ -54,7 +66,7 @@ def get_login_api(service: AbstractUserService = Depends(get_user_service)) -> L
     return LoginAPI(service=service)
 
 
-def get_email_confirm_api(service: AbstractUserService = Depends(get_user_service)) -> EmailConfirmAPI:
+def get_email_confirm_api(service: AbstractUserService = Depends(get_primary_user_service)) -> EmailConfirmAPI:
     return EmailConfirmAPI(service=service)
 
 
@@ -63,6 +75,14 @@ def get_token_api(service: AbstractTokenService = Depends(get_token_service)) ->
     return TokenAPI(service=service)
 
 
+def get_session_admin_api(service: AbstractTokenService = Depends(get_token_service)) -> SessionAdminAPI:
+    return SessionAdminAPI(service=service)
+
+
+def get_user_bulk_api(db: AsyncSession = Depends(get_db)) -> UserBulkAPI:
+    return UserBulkAPI(service=UserBulkService(db=db))
+
+
 
 
 
@@ -3,6 +3,7 @@ from fastapi_jwt import JwtAuthorizationCredentials
 from app.services.user_service import AbstractUserService
 from app.services.profile_service import AbstractProfileService
 from app.services.token_service import AbstractTokenService
+from app.services.user_bulk_service import AbstractUserBulkService, check_format, export_users_stream
 from app.schemas.users import (
     PasswordChangeRequest,
     UserCreate,
@@ -10,16 +11,21 @@ from app.schemas.users import (
     ActivationCodeConfirm,
     TokenRefresh,
     UserProfileResponse,
+    SessionsRevokeRequest,
 )
 from app.api.users.abstract_apis import (
     AbstractRegisterAPI,
     AbstractLoginAPI,
     AbstractEmailConfirmAPI,
     AbstractTokenAPI,
+    AbstractSessionAdminAPI,
+    AbstractUserBulkAPI,
     AbstractProfileAPI,
     AbstractPasswordChangeAPI,
 )
 from app.core.security import JWTAuth
+from app.core.auth_context import AuthContext
+from typing import AsyncIterator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -59,6 +65,35 @@ class TokenAPI(AbstractTokenAPI):
         return await self.service.refresh_token(refresh)
 
 
+class SessionAdminAPI(AbstractSessionAdminAPI):
+    def __init__(self, service: AbstractTokenService):
+        self.service = service
+
+    async def revoke_sessions(self, data: SessionsRevokeRequest) -> dict:
+        """Отзыв всех сессий пользователей"""
+        return await self.service.revoke_sessions(data.user_ids)
+
+
+class UserBulkAPI(AbstractUserBulkAPI):
+    def __init__(self, service: AbstractUserBulkService):
+        self.service = service
+
+    async def import_users(self, chunks: AsyncIterator[bytes], fmt: str, send_verification: bool) -> dict:
+        """Массовый импорт пользователей из тела запроса"""
+        try:
+            return await self.service.import_users(chunks, fmt, send_verification=send_verification)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def export_users(self, fmt: str) -> AsyncIterator[bytes]:
+        """Потоковый экспорт пользователей"""
+        try:
+            check_format(fmt)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return export_users_stream(fmt)
+
+
 class ProfileAPI(AbstractProfileAPI):
     def __init__(self, service: AbstractProfileService, jwt_auth: JWTAuth, user_status_checker):
         self.service = service
@@ -69,7 +104,7 @@ class ProfileAPI(AbstractProfileAPI):
         """Получение профиля пользователя"""
         user_id = self.jwt_auth.extract_user_id(credentials)
         # Проверка активности пользователя
-        await self.user_status_checker.check_user_active(user_id, db)
+        await self.user_status_checker.check_user_active(user_id, db, AuthContext.from_credentials(credentials))
         return await self.service.get_profile(user_id)
 
 
@@ -78,8 +113,10 @@ class PasswordChangeAPI(AbstractPasswordChangeAPI):
         self.service = service
         self.user_status_checker = user_status_checker
 
-    async def change_password(self, user_id: int, data: PasswordChangeRequest, db: AsyncSession) -> dict:
+    async def change_password(
+        self, user_id: int, data: PasswordChangeRequest, db: AsyncSession, auth: Optional[AuthContext] = None
+    ) -> dict:
         """Смена пароля пользователя"""
         # Проверка активности пользователя
-        await self.user_status_checker.check_user_active(user_id, db)
+        await self.user_status_checker.check_user_active(user_id, db, auth)
         return await self.service.change_password(user_id=user_id, data=data)
\ No newline at end of file
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from app.api.users.implementations import PasswordChangeAPI
 from app.api.users.dependencies import (
     get_jwt_auth_service,
@@ -8,12 +9,15 @@ from app.api.users.dependencies import (
     get_email_confirm_api,
     get_token_api,
     get_profile_api,
-    get_user_service,
+    get_primary_user_service,
+    get_session_admin_api,
+    get_user_bulk_api,
 )
-from app.schemas.users import PasswordChangeRequest, UserCreate, UserLogin, ActivationCodeConfirm, TokenRefresh, UserProfileResponse
-from app.core.security import JWTAuth, jwt_bearer, verify_api_key
+from app.schemas.users import PasswordChangeRequest, UserCreate, UserLogin, ActivationCodeConfirm, TokenRefresh, UserProfileResponse, SessionsRevokeRequest
+from app.core.security import JWTAuth, jwt_bearer, verify_api_key, api_key_registry
 from fastapi_jwt import JwtAuthorizationCredentials
 from app.core.security import JWTAuth
+from app.core.auth_context import AuthContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -98,6 +102,85 @@ def get_user_router() -> APIRouter:
             logger.error(f"Ошибка обновления токена: {e}")
             raise e
 
+    @router.post(
+        "/admin/sessions/revoke",
+        response_model=dict,
+    )
+    async def revoke_sessions(
+        data: SessionsRevokeRequest,
+        admin: AuthContext = Depends(jwt_auth.require_roles("admin")),
+        service=Depends(get_session_admin_api),
+    ):
+        logger.info(f"Администратор ID: {admin.user_id} отзывает сессии {len(data.user_ids)} пользователей")
+        try:
+            response = await service.revoke_sessions(data)
+            logger.info(f"Сессии {len(data.user_ids)} пользователей отозваны")
+            return response
+        except Exception as e:
+            logger.error(f"Ошибка отзыва сессий: {e}")
+            raise e
+
+    @router.post(
+        "/admin/users/import",
+        response_model=dict,
+    )
+    async def import_users(
+        request: Request,
+        format: str = "csv",
+        send_verification: bool = True,
+        admin: AuthContext = Depends(jwt_auth.require_roles("admin")),
+        service=Depends(get_user_bulk_api),
+    ):
+        """
+        Тело запроса — файл CSV (с заголовком) или NDJSON, читается потоком.
+        """
+        logger.info(f"Администратор ID: {admin.user_id} импортирует пользователей ({format})")
+        try:
+            response = await service.import_users(request.stream(), format, send_verification)
+            logger.info(f"Импорт пользователей завершён: создано {response['created']}")
+            return response
+        except Exception as e:
+            logger.error(f"Ошибка импорта пользователей: {e}")
+            raise e
+
+    @router.get(
+        "/admin/users/export",
+    )
+    async def export_users(
+        format: str = "csv",
+        admin: AuthContext = Depends(jwt_auth.require_roles("admin")),
+        service=Depends(get_user_bulk_api),
+    ):
+        logger.info(f"Администратор ID: {admin.user_id} экспортирует пользователей ({format})")
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+        return StreamingResponse(
+            service.export_users(format),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+        )
+
+    @router.get(
+        "/admin/api-keys",
+        response_model=dict,
+    )
+    async def api_key_stats(admin: AuthContext = Depends(jwt_auth.require_roles("admin"))):
+        return api_key_registry.stats()
+
+    @router.post(
+        "/admin/api-keys/reload",
+        response_model=dict,
+    )
+    async def reload_api_keys(admin: AuthContext = Depends(jwt_auth.require_roles("admin"))):
+        logger.info(f"Администратор ID: {admin.user_id} перезагружает API-ключи")
+        try:
+            return {"keys": api_key_registry.reload()}
+        except Exception as e:
+            logger.error(f"Ошибка перезагрузки API-ключей: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not reload API keys: {e}",
+            )
+
     @router.get(
         "/profile",
         response_model=UserProfileResponse,
@@ -132,7 +215,9 @@ def get_user_router() -> APIRouter:
         user_id = jwt_auth.extract_user_id(credentials)
         logger.info(f"Смена пароля для пользователя ID: {user_id}")
         try:
-            response = await service.change_password(user_id=user_id, data=data, db=db)
+            response = await service.change_password(
+                user_id=user_id, data=data, db=db, auth=AuthContext.from_credentials(credentials)
+            )
             logger.info(f"Пароль пользователя ID: {user_id} успешно изменен")
             return response
         except Exception as e:
@@ -142,7 +227,7 @@ def get_user_router() -> APIRouter:
     @router.post("/send-verification-code")
     async def send_verification_code(
         email: str,
-        user_service: UserService = Depends(get_user_service)
+        user_service: UserService = Depends(get_primary_user_service)
     ):
         logger.info(f"Отправка кода верификации на email: {email}")
         try:
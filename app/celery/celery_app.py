@@ -1,5 +1,9 @@
+from typing import Iterable
+
 from celery import Celery
-from app.core.config import BROKER_URL, BACKEND_URL
+from celery.signals import celeryd_init
+from kombu import Queue
+from app.core.config import BROKER_URL, BACKEND_URL, CELERY_BULK_EMAIL_RATE_LIMIT, CELERY_QUEUE_CONCURRENCY
 
 
 celery_app = Celery(
@@ -8,13 +12,76 @@ celery_app = Celery(
     backend=BACKEND_URL,
 )
 
+# Очереди в порядке приоритета: воркер, слушающий несколько очередей,
+# сначала разбирает коды подтверждения, затем остальные уведомления и т. д.
+QUEUE_AUTH = "auth"
+QUEUE_NOTIFICATIONS = "notifications"
+QUEUE_BULK = "bulk"
+QUEUE_MAINTENANCE = "maintenance"
+QUEUE_DEFAULT = "default"
+QUEUES = (QUEUE_AUTH, QUEUE_NOTIFICATIONS, QUEUE_BULK, QUEUE_MAINTENANCE, QUEUE_DEFAULT)
 
+# Приоритет сообщений внутри очереди. Брокер — Redis: kombu раскладывает сообщения
+# по подочередям с шагами priority_steps и разбирает их начиная с 0, то есть
+# меньше — срочнее (в отличие от AMQP). Сообщение без приоритета попадает в 0,
+# поэтому для обычных задач приоритет задаётся явно.
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 6
 
+celery_app.conf.task_queues = [Queue(name) for name in QUEUES]
+celery_app.conf.task_default_queue = QUEUE_DEFAULT
+celery_app.conf.task_default_priority = PRIORITY_NORMAL
+# Redis: очереди опрашиваются в порядке -Q, а не по кругу
+celery_app.conf.broker_transport_options = {"queue_order_strategy": "priority", "priority_steps": [0, 3, 6, 9]}
+# Долгая задача не держит заранее полученные сообщения из срочных очередей
+celery_app.conf.worker_prefetch_multiplier = 1
 
 # Настройка маршрутов задач
 celery_app.conf.task_routes = {
-    "tasks.*": {"queue": "default"},
+    "app.celery.celery_tasks.send_verification_email_task": {"queue": QUEUE_AUTH, "priority": PRIORITY_URGENT},
+    "app.celery.celery_tasks.send_email_batch_task": {"queue": QUEUE_BULK},
+    "tasks.*": {"queue": QUEUE_DEFAULT},
+}
+
+# Лимиты задач: rate_limit действует на каждый экземпляр воркера
+celery_app.conf.task_annotations = {
+    "app.celery.celery_tasks.send_verification_email_task": {"soft_time_limit": 15, "time_limit": 30},
+    "app.celery.celery_tasks.send_email_batch_task": {
+        "rate_limit": CELERY_BULK_EMAIL_RATE_LIMIT,
+        "soft_time_limit": 120,
+        "time_limit": 150,
+    },
+    "app.celery.celery_tasks.flush_email_outbox_task": {"soft_time_limit": 120, "time_limit": 150},
 }
 
+
+def parse_queue_concurrency(value: str = CELERY_QUEUE_CONCURRENCY) -> dict:
+    concurrency = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        queue, _, size = item.partition("=")
+        concurrency[queue.strip()] = int(size)
+    return concurrency
+
+
+def worker_concurrency_for(queues: Iterable[str], value: str = CELERY_QUEUE_CONCURRENCY) -> int:
+    """
+    Размер пула воркера — сумма размеров, заданных для его очередей.
+    """
+    sizes = parse_queue_concurrency(value)
+    return sum(sizes.get(queue, 1) for queue in queues)
+
+
+@celeryd_init.connect
+def configure_worker_concurrency(sender=None, conf=None, options=None, **kwargs):
+    # Явный --concurrency важнее настройки по очередям
+    if not options or options.get("concurrency"):
+        return
+    queues = options.get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    if queues:
+        conf.worker_concurrency = worker_concurrency_for(queues)
+
+
 # Автоматический поиск задач
-celery_app.autodiscover_tasks(["app.celery.celery_tasks"])
\ No newline at end of file
+celery_app.autodiscover_tasks(["app.celery.celery_tasks"])
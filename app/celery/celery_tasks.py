@@ -1,12 +1,36 @@
 from celery import shared_task
-from app.notifications.notification_sender_service import EmailNotificationSender
-import asyncio
+from app.celery.worker_runtime import get_email_sender, run_async
+from app.core.config import MAIL_MAX_RETRIES, MAIL_RETRY_BACKOFF, MAIL_RETRY_BACKOFF_MAX
+from app.notifications.email_outbox import EMAIL_OUTBOXES
+from app.notifications.notification_sender_service import EmailRejectedError
 
-@shared_task
+# Ошибки доставки (SMTP недоступен, разрыв соединения) повторяются с экспоненциальной
+# задержкой MAIL_RETRY_BACKOFF * 2^n, но не больше MAIL_RETRY_BACKOFF_MAX, со случайным разбросом
+EMAIL_RETRY_OPTIONS = {
+    "autoretry_for": (Exception,),
+    "dont_autoretry_for": (EmailRejectedError,),
+    "retry_backoff": MAIL_RETRY_BACKOFF,
+    "retry_backoff_max": MAIL_RETRY_BACKOFF_MAX,
+    "retry_jitter": True,
+    "max_retries": MAIL_MAX_RETRIES,
+}
+
+
+@shared_task(**EMAIL_RETRY_OPTIONS)
 def send_verification_email_task(recipients: list, subject: str, body: str, subtype: str = "plain"):
-    email_sender = EmailNotificationSender()
+    # Постоянный loop и пул SMTP-соединений процесса вместо asyncio.run и нового соединения на письмо
+    run_async(get_email_sender().send(recipients, subject, body, subtype))
+
+
+@shared_task(**EMAIL_RETRY_OPTIONS)
+def send_email_batch_task(messages: list, name: str = "bulk"):
+    result = run_async(get_email_sender().send_many(messages))
+    # Письма с временной ошибкой SMTP повторяются отдельно, чтобы не отправлять пачку заново
+    EMAIL_OUTBOXES[name].defer(result.pop("deferred"))
+    return result
 
-    async def send_email():
-        await email_sender.send(recipients, subject, body, subtype)
 
-    asyncio.run(send_email())
\ No newline at end of file
+@shared_task(**EMAIL_RETRY_OPTIONS)
+def flush_email_outbox_task(name: str = "auth"):
+    # Неотправленная пачка возвращается в очередь писем до повтора
+    return run_async(EMAIL_OUTBOXES[name].flush(get_email_sender()))
@@ -0,0 +1,54 @@
+import asyncio
+import os
+from typing import Optional
+
+from celery.signals import worker_process_shutdown
+
+from app.notifications.notification_sender_service import PooledEmailNotificationSender
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+# Состояние процесса воркера: prefork создаёт его заново в каждом дочернем процессе
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_email_sender: Optional[PooledEmailNotificationSender] = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """
+    Постоянный event loop процесса воркера. В отличие от asyncio.run на каждую
+    задачу, он сохраняет SMTP-соединения и клиент Redis между задачами.
+    """
+    global _loop, _loop_pid, _email_sender
+    if _loop is None or _loop_pid != os.getpid():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+        _loop_pid = os.getpid()
+        _email_sender = None
+    return _loop
+
+
+def run_async(coro):
+    return get_worker_loop().run_until_complete(coro)
+
+
+def get_email_sender() -> PooledEmailNotificationSender:
+    global _email_sender
+    get_worker_loop()
+    if _email_sender is None:
+        _email_sender = PooledEmailNotificationSender()
+    return _email_sender
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_runtime(**kwargs) -> None:
+    global _loop, _email_sender
+    if _loop is None or _loop_pid != os.getpid():
+        return
+    if _email_sender is not None:
+        logger.info(f"Закрытие SMTP-пула воркера: {_email_sender.pool.stats()}")
+        _loop.run_until_complete(_email_sender.close())
+        _email_sender = None
+    _loop.close()
+    _loop = None
@@ -0,0 +1,56 @@
+"""
+Проверка и применение индексов MongoDB из реестра app.core.mongo_indexes.
+
+    python -m app.cli.indexes check          # код выхода 1, если индексы отсутствуют или отличаются
+    python -m app.cli.indexes apply
+    python -m app.cli.indexes check --target logs
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Dict
+
+from app.core.database import mongodb
+from app.core.mongo_indexes import CHAT_INDEXES, apply_indexes, check_indexes, log_indexes
+from app.logs.logger import Logger
+
+INDEX_TARGETS = ("chat", "logs")
+
+
+async def run(command: str, targets) -> Dict[str, Dict]:
+    registry = {"chat": lambda: (mongodb.db, CHAT_INDEXES), "logs": lambda: (Logger.database(), log_indexes())}
+    action = check_indexes if command == "check" else apply_indexes
+    reports = {}
+    for target in targets:
+        db, specs = registry[target]()
+        reports[target] = await action(db, specs)
+    return reports
+
+
+def is_consistent(reports: Dict[str, Dict]) -> bool:
+    return not any(report.get("missing") or report.get("outdated") or report.get("conflicts") for report in reports.values())
+
+
+async def main(args: argparse.Namespace) -> int:
+    targets = [args.target] if args.target else INDEX_TARGETS
+    if "chat" in targets:
+        await mongodb.connect()
+    try:
+        reports = await run(args.command, targets)
+    finally:
+        await mongodb.disconnect()
+        await Logger.shutdown()
+    print(json.dumps(reports, ensure_ascii=False, indent=2, default=str))
+    return 0 if is_consistent(reports) else 1
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Индексы коллекций MongoDB")
+    parser.add_argument("command", choices=("check", "apply"), help="check — только сравнить, apply — создать недостающие")
+    parser.add_argument("--target", choices=INDEX_TARGETS, help="По умолчанию — все базы")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,79 @@
+"""
+Массовый импорт и экспорт пользователей из командной строки.
+
+    python -m app.cli.users import staff.csv
+    python -m app.cli.users import staff.ndjson --no-verification --batch-size 1000
+    python -m app.cli.users export users.csv
+    python -m app.cli.users export - --format ndjson > users.ndjson
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import AsyncIterator, Optional
+
+from app.core.config import USER_IMPORT_BATCH_SIZE
+from app.core.database import SessionLocal, engine
+from app.services.user_bulk_service import USER_BULK_FORMATS, UserBulkService, export_users_stream
+from app.services.password_service import password_hash_service
+
+READ_CHUNK_SIZE = 1 << 16
+
+
+def detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    return "ndjson" if extension in ("ndjson", "jsonl") else "csv"
+
+
+async def read_chunks(path: str) -> AsyncIterator[bytes]:
+    with (open(path, "rb") if path != "-" else sys.stdin.buffer) as f:
+        while chunk := f.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def run_import(path: str, fmt: str, send_verification: bool, batch_size: int) -> dict:
+    async with SessionLocal() as session:
+        service = UserBulkService(session, import_batch_size=batch_size)
+        return await service.import_users(read_chunks(path), fmt, send_verification=send_verification)
+
+
+async def run_export(path: str, fmt: str) -> None:
+    with (open(path, "wb") if path != "-" else sys.stdout.buffer) as f:
+        async for chunk in export_users_stream(fmt):
+            f.write(chunk)
+
+
+async def main(args: argparse.Namespace) -> None:
+    fmt = detect_format(args.path, args.format)
+    try:
+        if args.command == "import":
+            report = await run_import(args.path, fmt, not args.no_verification, args.batch_size)
+            print(json.dumps(report, ensure_ascii=False, indent=2), file=sys.stderr)
+        else:
+            await run_export(args.path, fmt)
+    finally:
+        password_hash_service.shutdown()
+        await engine.dispose()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Массовый импорт и экспорт пользователей")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Импорт пользователей из CSV или NDJSON")
+    import_parser.add_argument("path", help="Файл для импорта, '-' — stdin")
+    import_parser.add_argument("--format", choices=USER_BULK_FORMATS, help="По умолчанию — по расширению файла")
+    import_parser.add_argument("--batch-size", type=int, default=USER_IMPORT_BATCH_SIZE)
+    import_parser.add_argument("--no-verification", action="store_true", help="Не отправлять письма с кодами активации")
+
+    export_parser = subparsers.add_parser("export", help="Экспорт пользователей в CSV или NDJSON")
+    export_parser.add_argument("path", help="Файл для экспорта, '-' — stdout")
+    export_parser.add_argument("--format", choices=USER_BULK_FORMATS, help="По умолчанию — по расширению файла")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
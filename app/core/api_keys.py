@@ -0,0 +1,156 @@
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import API_KEYS_FILE, API_KEYS_FILE_CHECK_INTERVAL
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+
+class ApiKeyError(ValueError):
+    """Неизвестный ключ"""
+
+
+class ApiKeyRateLimitError(ValueError):
+    """Превышен лимит запросов ключа"""
+
+
+def hash_api_key(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ApiKey:
+    """
+    Клиентский API-ключ: хранится только SHA-256, лимит — запросов в минуту (None — без лимита).
+    """
+
+    def __init__(self, name: str, key_hash: str, rate_limit: Optional[int] = None):
+        self.name = name
+        self.key_hash = key_hash
+        self.rate_limit = rate_limit
+        self.requests = 0
+        self.rejected = 0
+        self._window_start = 0.0
+        self._window_count = 0
+
+    def hit(self, now: float) -> bool:
+        """
+        Учитывает запрос в окне фиксированной длины (60 с); False — лимит исчерпан.
+        """
+        if now - self._window_start >= 60:
+            self._window_start = now
+            self._window_count = 0
+        if self.rate_limit is not None and self._window_count >= self.rate_limit:
+            self.rejected += 1
+            return False
+        self._window_count += 1
+        self.requests += 1
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "rate_limit": self.rate_limit,
+            "requests": self.requests,
+            "rejected": self.rejected,
+        }
+
+
+class ApiKeyRegistry:
+    """
+    Реестр активных API-ключей. Ключи загружаются в словарь по SHA-256, поэтому
+    проверка — один хэш и поиск в словаре, сравнение выполняется за постоянное время.
+
+    Источники: API_KEY (ключ "default"), API_KEYS ("name:key[:limit],...") и
+    JSON-файл API_KEYS_FILE со списком {"name", "key" или "key_sha256", "rate_limit"}.
+    reload() перечитывает источники (переменную API_KEYS — из окружения процесса);
+    счётчики сохранённых ключей не сбрасываются.
+
+    Реестр свой в каждом воркере, поэтому ротация без перезапуска делается через файл:
+    каждый воркер не чаще раза в check_interval секунд сверяет время изменения файла
+    и перечитывает ключи сам. Изменение API_KEYS в окружении доходит только до
+    перезапущенных процессов. Лимиты и счётчики тоже ведутся на каждый воркер.
+    """
+
+    def __init__(
+        self,
+        default_key: str = "",
+        keys: Optional[str] = None,
+        keys_file: Optional[str] = API_KEYS_FILE,
+        check_interval: float = API_KEYS_FILE_CHECK_INTERVAL,
+    ):
+        self.default_key = default_key
+        self.keys = keys
+        self.keys_file = keys_file
+        self.check_interval = check_interval
+        self._by_hash: Dict[str, ApiKey] = {}
+        self._file_version: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self.unknown = 0
+        self.reload()
+
+    def _read_file_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.keys_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_definitions(self) -> List[Dict]:
+        definitions = []
+        if self.default_key:
+            definitions.append({"name": "default", "key": self.default_key})
+        keys = self.keys if self.keys is not None else os.getenv("API_KEYS", "")
+        for item in filter(None, (part.strip() for part in keys.split(","))):
+            name, _, rest = item.partition(":")
+            key, _, limit = rest.partition(":")
+            definitions.append({"name": name, "key": key, "rate_limit": int(limit) if limit else None})
+        if self.keys_file and os.path.exists(self.keys_file):
+            with open(self.keys_file, encoding="utf-8") as f:
+                definitions.extend(json.load(f))
+        return definitions
+
+    def reload(self) -> int:
+        file_version = self._read_file_version() if self.keys_file else None
+        by_hash: Dict[str, ApiKey] = {}
+        for definition in self._read_definitions():
+            key_hash = definition.get("key_sha256") or hash_api_key(definition["key"])
+            api_key = self._by_hash.get(key_hash) or ApiKey(definition["name"], key_hash)
+            api_key.name = definition["name"]
+            api_key.rate_limit = definition.get("rate_limit")
+            by_hash[key_hash] = api_key
+        self._by_hash = by_hash
+        self._file_version = file_version
+        logger.info(f"Загружено API-ключей: {len(by_hash)}")
+        return len(by_hash)
+
+    def _reload_if_file_changed(self, now: float) -> None:
+        if not self.keys_file or now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        if self._read_file_version() == self._file_version:
+            return
+        try:
+            self.reload()
+        except Exception as e:
+            # Файл мог быть прочитан во время записи — остаются прежние ключи, проверка повторится
+            logger.error(f"Не удалось перечитать API-ключи из {self.keys_file}: {e}")
+
+    def authenticate(self, key: str) -> ApiKey:
+        now = time.monotonic()
+        self._reload_if_file_changed(now)
+        key_hash = hash_api_key(key)
+        api_key = self._by_hash.get(key_hash)
+        if api_key is None or not hmac.compare_digest(api_key.key_hash, key_hash):
+            self.unknown += 1
+            raise ApiKeyError("Invalid or missing API key")
+        if not api_key.hit(now):
+            raise ApiKeyRateLimitError(f"Rate limit exceeded for API key '{api_key.name}'")
+        return api_key
+
+    def stats(self) -> Dict:
+        return {"keys": [api_key.stats() for api_key in self._by_hash.values()], "unknown": self.unknown}
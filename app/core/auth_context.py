@@ -0,0 +1,142 @@
+import time
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+from fastapi_jwt import JwtAuthorizationCredentials
+
+from app.core.cache import TTLCache
+from app.core.config import (
+    AUTH_STATUS_CACHE_SIZE,
+    AUTH_STATUS_CACHE_TTL,
+    AUTH_STATUS_CACHE_REDIS,
+    AUTH_STATUS_LOCAL_TTL,
+)
+from app.core.redis import get_redis
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+
+class AuthContext(BaseModel):
+    """
+    Данные пользователя из claims токена. Для токенов, выпущенных до появления
+    is_active/iat, соответствующие поля равны None.
+    """
+    user_id: int
+    roles: List[str] = []
+    is_active: Optional[bool] = None
+    issued_at: Optional[int] = None
+
+    @classmethod
+    def from_subject(cls, subject) -> "AuthContext":
+        if isinstance(subject, dict) and "id" in subject:
+            return cls(
+                user_id=int(subject["id"]),
+                roles=subject.get("roles") or [],
+                is_active=subject.get("is_active"),
+                issued_at=subject.get("iat"),
+            )
+        return cls(user_id=int(subject))
+
+    @classmethod
+    def from_credentials(cls, credentials: JwtAuthorizationCredentials) -> "AuthContext":
+        return cls.from_subject(credentials.subject)
+
+
+class UserStatusCache:
+    """
+    Переопределения статуса пользователей поверх claims токена: смена is_active
+    и момент, до которого выпущенные токены считаются отозванными.
+
+    Записи живут не меньше срока действия refresh-токена. При AUTH_STATUS_CACHE_REDIS
+    статус хранится в хэше Redis, а в процессе кэшируется (в том числе отсутствие
+    записи) на AUTH_STATUS_LOCAL_TTL секунд, чтобы отзыв доходил до всех воркеров.
+
+    get возвращает None, если статус неизвестен (Redis недоступен): тогда
+    is_active и отзыв токенов (users.tokens_revoked_before) проверяются по БД,
+    а не берутся из claims токена.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = AUTH_STATUS_CACHE_SIZE,
+        ttl: float = AUTH_STATUS_CACHE_TTL,
+        use_redis: bool = AUTH_STATUS_CACHE_REDIS,
+        local_ttl: float = AUTH_STATUS_LOCAL_TTL,
+        key_prefix: str = "auth:status:",
+    ):
+        self.local = TTLCache(maxsize=maxsize, ttl=min(ttl, local_ttl) if use_redis else ttl)
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self.key_prefix = key_prefix
+
+    async def get(self, user_id: int) -> Optional[Dict]:
+        status = self.local.get(user_id)
+        if status is not None:
+            return status
+        if not self.use_redis:
+            return {}
+        try:
+            raw = await get_redis().hgetall(f"{self.key_prefix}{user_id}")
+        except Exception as e:
+            logger.warning(f"Redis недоступен для кэша статуса пользователя {user_id}: {e}")
+            return None
+        status = {}
+        if "is_active" in raw:
+            status["is_active"] = raw["is_active"] == "1"
+        if "revoked_before" in raw:
+            status["revoked_before"] = int(raw["revoked_before"])
+        self.local.set(user_id, status)
+        return status
+
+    async def set_active(self, user_id: int, is_active: bool) -> None:
+        """
+        Фиксирует актуальный is_active (активация, деактивация или значение из БД).
+        """
+        await self._update([user_id], is_active=is_active)
+
+    async def revoke_tokens(self, user_id: int) -> None:
+        """
+        Отзывает все токены пользователя, выпущенные до текущего момента
+        (включая текущую секунду: iat в токене хранится с точностью до секунды).
+        """
+        await self.revoke_tokens_many([user_id])
+
+    async def revoke_tokens_many(self, user_ids: Iterable[int], revoked_before: Optional[int] = None) -> None:
+        await self._update(list(user_ids), revoked_before=revoked_before or int(time.time()))
+
+    async def _update(self, user_ids: List[int], **changes) -> None:
+        previous = {}
+        for user_id in user_ids:
+            if self.use_redis:
+                # Объединение со старыми полями выполняет Redis (HSET)
+                previous[user_id] = self.local.get(user_id)
+                self.local.pop(user_id)
+            else:
+                self.local.set(user_id, {**(self.local.get(user_id) or {}), **changes})
+        if not self.use_redis:
+            return
+        mapping = {key: int(value) for key, value in changes.items()}
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    key = f"{self.key_prefix}{user_id}"
+                    pipe.hset(key, mapping=mapping)
+                    pipe.expire(key, int(self.ttl))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить статус {len(user_ids)} пользователей в Redis: {e}")
+            for user_id in user_ids:
+                self.local.set(user_id, {**(previous[user_id] or {}), **changes})
+
+    @staticmethod
+    def is_revoked(status: Optional[Dict], auth: AuthContext) -> bool:
+        if not status or "revoked_before" not in status or auth.issued_at is None:
+            return False
+        return auth.issued_at <= status["revoked_before"]
+
+    def stats(self) -> Dict:
+        return {**self.local.stats(), "redis_enabled": self.use_redis}
+
+
+user_status_cache = UserStatusCache()
@@ -16,20 +16,84 @@ app = FastAPI(
 # Celery
 BROKER_URL = os.getenv("CELERY_BROKER_URL")
 BACKEND_URL = os.getenv("CELERY_BACKEND_URL")
+# Размер пула воркера для каждой очереди ("queue=N,..."); воркер с -Q a,b получает сумму
+CELERY_QUEUE_CONCURRENCY = os.getenv("CELERY_QUEUE_CONCURRENCY", "auth=4,notifications=4,bulk=2,maintenance=1,default=2")
+CELERY_BULK_EMAIL_RATE_LIMIT = os.getenv("CELERY_BULK_EMAIL_RATE_LIMIT", "60/m")
+
+# Redis (кэши, pub/sub между воркерами)
+# Пустое значение (REDIS_URL= в docker-compose) означает «не задан»
+REDIS_URL = os.getenv("REDIS_URL") or BROKER_URL
 
 SECRET_KEY = os.getenv("SECRET_KEY")
+# Дополнительные API-ключи клиентов: API_KEYS="name:key[:limit_per_minute],..." (читается
+# в ApiKeyRegistry.reload) и/или JSON-файл
+API_KEYS_FILE = os.getenv("API_KEYS_FILE")
+# Как часто каждый воркер проверяет время изменения API_KEYS_FILE (с, 0 — при каждом запросе)
+API_KEYS_FILE_CHECK_INTERVAL = float(os.getenv("API_KEYS_FILE_CHECK_INTERVAL", 5))
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS"))
 DATABASE_URL = os.getenv("DATABASE_URL")
 SMS_API_KEY = os.getenv("SMS_API_KEY")
 
+# Кэш проверенных JWT (0 — отключить)
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", 10000))
+
+# Хранилище выданных токенов: "redis" (TTL по сроку жизни токена) или "sql" (таблица tokens)
+TOKEN_STORE_BACKEND = os.getenv("TOKEN_STORE_BACKEND", "redis" if REDIS_URL else "sql")
+
+# Кэш статусов пользователей (деактивация и отзыв токенов) для проверки без запроса к БД
+AUTH_STATUS_CACHE_SIZE = int(os.getenv("AUTH_STATUS_CACHE_SIZE", 100000))
+AUTH_STATUS_CACHE_TTL = int(os.getenv("AUTH_STATUS_CACHE_TTL", REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600))
+# Без Redis отзыв и деактивация видны только своему процессу и теряются при вытеснении и рестарте
+AUTH_STATUS_CACHE_REDIS = os.getenv("AUTH_STATUS_CACHE_REDIS", "true" if REDIS_URL else "false").lower() in ("1", "true", "yes")
+# Время жизни локальной копии при включённом Redis: задержка, с которой воркер увидит отзыв
+AUTH_STATUS_LOCAL_TTL = int(os.getenv("AUTH_STATUS_LOCAL_TTL", 30))
+
+# Хэширование паролей
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # thread или process
+
+# Массовый импорт и экспорт пользователей
+USER_IMPORT_BATCH_SIZE = int(os.getenv("USER_IMPORT_BATCH_SIZE", 500))
+USER_EXPORT_BATCH_SIZE = int(os.getenv("USER_EXPORT_BATCH_SIZE", 1000))
+
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_VERIFY_SERVICE_SID = os.getenv("TWILIO_VERIFY_SERVICE_SID")
 
 CHAT_MONGO_URI = os.getenv("CHAT_MONGO_URI")
 CHAT_DATABASE_NAME = os.getenv("CHAT_DATABASE_NAME")
+CHAT_MESSAGE_BUCKET_SIZE = int(os.getenv("CHAT_MESSAGE_BUCKET_SIZE", 100))
+# Пул соединений и таймауты клиента MongoDB чатов (мс); без таймаутов медленный primary вешает запросы
+CHAT_MONGO_MAX_POOL_SIZE = int(os.getenv("CHAT_MONGO_MAX_POOL_SIZE", 100))
+CHAT_MONGO_MIN_POOL_SIZE = int(os.getenv("CHAT_MONGO_MIN_POOL_SIZE", 0))
+CHAT_MONGO_MAX_IDLE_TIME_MS = int(os.getenv("CHAT_MONGO_MAX_IDLE_TIME_MS", 60000))
+CHAT_MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("CHAT_MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000))
+CHAT_MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("CHAT_MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
+CHAT_MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("CHAT_MONGO_CONNECT_TIMEOUT_MS", 5000))
+CHAT_MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("CHAT_MONGO_SOCKET_TIMEOUT_MS", 10000))
+# Чтение истории сообщений: режим pymongo (primary, primaryPreferred, secondaryPreferred, ...)
+CHAT_MONGO_HISTORY_READ_PREFERENCE = os.getenv("CHAT_MONGO_HISTORY_READ_PREFERENCE", "secondaryPreferred")
+CHAT_MONGO_MAX_STALENESS_SECONDS = int(os.getenv("CHAT_MONGO_MAX_STALENESS_SECONDS", -1))  # -1 — без ограничения
+# Write concern: число узлов или "majority", таймаут подтверждения (мс) и журнал
+CHAT_MONGO_WRITE_CONCERN = os.getenv("CHAT_MONGO_WRITE_CONCERN", "majority")
+CHAT_MONGO_WRITE_TIMEOUT_MS = int(os.getenv("CHAT_MONGO_WRITE_TIMEOUT_MS", 5000))
+CHAT_MONGO_JOURNAL = os.getenv("CHAT_MONGO_JOURNAL", "true").lower() in ("1", "true", "yes")
+# "redis" — рассылка между воркерами через Redis pub/sub, "memory" — только внутри процесса
+CHAT_PUBSUB_BACKEND = os.getenv("CHAT_PUBSUB_BACKEND", "redis" if REDIS_URL else "memory")
+# Кэш участников чатов
+CHAT_MEMBERSHIP_CACHE_SIZE = int(os.getenv("CHAT_MEMBERSHIP_CACHE_SIZE", 10000))
+CHAT_MEMBERSHIP_CACHE_TTL = int(os.getenv("CHAT_MEMBERSHIP_CACHE_TTL", 300))
+CHAT_MEMBERSHIP_CACHE_REDIS = os.getenv("CHAT_MEMBERSHIP_CACHE_REDIS", "false").lower() in ("1", "true", "yes")
+
+# Кэш публичных бизнес-карточек по поддомену: LRU процесса + Redis
+BUSINESS_CARD_CACHE_SIZE = int(os.getenv("BUSINESS_CARD_CACHE_SIZE", 10000))
+BUSINESS_CARD_CACHE_TTL = int(os.getenv("BUSINESS_CARD_CACHE_TTL", 600))
+BUSINESS_CARD_CACHE_REDIS = os.getenv("BUSINESS_CARD_CACHE_REDIS", "true" if REDIS_URL else "false").lower() in ("1", "true", "yes")
+# Время жизни копии в процессе при включённом Redis: задержка, с которой воркер увидит изменение карточки
+BUSINESS_CARD_CACHE_LOCAL_TTL = int(os.getenv("BUSINESS_CARD_CACHE_LOCAL_TTL", 10))
 
 # Конфигурация почтового сервера
 MAIL_USERNAME = os.getenv("MAIL_USERNAME")
@@ -40,6 +104,18 @@ MAIL_SERVER = os.getenv("MAIL_SERVER")
 MAIL_STARTTLS = True
 MAIL_SSL_TLS = False
 USE_CREDENTIALS = True
+# Пул SMTP-соединений воркера и пакетная отправка писем из очереди в Redis
+MAIL_POOL_SIZE = int(os.getenv("MAIL_POOL_SIZE", 2))
+MAIL_POOL_MAX_IDLE = int(os.getenv("MAIL_POOL_MAX_IDLE", 60))
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", 50))
+MAIL_BATCH_DELAY = float(os.getenv("MAIL_BATCH_DELAY", 1))
+MAIL_AUTH_BATCH_DELAY = float(os.getenv("MAIL_AUTH_BATCH_DELAY", 0))
+# Повторная отправка писем при ошибках: экспоненциальная задержка (с), её предел и число попыток
+MAIL_RETRY_BACKOFF = int(os.getenv("MAIL_RETRY_BACKOFF", 5))
+MAIL_RETRY_BACKOFF_MAX = int(os.getenv("MAIL_RETRY_BACKOFF_MAX", 600))
+MAIL_MAX_RETRIES = int(os.getenv("MAIL_MAX_RETRIES", 8))
+# Окно, в течение которого повторный запрос кода подтверждения не отправляет новое письмо (с)
+VERIFICATION_RESEND_WINDOW = int(os.getenv("VERIFICATION_RESEND_WINDOW", 60))
 
 conf = ConnectionConfig(
     MAIL_USERNAME=MAIL_USERNAME,
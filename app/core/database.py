@@ -1,6 +1,29 @@
+import time
+
+from pymongo import WriteConcern
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from .config import DATABASE_URL, CHAT_MONGO_URI, CHAT_DATABASE_NAME
+from .config import (
+    CHAT_MONGO_URI,
+    CHAT_DATABASE_NAME,
+    CHAT_MONGO_MAX_POOL_SIZE,
+    CHAT_MONGO_MIN_POOL_SIZE,
+    CHAT_MONGO_MAX_IDLE_TIME_MS,
+    CHAT_MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    CHAT_MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    CHAT_MONGO_CONNECT_TIMEOUT_MS,
+    CHAT_MONGO_SOCKET_TIMEOUT_MS,
+    CHAT_MONGO_HISTORY_READ_PREFERENCE,
+    CHAT_MONGO_MAX_STALENESS_SECONDS,
+    CHAT_MONGO_WRITE_CONCERN,
+    CHAT_MONGO_WRITE_TIMEOUT_MS,
+    CHAT_MONGO_JOURNAL,
+)
+from .db_config import DatabaseConfig
+from .db_routing import ReplicaSet, RoutingSession
+from .mongo_monitoring import MongoPoolMetrics
 import os
 
 
@@ -14,16 +37,36 @@ from app.logs.logger import Logger
 
 logger = Logger.setup_logger()
 
-# Создаем асинхронный движок
-engine = create_async_engine(DATABASE_URL, echo=True)
+db_config = DatabaseConfig()
 
-# Создаем фабрику сессий
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+# Создаем асинхронный движок
+engine = create_async_engine(db_config.DATABASE_URL, **db_config.engine_kwargs())
+
+# Реплики для чтения (DB_REPLICA_URLS)
+replicas = ReplicaSet(
+    [create_async_engine(url, **db_config.engine_kwargs(url)) for url in db_config.replica_urls],
+    retry_after=db_config.DB_REPLICA_RETRY_AFTER,
+    sticky_seconds=db_config.DB_REPLICA_STICKY_SECONDS,
+)
+
+# Создаем фабрику сессий; с репликами чтения маршрутизирует RoutingSession
+if replicas:
+    SessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        primary=engine,
+        replicas=replicas,
+    )
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
 
 # Базовый класс для моделей
 Base = declarative_base()
 
-# Асинхронная функция для получения сессии
+# Асинхронная функция для получения сессии. FastAPI кэширует зависимость в пределах запроса:
+# все Depends(get_db) одного запроса получают одну сессию (и один UserLoader, см. app.crud.users.user_loader)
 async def get_db():
     async with SessionLocal() as session:
         yield session
@@ -33,35 +76,141 @@ async def connect():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+# Проверка готовности основной базы
+async def ping_database() -> dict:
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return {"ready": True}
+    except Exception as e:
+        return {"ready": False, "error": str(e)}
+
 # Отключение от базы данных
 async def disconnect():
     await engine.dispose()
+    for replica in replicas.engines:
+        await replica.dispose()
+
+# Загрузка пула соединений
+def _engine_pool_stats(engine) -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=db_config.DB_MAX_OVERFLOW,
+        )
+        capacity = stats["size"] + stats["max_overflow"]
+        stats["utilization"] = round(stats["checked_out"] / capacity, 3) if capacity else 0.0
+    return stats
+
 
+def get_pool_stats() -> dict:
+    stats = _engine_pool_stats(engine)
+    if replicas:
+        stats["replicas"] = [
+            {**replica_stats, **_engine_pool_stats(replica)}
+            for replica, replica_stats in zip(replicas.engines, replicas.stats())
+        ]
+    return stats
 
 
 
 
 
-# MongoDB
+# MongoDB (чаты)
+_READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
 
-# MongoDB
-# MongoDB настройки
 class MongoDB:
+    """
+    Клиент MongoDB чатов с ограниченным пулом, таймаутами и настраиваемым write concern.
+
+    db — основная база (чтение с primary); history_db — та же база с read preference
+    CHAT_MONGO_HISTORY_READ_PREFERENCE для чтения истории сообщений.
+    """
+
     def __init__(self):
         self.client = None
         self.db = None
+        self._history_db = None
         self.uri = CHAT_MONGO_URI
         self.database_name = CHAT_DATABASE_NAME
+        self.pool_metrics = MongoPoolMetrics()
+
+    @property
+    def history_db(self):
+        return self._history_db if self._history_db is not None else self.db
+
+    def client_options(self) -> dict:
+        return {
+            "maxPoolSize": CHAT_MONGO_MAX_POOL_SIZE,
+            "minPoolSize": CHAT_MONGO_MIN_POOL_SIZE,
+            "maxIdleTimeMS": CHAT_MONGO_MAX_IDLE_TIME_MS,
+            "waitQueueTimeoutMS": CHAT_MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": CHAT_MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "connectTimeoutMS": CHAT_MONGO_CONNECT_TIMEOUT_MS,
+            "socketTimeoutMS": CHAT_MONGO_SOCKET_TIMEOUT_MS,
+            "event_listeners": [self.pool_metrics],
+        }
+
+    @staticmethod
+    def write_concern() -> WriteConcern:
+        w = CHAT_MONGO_WRITE_CONCERN
+        return WriteConcern(w=int(w) if w.isdigit() else w, wtimeout=CHAT_MONGO_WRITE_TIMEOUT_MS, j=CHAT_MONGO_JOURNAL)
+
+    @staticmethod
+    def history_read_preference():
+        mode = _READ_PREFERENCES.get(CHAT_MONGO_HISTORY_READ_PREFERENCE)
+        if mode is None:
+            raise ValueError(f"Unknown read preference: {CHAT_MONGO_HISTORY_READ_PREFERENCE}")
+        return mode() if mode is Primary else mode(max_staleness=CHAT_MONGO_MAX_STALENESS_SECONDS)
 
     async def connect(self):
         try:
-            self.client = AsyncIOMotorClient(self.uri)
-            self.db = self.client[self.database_name]
-            logger.info("Connected to MongoDB")
+            self.client = AsyncIOMotorClient(self.uri, **self.client_options())
+            self.db = self.client.get_database(self.database_name, write_concern=self.write_concern())
+            self._history_db = self.db.with_options(read_preference=self.history_read_preference())
+            # Недоступный кластер обнаруживается при старте, а не на первом запросе пользователя
+            latency = await self.ping()
+            logger.info(f"Connected to MongoDB (ping {latency} ms)")
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise e
 
+    async def ping(self) -> float:
+        """
+        Команда ping к кластеру; возвращает задержку в миллисекундах.
+        """
+        started = time.monotonic()
+        await self.client.admin.command("ping")
+        return round((time.monotonic() - started) * 1000, 2)
+
+    async def readiness(self) -> dict:
+        if self.client is None:
+            return {"ready": False, "error": "MongoDB connection is not initialized."}
+        try:
+            return {"ready": True, "latency_ms": await self.ping()}
+        except Exception as e:
+            return {"ready": False, "error": str(e)}
+
+    def stats(self) -> dict:
+        return {
+            "pool": self.pool_metrics.stats(),
+            "max_pool_size": CHAT_MONGO_MAX_POOL_SIZE,
+            "history_read_preference": CHAT_MONGO_HISTORY_READ_PREFERENCE,
+            "write_concern": self.write_concern().document,
+        }
+
     async def disconnect(self):
         if self.client:
             self.client.close()
@@ -0,0 +1,75 @@
+from typing import List, Optional
+
+from pydantic_settings import BaseSettings
+from pydantic import Field
+
+
+class DatabaseConfig(BaseSettings):
+    DATABASE_URL: str = Field(..., env="DATABASE_URL", description="URL подключения SQLAlchemy")
+    DB_ECHO: bool = Field(False, env="DB_ECHO", description="Логировать все SQL-запросы (только для отладки)")
+    DB_POOL_SIZE: int = Field(10, env="DB_POOL_SIZE", description="Постоянных соединений в пуле")
+    DB_MAX_OVERFLOW: int = Field(20, env="DB_MAX_OVERFLOW", description="Дополнительных соединений сверх pool_size")
+    DB_POOL_TIMEOUT: float = Field(30.0, env="DB_POOL_TIMEOUT", description="Ожидание свободного соединения, секунды")
+    DB_POOL_RECYCLE: int = Field(1800, env="DB_POOL_RECYCLE", description="Пересоздавать соединения старше N секунд")
+    DB_POOL_PRE_PING: bool = Field(True, env="DB_POOL_PRE_PING", description="Проверять соединение перед выдачей из пула")
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = Field(
+        None, env="DB_STATEMENT_TIMEOUT_MS", description="statement_timeout PostgreSQL, миллисекунды"
+    )
+    DB_PREPARED_STATEMENT_CACHE_SIZE: Optional[int] = Field(
+        None,
+        env="DB_PREPARED_STATEMENT_CACHE_SIZE",
+        description="Размер кэша подготовленных запросов asyncpg (0 — отключить, нужно за pgbouncer)",
+    )
+    # Реплики для чтения: список URL через запятую; пусто — всё идёт в основную базу
+    DB_REPLICA_URLS: str = Field("", env="DB_REPLICA_URLS", description="URL реплик для чтения через запятую")
+    DB_REPLICA_STICKY_SECONDS: float = Field(
+        5.0, env="DB_REPLICA_STICKY_SECONDS", description="Сколько секунд после записи чтения клиента идут в основную базу"
+    )
+    DB_REPLICA_RETRY_AFTER: float = Field(
+        10.0, env="DB_REPLICA_RETRY_AFTER", description="Через сколько секунд снова пробовать недоступную реплику"
+    )
+
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "allow"  # Игнор лишних переменных
+
+    @property
+    def is_sqlite(self) -> bool:
+        return self.DATABASE_URL.startswith("sqlite")
+
+    @property
+    def is_asyncpg(self) -> bool:
+        return self.DATABASE_URL.startswith("postgresql+asyncpg")
+
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
+    def engine_kwargs(self, url: Optional[str] = None) -> dict:
+        """
+        Параметры для create_async_engine (по умолчанию для DATABASE_URL, иначе для url реплики).
+        SQLite не использует QueuePool, поэтому настройки пула для него не передаются.
+        """
+        url = url or self.DATABASE_URL
+        kwargs = {"echo": self.DB_ECHO}
+        if url.startswith("sqlite"):
+            return kwargs
+
+        kwargs.update(
+            pool_size=self.DB_POOL_SIZE,
+            max_overflow=self.DB_MAX_OVERFLOW,
+            pool_timeout=self.DB_POOL_TIMEOUT,
+            pool_recycle=self.DB_POOL_RECYCLE,
+            pool_pre_ping=self.DB_POOL_PRE_PING,
+        )
+
+        if url.startswith("postgresql+asyncpg"):
+            connect_args = {}
+            if self.DB_STATEMENT_TIMEOUT_MS is not None:
+                connect_args["server_settings"] = {"statement_timeout": str(self.DB_STATEMENT_TIMEOUT_MS)}
+            if self.DB_PREPARED_STATEMENT_CACHE_SIZE is not None:
+                connect_args["prepared_statement_cache_size"] = self.DB_PREPARED_STATEMENT_CACHE_SIZE
+            if connect_args:
+                kwargs["connect_args"] = connect_args
+        return kwargs
@@ -0,0 +1,155 @@
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+# Клиент текущего запроса (обычно пользователь из JWT) для read-your-writes между запросами
+_read_your_writes_key: ContextVar[Optional[str]] = ContextVar("db_read_your_writes_key", default=None)
+
+_USE_PRIMARY = "db_use_primary"
+
+
+def set_read_your_writes_key(key: Optional[str]) -> None:
+    _read_your_writes_key.set(key)
+
+
+def use_primary(session) -> None:
+    """
+    Все запросы сессии идут в основную базу. Для потоков без JWT, которые читают
+    строку и сразу меняют её по результату (регистрация, коды подтверждения):
+    read-your-writes по клиенту для них не работает, а отстающая реплика даёт
+    дубликат при вставке или устаревший код.
+    """
+    session.info[_USE_PRIMARY] = True
+
+
+class ReplicaSet:
+    """
+    Реплики для чтения с пассивной проверкой доступности.
+
+    Реплика, на которой произошёл обрыв соединения или ошибка подключения,
+    исключается из выбора на retry_after секунд. Клиенты, писавшие в базу,
+    sticky_seconds читают из основной базы, пока реплики догоняют изменения.
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine], retry_after: float = 10.0, sticky_seconds: float = 5.0, maxsize: int = 100000):
+        self.engines: List[AsyncEngine] = list(engines)
+        self.retry_after = retry_after
+        self.recent_writers = TTLCache(maxsize=maxsize, ttl=sticky_seconds)
+        self._unhealthy_until: Dict[Engine, float] = {}
+        self._counter = itertools.count()
+        for engine in self.engines:
+            event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def is_healthy(self, engine: Engine) -> bool:
+        return self._unhealthy_until.get(engine, 0.0) <= time.monotonic()
+
+    def choose(self) -> Optional[Engine]:
+        """
+        Следующая доступная реплика по кругу; None — доступных нет.
+        """
+        if not self.engines:
+            return None
+        start = next(self._counter)
+        for offset in range(len(self.engines)):
+            engine = self.engines[(start + offset) % len(self.engines)].sync_engine
+            if self.is_healthy(engine):
+                return engine
+        return None
+
+    def mark_unhealthy(self, engine: Engine) -> None:
+        self._unhealthy_until[engine] = time.monotonic() + self.retry_after
+        logger.warning(f"Реплика {engine.url!r} недоступна, чтения идут в основную базу {self.retry_after} с")
+
+    def _on_error(self, context) -> None:
+        # Ошибки подключения приходят без connection; обрыв — с is_disconnect
+        if context.is_disconnect or context.connection is None:
+            self.mark_unhealthy(context.engine)
+
+    def note_write(self, key: Optional[str]) -> None:
+        if key is not None:
+            self.recent_writers.set(key, True)
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        return key is not None and self.recent_writers.get(key, False)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {"url": engine.url.render_as_string(hide_password=True), "healthy": self.is_healthy(engine.sync_engine)}
+            for engine in self.engines
+        ]
+
+
+def _is_read(clause: Any) -> bool:
+    statement = getattr(clause, "_resolved", clause)
+    return bool(getattr(statement, "is_select", False)) and getattr(statement, "_for_update_arg", None) is None
+
+
+class RoutingSession(Session):
+    """
+    Session, отправляющая SELECT на реплику, а запись — в основную базу.
+
+    Реплика выбирается один раз на сессию. После первой записи сессия до конца
+    читает из основной базы; клиент запроса (см. set_read_your_writes_key)
+    остаётся на основной базе ещё sticky_seconds и в следующих запросах.
+    SELECT ... FOR UPDATE, текстовые запросы и flush всегда идут в основную базу.
+
+    Чтение, упавшее на реплике из-за обрыва или ошибки подключения, повторяется
+    в основной базе, и сессия до конца читает из неё (см. также use_primary).
+    """
+
+    def __init__(self, primary: AsyncEngine, replicas: ReplicaSet, **kwargs):
+        super().__init__(**kwargs)
+        self.primary = primary.sync_engine
+        self.replicas = replicas
+        self._replica: Optional[Engine] = None
+        self._wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs) -> Engine:
+        if self._flushing or getattr(clause, "is_dml", False):
+            self._wrote = True
+            self.replicas.note_write(_read_your_writes_key.get())
+            return self.primary
+        if self._wrote or self.info.get(_USE_PRIMARY) or not _is_read(clause):
+            return self.primary
+        if self.replicas.is_sticky(_read_your_writes_key.get()):
+            return self.primary
+        if self._replica is None or not self.replicas.is_healthy(self._replica):
+            self._replica = self.replicas.choose()
+        return self._replica or self.primary
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _retry_read_on_primary(orm_execute_state) -> Any:
+    # Через событие проходят execute, scalar(s), get и ленивые загрузки
+    session = orm_execute_state.session
+    try:
+        return orm_execute_state.invoke_statement()
+    except DBAPIError:
+        # Реплика помечается недоступной в ReplicaSet._on_error только при обрыве и ошибке подключения.
+        # Rollback отбросил бы несохранённые объекты, поэтому при них ошибка отдаётся вызывающему
+        replica = session._replica
+        if replica is None or session.replicas.is_healthy(replica) or session.new or session.dirty or session.deleted:
+            raise
+        # Инвалидированное соединение реплики не должно остаться в транзакции сессии:
+        # иначе commit и rollback упадут с PendingRollbackError. Записей в транзакции нет,
+        # иначе чтение шло бы в основную базу
+        session.rollback()
+        session._replica = None
+        use_primary(session)
+        logger.warning(f"Чтение с реплики {replica.url!r} не удалось, повтор в основной базе")
+        return orm_execute_state.invoke_statement()
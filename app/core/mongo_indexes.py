@@ -0,0 +1,126 @@
+"""
+Реестр индексов коллекций MongoDB.
+
+Индексы описываются декларативно и применяются идемпотентно при старте
+приложения (app.main) и из командной строки (python -m app.cli.indexes).
+"""
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.logs.config import LogConfig
+from app.logs.logger import Logger, config as log_config
+
+logger = Logger.setup_logger()
+
+# Параметры индекса, которые сравниваются с уже существующим индексом
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+class IndexSpec(NamedTuple):
+    collection: str
+    keys: Tuple[Tuple[str, int], ...]
+    options: Dict = {}
+
+    @property
+    def model(self) -> IndexModel:
+        return IndexModel(list(self.keys), **self.options)
+
+    @property
+    def name(self) -> str:
+        return self.model.document["name"]
+
+
+CHAT_INDEXES: Tuple[IndexSpec, ...] = (
+    # Список чатов пользователя: {"participants": user_id} (multikey по массиву участников)
+    IndexSpec("chats", (("participants", ASCENDING),)),
+    # Единственный открытый бакет чата: open_chat_id есть только у бакета, в который идёт запись
+    IndexSpec("message_buckets", (("open_chat_id", ASCENDING),), {"unique": True, "sparse": True}),
+    # История чата: бакеты по времени последнего сообщения (last_id — ObjectId, упорядочен по времени)
+    IndexSpec("message_buckets", (("chat_id", ASCENDING), ("last_id", DESCENDING))),
+    # Листание истории вперёд (курсор after): бакеты по первому сообщению
+    IndexSpec("message_buckets", (("chat_id", ASCENDING), ("first_id", ASCENDING))),
+    # Поиск пользователя чата по имени
+    IndexSpec("users", (("username", ASCENDING),)),
+)
+
+
+def log_indexes(config: LogConfig = log_config) -> Tuple[IndexSpec, ...]:
+    """
+    Индексы коллекции логов: TTL по timestamp (LOG_TTL_DAYS, 0 — хранить бессрочно).
+    """
+    if config.LOG_TTL_DAYS <= 0:
+        return ()
+    return (
+        IndexSpec(
+            config.COLLECTION_NAME,
+            (("timestamp", ASCENDING),),
+            {"expireAfterSeconds": config.LOG_TTL_DAYS * 24 * 3600},
+        ),
+    )
+
+
+def _differences(spec: IndexSpec, existing: Dict) -> Dict:
+    expected = spec.model.document
+    return {
+        option: {"expected": expected.get(option), "actual": existing.get(option)}
+        for option in _COMPARED_OPTIONS
+        if expected.get(option) != existing.get(option)
+    }
+
+
+async def check_indexes(db, specs: Sequence[IndexSpec]) -> Dict[str, List]:
+    """
+    Сравнивает индексы базы с реестром, ничего не меняя.
+    :return: ok — совпадают, missing — отсутствуют, outdated — отличаются параметрами.
+    """
+    report = {"ok": [], "missing": [], "outdated": []}
+    existing_by_collection: Dict[str, Dict] = {}
+    for spec in specs:
+        if spec.collection not in existing_by_collection:
+            existing_by_collection[spec.collection] = await db[spec.collection].index_information()
+        existing = existing_by_collection[spec.collection].get(spec.name)
+        index = f"{spec.collection}.{spec.name}"
+        if existing is None:
+            report["missing"].append(index)
+        elif _differences(spec, existing):
+            report["outdated"].append({"index": index, "changes": _differences(spec, existing)})
+        else:
+            report["ok"].append(index)
+    return report
+
+
+async def apply_indexes(db, specs: Sequence[IndexSpec]) -> Dict[str, List]:
+    """
+    Создаёт недостающие индексы и обновляет срок TTL существующих (collMod).
+    Индексы, отличающиеся другими параметрами, не пересоздаются автоматически:
+    они попадают в conflicts и требуют ручной миграции.
+    """
+    report = await check_indexes(db, specs)
+    result = {"ok": report["ok"], "created": [], "updated": [], "conflicts": []}
+
+    missing = set(report["missing"])
+    by_collection: Dict[str, List[IndexSpec]] = {}
+    for spec in specs:
+        if f"{spec.collection}.{spec.name}" in missing:
+            by_collection.setdefault(spec.collection, []).append(spec)
+    for collection, collection_specs in by_collection.items():
+        names = await db[collection].create_indexes([spec.model for spec in collection_specs])
+        result["created"].extend(f"{collection}.{name}" for name in names)
+
+    specs_by_index = {f"{spec.collection}.{spec.name}": spec for spec in specs}
+    for outdated in report["outdated"]:
+        spec = specs_by_index[outdated["index"]]
+        if set(outdated["changes"]) == {"expireAfterSeconds"} and "expireAfterSeconds" in spec.options:
+            await db.command({
+                "collMod": spec.collection,
+                "index": {"name": spec.name, "expireAfterSeconds": spec.options["expireAfterSeconds"]},
+            })
+            result["updated"].append(outdated["index"])
+        else:
+            logger.warning(f"Индекс {outdated['index']} отличается от реестра: {outdated['changes']}")
+            result["conflicts"].append(outdated)
+
+    if result["created"] or result["updated"]:
+        logger.info(f"Индексы MongoDB: созданы {result['created']}, обновлены {result['updated']}")
+    return result
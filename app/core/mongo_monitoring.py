@@ -0,0 +1,64 @@
+import threading
+from collections import defaultdict
+from typing import Dict
+
+from pymongo import monitoring
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Счётчики пулов соединений клиента MongoDB по каждому узлу (события CMAP).
+
+    Motor выполняет операции в потоках, поэтому счётчики защищены блокировкой.
+    """
+
+    _COUNTERS = ("open", "checked_out", "created", "closed", "checkout_failed", "cleared")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self._COUNTERS, 0))
+
+    def _add(self, event, **deltas: int) -> None:
+        address = "%s:%s" % event.address
+        with self._lock:
+            counters = self._servers[address]
+            for name, delta in deltas.items():
+                counters[name] += delta
+
+    def pool_created(self, event):
+        self._add(event)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add(event, cleared=1)
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop("%s:%s" % event.address, None)
+
+    def connection_created(self, event):
+        self._add(event, open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(event, open=-1, closed=1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._add(event, checkout_failed=1)
+
+    def connection_checked_out(self, event):
+        self._add(event, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._add(event, checked_out=-1)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {address: dict(counters) for address, counters in self._servers.items()}
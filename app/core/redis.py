@@ -0,0 +1,27 @@
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from .config import REDIS_URL
+
+
+_redis: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """
+    Возвращает общий для процесса асинхронный клиент Redis (создаётся лениво).
+    """
+    global _redis
+    if _redis is None:
+        if not REDIS_URL:
+            raise ValueError("REDIS_URL is not configured.")
+        _redis = Redis.from_url(REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -4,11 +4,18 @@ from fastapi_jwt import JwtAccessBearer
 from abc import ABC, abstractmethod
 from fastapi import HTTPException, status, Depends
 from fastapi_jwt import JwtAuthorizationCredentials
+from fastapi_jwt.jwt_backends.abstract_backend import BackendException
 
 
+from typing import Any, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.users.user_crud import UserCRUD
+from app.crud.users.user_loader import UserLoader
+from app.core.database import get_db
+from app.core.db_routing import set_read_your_writes_key
+from app.core.auth_context import AuthContext, UserStatusCache, user_status_cache
+from app.core.token_cache import VerifiedTokenCache, verified_token_cache
+from app.core.api_keys import ApiKey, ApiKeyRateLimitError, ApiKeyRegistry
 
 
 
@@ -18,12 +25,57 @@ API_KEY = os.getenv("API_KEY", "")
 ALGORITHM = "HS256"
 
 
+class CachedJwtAccessBearer(JwtAccessBearer):
+    """
+    JwtAccessBearer, который проверяет подпись токена один раз и затем берёт
+    payload из кэша до истечения exp. Используется всеми роутерами через jwt_bearer.
+    """
+
+    def __init__(self, *args, token_cache: VerifiedTokenCache = verified_token_cache, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.token_cache = token_cache
+
+    def decode_token(self, token: str) -> Dict[str, Any]:
+        """
+        Проверяет токен (с кэшем); при ошибке выбрасывает BackendException.
+        """
+        return self.token_cache.get_or_decode(token, lambda t: self.jwt_backend.decode(t, self.secret_key))
+
+    async def _get_payload(self, bearer, cookie) -> Optional[Dict[str, Any]]:
+        token = str(bearer.credentials) if bearer else (str(cookie) if cookie else None)
+        if not token:
+            if self.auto_error:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credentials are not provided")
+            return None
+        try:
+            payload = self.decode_token(token)
+        except BackendException as e:
+            if self.auto_error:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+            return None
+        # После записи пользователь некоторое время читает из основной базы, а не с реплики
+        subject = payload.get("subject")
+        user_id = subject.get("id") if isinstance(subject, dict) else subject
+        set_read_your_writes_key(f"user:{user_id}" if user_id is not None else None)
+        return payload
+
+
 # Настройка JWT Bearer
-jwt_bearer = JwtAccessBearer(secret_key=SECRET_KEY)
+jwt_bearer = CachedJwtAccessBearer(secret_key=SECRET_KEY)
+
+# Реестр API-ключей клиентов (API_KEY остаётся ключом "default")
+api_key_registry = ApiKeyRegistry(default_key=API_KEY)
 
 # Функция для проверки API-ключа
-async def verify_api_key(x_api_key: str = Header(...)) -> None:
-    if x_api_key != API_KEY:
+async def verify_api_key(x_api_key: str = Header(...)) -> ApiKey:
+    try:
+        return api_key_registry.authenticate(x_api_key)
+    except ApiKeyRateLimitError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing API key"
@@ -65,13 +117,58 @@ class JWTAuth(AbstractJWTAuth):
         """
         return self.extract_user_id(credentials)
 
+    async def get_auth_context(self, credentials: JwtAuthorizationCredentials = Depends(jwt_bearer)) -> AuthContext:
+        """
+        Получает claims текущего пользователя (id, роли, статус) из токена.
+        """
+        self.extract_user_id(credentials)
+        return AuthContext.from_credentials(credentials)
+
+    def require_roles(self, *roles: str, status_checker: Optional["AbstractUserStatusChecker"] = None):
+        """
+        Зависимость FastAPI: пропускает только пользователей, у которых в токене есть все указанные роли.
+
+        Перед проверкой ролей выполняется проверка статуса (UserStatusChecker): отозванный
+        токен или деактивированный пользователь не сохраняют доступ до истечения токена.
+        """
+        async def dependency(
+            auth: AuthContext = Depends(self.get_auth_context),
+            db: AsyncSession = Depends(get_db),
+        ) -> AuthContext:
+            await (status_checker or UserStatusChecker()).check_user_active(auth.user_id, db, auth)
+            if not set(roles) <= set(auth.roles):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Insufficient permissions"
+                )
+            return auth
+        return dependency
+
+    def get_user_id_from_token(self, token: str) -> int:
+        """
+        Проверяет access-токен вне HTTP-зависимостей (например, для WebSocket) и извлекает user_id.
+        """
+        try:
+            payload = jwt_bearer.decode_token(token)
+        except BackendException as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=str(e)
+            )
+        if not payload or "subject" not in payload:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token payload"
+            )
+        return self.extract_user_id(JwtAuthorizationCredentials(payload["subject"], payload.get("jti")))
+
 
 
 
 
 class AbstractUserStatusChecker(ABC):
     @abstractmethod
-    async def check_user_active(self, user_id: int, db: AsyncSession) -> None:
+    async def check_user_active(self, user_id: int, db: AsyncSession, auth: Optional[AuthContext] = None) -> None:
         """
         Проверяет, активен ли пользователь.
         """
@@ -81,13 +178,43 @@ class AbstractUserStatusChecker(ABC):
 
 
 class UserStatusChecker(AbstractUserStatusChecker):
-    async def check_user_active(self, user_id: int, db: AsyncSession) -> None:
+    def __init__(self, status_cache: UserStatusCache = user_status_cache):
+        self.status_cache = status_cache
+
+    async def check_user_active(self, user_id: int, db: AsyncSession, auth: Optional[AuthContext] = None) -> None:
         """
         Проверяет, активен ли пользователь.
+
+        Сначала учитываются отзыв токенов и смена статуса из кэша, затем claim is_active
+        из токена. К БД обращаемся для старых токенов без claim, неактивных пользователей
+        и когда кэш статусов недоступен; тогда и отзыв проверяется по users.tokens_revoked_before.
         """
-        user_crud = UserCRUD(db)
-        user = await user_crud.get_user_by_id(user_id)
-        if not user or not user.is_active:
+        user_status = await self.status_cache.get(user_id)
+        if auth is not None and self.status_cache.is_revoked(user_status, auth):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+
+        if user_status is not None and "is_active" in user_status:
+            is_active = user_status["is_active"]
+        elif user_status is not None and auth is not None and auth.is_active:
+            is_active = True
+        else:
+            # Строка профиля остаётся в загрузчике сессии и переиспользуется обработчиком запроса
+            user = await UserLoader.for_session(db).load(user_id)
+            if auth is not None and user and self.status_cache.is_revoked(
+                {"revoked_before": user.tokens_revoked_before} if user.tokens_revoked_before else None, auth
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token has been revoked"
+                )
+            is_active = bool(user and user.is_active)
+            if user:
+                await self.status_cache.set_active(user_id, is_active)
+
+        if not is_active:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User account is not active"
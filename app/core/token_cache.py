@@ -0,0 +1,45 @@
+import hashlib
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import JWT_CACHE_SIZE
+
+
+class VerifiedTokenCache:
+    """
+    Кэш проверенных JWT: ключ — SHA-256 токена, значение — payload.
+    Запись живёт до claim exp, поэтому истёкший токен снова проходит полную
+    проверку подписи (и получает ошибку). Токены без exp не кэшируются.
+    """
+
+    def __init__(self, maxsize: int = JWT_CACHE_SIZE):
+        self.enabled = maxsize > 0
+        # Срок жизни задаётся для каждой записи по exp
+        self.local = TTLCache(maxsize=max(maxsize, 1), ttl=0)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get_or_decode(self, token: str, decode: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        if not self.enabled:
+            return decode(token)
+        key = self._key(token)
+        payload: Optional[Dict[str, Any]] = self.local.get(key)
+        if payload is not None:
+            return payload
+        payload = decode(token)
+        exp = payload.get("exp") if payload else None
+        if isinstance(exp, (int, float)):
+            self.local.set(key, payload, ttl=exp - time.time())
+        return payload
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def stats(self) -> Dict:
+        return {**self.local.stats(), "enabled": self.enabled}
+
+
+verified_token_cache = VerifiedTokenCache()
@@ -1,6 +1,5 @@
 # app/crud/business_card/business_card_crud.py
 from app.models.business_card import BusinessCard
-from app.schemas.business_card import BusinessCardCreate
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import Optional
@@ -8,18 +7,12 @@ from typing import Optional
 from app.crud.business_card.abstract_business_card_crud import AbstractBusinessCardCRUD
 
 class BusinessCardCRUD(AbstractBusinessCardCRUD):
-    async def create_or_update_card(self, user_id: int, data: BusinessCardCreate) -> BusinessCard:
-        stmt = select(BusinessCard).where(BusinessCard.user_id == user_id)
-        result = await self.db.execute(stmt)
-        card = result.scalars().first()
-
-        if card:
-            card.title = data.title
-            card.description = data.description
-        else:
-            card = BusinessCard(user_id=user_id, title=data.title, description=data.description, url=f"card/{user_id}")
-            self.db.add(card)
+    def __init__(self, db: AsyncSession):
+        self.db = db
 
+    async def create_card(self, user_id: int, data: dict) -> BusinessCard:
+        card = BusinessCard(user_id=user_id, **data)
+        self.db.add(card)
         await self.db.commit()
         await self.db.refresh(card)
         return card
@@ -27,4 +20,25 @@ class BusinessCardCRUD(AbstractBusinessCardCRUD):
     async def get_card_by_user_id(self, user_id: int) -> Optional[BusinessCard]:
         stmt = select(BusinessCard).where(BusinessCard.user_id == user_id)
         result = await self.db.execute(stmt)
-        return result.scalars().first()
\ No newline at end of file
+        return result.scalars().first()
+
+    async def get_card_by_subdomain(self, subdomain: str) -> Optional[BusinessCard]:
+        stmt = select(BusinessCard).where(BusinessCard.subdomain == subdomain)
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def update_card(self, card_id: int, data: dict) -> Optional[BusinessCard]:
+        card = await self.db.get(BusinessCard, card_id)
+        if card is None:
+            return None
+        for field, value in data.items():
+            setattr(card, field, value)
+        await self.db.commit()
+        await self.db.refresh(card)
+        return card
+
+    async def delete_card(self, card_id: int) -> None:
+        card = await self.db.get(BusinessCard, card_id)
+        if card is not None:
+            await self.db.delete(card)
+            await self.db.commit()
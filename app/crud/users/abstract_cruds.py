@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence
 from app.models.users import User, Token
 from app.schemas.users import UserCreate
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -23,11 +25,63 @@ class AbstractUserCRUD(ABC):
 
 
     @abstractmethod
-    async def save_tokens_to_db(self, user_id: int, access_token: str, refresh_token: str) -> Token:
+    async def get_user_by_email(self, email: str) -> Optional[User]:
         raise NotImplementedError
 
     @abstractmethod
-    async def get_user_by_email(self, email: str) -> Optional[User]:
+    async def get_auth_by_username(self, username: str) -> Optional[Row]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_auth_by_id(self, user_id: int) -> Optional[Row]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_activation_by_username(self, username: str) -> Optional[Row]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_activation_by_email(self, email: str) -> Optional[Row]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_profile_by_id(self, user_id: int) -> Optional[Row]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_users_by_ids(self, user_ids: Iterable[int]) -> Dict[int, Row]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_is_active(self, user_id: int) -> Optional[bool]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def username_exists(self, username: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_activation_code(self, user_id: int, activation_code: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def activate_user(self, user_id: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_password(self, user_id: int, hashed_password: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def revoke_tokens(self, user_ids: Iterable[int], revoked_before: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def bulk_insert_users(self, rows: List[Dict]) -> List[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream_users(self, columns: Sequence[str], batch_size: int) -> AsyncIterator[Dict]:
         raise NotImplementedError
 
 
@@ -35,4 +89,30 @@ class AbstractUserCRUD(ABC):
 class AbstractTokenCRUD(ABC):
     @abstractmethod
     async def save_tokens_to_db(self, user_id: int, access_token: str, refresh_token: str) -> Token:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_tokens(self, user_id: int) -> Optional[Token]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_tokens(self, user_id: int) -> None:
+        raise NotImplementedError
+
+
+class AbstractRefreshTokenCRUD(ABC):
+    @abstractmethod
+    async def create(self, jti: str, family_id: str, user_id: int, expires_at: datetime) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rotate(self, user_id: int, family_id: str, old_jti: str, new_jti: str, expires_at: datetime) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def revoke_family(self, family_id: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def revoke_users(self, user_ids: Iterable[int]) -> int:
+        raise NotImplementedError
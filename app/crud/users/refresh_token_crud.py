@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Iterable
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.users import RefreshToken
+from .abstract_cruds import AbstractRefreshTokenCRUD
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+# Ограничение числа параметров в одном IN (...)
+REVOKE_BATCH_SIZE = 1000
+
+
+class RefreshTokenCRUD(AbstractRefreshTokenCRUD):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, jti: str, family_id: str, user_id: int, expires_at: datetime) -> None:
+        self.db.add(RefreshToken(jti=jti, family_id=family_id, user_id=user_id, expires_at=expires_at))
+        await self.db.commit()
+
+    async def rotate(
+        self, user_id: int, family_id: str, old_jti: str, new_jti: str, expires_at: datetime
+    ) -> bool:
+        now = datetime.utcnow()
+        # Поиск по первичному ключу jti; условие на used_at делает ротацию атомарной
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.jti == old_jti,
+                RefreshToken.family_id == family_id,
+                RefreshToken.user_id == user_id,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(used_at=now)
+        )
+        if result.rowcount != 1:
+            await self.db.rollback()
+            await self.revoke_family(family_id)
+            return False
+        self.db.add(RefreshToken(jti=new_jti, family_id=family_id, user_id=user_id, expires_at=expires_at))
+        await self.db.commit()
+        return True
+
+    async def revoke_family(self, family_id: str) -> None:
+        logger.warning(f"Отзыв семейства refresh-токенов: {family_id}")
+        await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+        )
+        await self.db.commit()
+
+    async def revoke_users(self, user_ids: Iterable[int]) -> int:
+        user_ids = list(user_ids)
+        now = datetime.utcnow()
+        revoked = 0
+        for start in range(0, len(user_ids), REVOKE_BATCH_SIZE):
+            result = await self.db.execute(
+                update(RefreshToken)
+                .where(
+                    RefreshToken.user_id.in_(user_ids[start:start + REVOKE_BATCH_SIZE]),
+                    RefreshToken.revoked_at.is_(None),
+                )
+                .values(revoked_at=now)
+            )
+            revoked += result.rowcount
+        await self.db.commit()
+        logger.info(f"Отозвано refresh-токенов: {revoked} для {len(user_ids)} пользователей")
+        return revoked
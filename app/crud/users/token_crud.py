@@ -1,7 +1,12 @@
+from typing import Optional
+from sqlalchemy import delete
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.users import Token
 from .abstract_cruds import AbstractTokenCRUD
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
 
 
 class TokenCRUD(AbstractTokenCRUD):
@@ -9,9 +14,8 @@ class TokenCRUD(AbstractTokenCRUD):
         self.db = db
 
     async def save_tokens_to_db(self, user_id: int, access_token: str, refresh_token: str) -> Token:
-        stmt = select(Token).filter_by(user_id=user_id)
-        result = await self.db.execute(stmt)
-        token_record = result.scalars().first()
+        logger.info(f"Сохранение токенов для пользователя с ID: {user_id}")
+        token_record = await self.get_tokens(user_id)
 
         if token_record:
             token_record.access_token = access_token
@@ -27,4 +31,13 @@ class TokenCRUD(AbstractTokenCRUD):
         await self.db.commit()
         await self.db.refresh(token_record)
         return token_record
-    
+
+    async def get_tokens(self, user_id: int) -> Optional[Token]:
+        stmt = select(Token).filter_by(user_id=user_id)
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def delete_tokens(self, user_id: int) -> None:
+        logger.info(f"Удаление токенов пользователя с ID: {user_id}")
+        await self.db.execute(delete(Token).where(Token.user_id == user_id))
+        await self.db.commit()
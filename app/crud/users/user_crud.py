@@ -1,15 +1,21 @@
+from sqlalchemy import Row
 from sqlalchemy.future import select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
-from passlib.hash import bcrypt
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence
 from app.models.users import User
 from app.schemas.users import UserCreate
 from .abstract_cruds import AbstractUserCRUD
-from app.models.users import Token
+from . import user_queries
+from .user_loader import UserLoader
+from app.services.password_service import password_hash_service
 from app.logs.logger import Logger  # Импортируем логгер
 
 logger = Logger.setup_logger()  # Инициализация логгера
 
+# Диалекты с поддержкой INSERT ... ON CONFLICT
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
 
 class UserCRUD(AbstractUserCRUD):
     def __init__(self, db: AsyncSession):
@@ -17,9 +23,7 @@ class UserCRUD(AbstractUserCRUD):
 
     async def get_user_by_username(self, username: str) -> Optional[User]:
         logger.info(f"Поиск пользователя с username: {username}")
-        stmt = select(User).where(User.username == username)
-        result = await self.db.execute(stmt)
-        user = result.scalars().first()
+        user = (await self.db.execute(user_queries.user_by_username(username))).scalars().first()
         if user:
             logger.info(f"Пользователь с username: {username} найден")
         else:
@@ -28,18 +32,59 @@ class UserCRUD(AbstractUserCRUD):
 
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
         logger.info(f"Поиск пользователя с ID: {user_id}")
-        stmt = select(User).where(User.id == user_id)
-        result = await self.db.execute(stmt)
-        user = result.scalars().first()
+        user = (await self.db.execute(user_queries.user_by_id(user_id))).scalars().first()
         if user:
             logger.info(f"Пользователь с ID: {user_id} найден")
         else:
             logger.warning(f"Пользователь с ID: {user_id} не найден")
         return user
 
+    async def get_auth_by_username(self, username: str) -> Optional[Row]:
+        """
+        Данные для входа (id, username, hashed_password, is_active, is_admin) без загрузки ORM-объекта.
+        """
+        return (await self.db.execute(user_queries.auth_by_username(username))).first()
+
+    async def get_auth_by_id(self, user_id: int) -> Optional[Row]:
+        return (await self.db.execute(user_queries.auth_by_id(user_id))).first()
+
+    async def get_activation_by_username(self, username: str) -> Optional[Row]:
+        """
+        Данные для подтверждения email (id, email, is_active, activation_code).
+        """
+        return (await self.db.execute(user_queries.activation_by_username(username))).first()
+
+    async def get_activation_by_email(self, email: str) -> Optional[Row]:
+        return (await self.db.execute(user_queries.activation_by_email(email))).first()
+
+    async def get_profile_by_id(self, user_id: int) -> Optional[Row]:
+        """
+        Поля профиля (см. PROFILE_COLUMNS) без хэша пароля и данных устройства.
+        """
+        return (await self.db.execute(user_queries.profile_by_id(user_id))).first()
+
+    async def get_users_by_ids(self, user_ids: Iterable[int]) -> Dict[int, Row]:
+        """
+        Профили нескольких пользователей одним запросом; отсутствующие id в результат не попадают.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
+        rows = (await self.db.execute(user_queries.profiles_by_ids(user_ids))).all()
+        return {row.id: row for row in rows}
+
+    async def get_is_active(self, user_id: int) -> Optional[bool]:
+        """
+        Статус активности пользователя; None, если пользователя нет.
+        """
+        return (await self.db.execute(user_queries.is_active_by_id(user_id))).scalar()
+
+    async def username_exists(self, username: str) -> bool:
+        return (await self.db.execute(user_queries.id_by_username(username))).scalar() is not None
+
     async def create_user(self, user: UserCreate, activation_code: str, is_active: bool = False) -> User:
         logger.info(f"Создание нового пользователя с username: {user.username}")
-        hashed_password = bcrypt.hash(user.password)
+        hashed_password = await password_hash_service.hash(user.password)
         db_user = User(
             username=user.username,
             email=user.email,
@@ -50,6 +95,7 @@ class UserCRUD(AbstractUserCRUD):
         )
         self.db.add(db_user)
         await self.db.commit()
+        UserLoader.clear_session(self.db)
         await self.db.refresh(db_user)
         logger.info(f"Пользователь с username: {user.username} успешно создан")
         return db_user
@@ -58,40 +104,81 @@ class UserCRUD(AbstractUserCRUD):
         logger.info(f"Обновление данных пользователя с ID: {user.id}")
         self.db.add(user)
         await self.db.commit()
+        UserLoader.clear_session(self.db)
         await self.db.refresh(user)
         logger.info(f"Данные пользователя с ID: {user.id} успешно обновлены")
 
-    async def save_tokens_to_db(self, user_id: int, access_token: str, refresh_token: str) -> Token:
-        logger.info(f"Сохранение токенов для пользователя с ID: {user_id}")
-        stmt = select(Token).filter_by(user_id=user_id)
-        result = await self.db.execute(stmt)
-        token_record = result.scalars().first()
-
-        if token_record:
-            logger.info(f"Обновление токенов для пользователя с ID: {user_id}")
-            token_record.access_token = access_token
-            token_record.refresh_token = refresh_token
-        else:
-            logger.info(f"Создание новых токенов для пользователя с ID: {user_id}")
-            token_record = Token(
-                user_id=user_id,
-                access_token=access_token,
-                refresh_token=refresh_token
-            )
-            self.db.add(token_record)
-
-        await self.db.commit()
-        await self.db.refresh(token_record)
-        logger.info(f"Токены для пользователя с ID: {user_id} успешно сохранены")
-        return token_record
-
     async def get_user_by_email(self, email: str) -> Optional[User]:
         logger.info(f"Поиск пользователя с email: {email}")
-        stmt = select(User).where(User.email == email)
-        result = await self.db.execute(stmt)
-        user = result.scalars().first()
+        user = (await self.db.execute(user_queries.user_by_email(email))).scalars().first()
         if user:
             logger.info(f"Пользователь с email: {email} найден")
         else:
             logger.warning(f"Пользователь с email: {email} не найден")
-        return user
\ No newline at end of file
+        return user
+
+    async def set_activation_code(self, user_id: int, activation_code: str) -> None:
+        await self.db.execute(user_queries.set_activation_code(user_id, activation_code))
+        await self.db.commit()
+        UserLoader.clear_session(self.db)
+
+    async def activate_user(self, user_id: int) -> None:
+        await self.db.execute(user_queries.activate(user_id))
+        await self.db.commit()
+        UserLoader.clear_session(self.db)
+        logger.info(f"Пользователь с ID: {user_id} активирован")
+
+    async def update_password(self, user_id: int, hashed_password: str) -> None:
+        await self.db.execute(user_queries.set_password(user_id, hashed_password))
+        await self.db.commit()
+        UserLoader.clear_session(self.db)
+        logger.info(f"Пароль пользователя с ID: {user_id} обновлён")
+
+    async def revoke_tokens(self, user_ids: Iterable[int], revoked_before: int) -> None:
+        """
+        Сохраняет в БД момент отзыва токенов: по нему проверяется отзыв, когда кэш статусов недоступен.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return
+        await self.db.execute(user_queries.revoke_tokens(user_ids, revoked_before))
+        await self.db.commit()
+        UserLoader.clear_session(self.db)
+        logger.info(f"Отозваны токены {len(user_ids)} пользователей")
+
+    async def bulk_insert_users(self, rows: List[Dict]) -> List[Dict]:
+        """
+        Вставляет пачку пользователей одним INSERT ... ON CONFLICT DO NOTHING.
+        Строки, конфликтующие по username, email или телефону, пропускаются;
+        возвращаются только вставленные.
+        """
+        if not rows:
+            return []
+        dialect = self.db.get_bind().dialect.name
+        if dialect not in _UPSERT_INSERTS:
+            raise ValueError(f"Bulk insert is not supported for dialect: {dialect}")
+        stmt = (
+            _UPSERT_INSERTS[dialect](User)
+            .values(rows)
+            .on_conflict_do_nothing()
+            .returning(User.id, User.username, User.email, User.activation_code)
+        )
+        result = await self.db.execute(stmt)
+        inserted = [dict(row) for row in result.mappings()]
+        await self.db.commit()
+        UserLoader.clear_session(self.db)
+        logger.info(f"Массовая вставка пользователей: {len(inserted)} из {len(rows)}")
+        return inserted
+
+    async def stream_users(self, columns: Sequence[str], batch_size: int) -> AsyncIterator[Dict]:
+        """
+        Читает пользователей серверным курсором порциями по batch_size строк.
+        """
+        stmt = (
+            select(*(getattr(User, column) for column in columns))
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(stmt)
+        async for row in result.mappings():
+            yield dict(row)
@@ -0,0 +1,150 @@
+import asyncio
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+from sqlalchemy import Row, StatementLambdaElement
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import user_queries
+
+# Поля, по которым загружаются профили, и запросы для пачки значений
+_BATCH_QUERIES: Dict[str, Callable[[List], StatementLambdaElement]] = {
+    "id": user_queries.profiles_by_ids,
+    "username": user_queries.profiles_by_usernames,
+    "email": user_queries.profiles_by_emails,
+}
+
+_SESSION_KEY = "user_loader"
+
+
+class UserLoader:
+    """
+    Загрузчик профилей пользователей в рамках одного запроса (одной AsyncSession).
+
+    Запросы по id, username и email, сделанные в одной итерации event loop,
+    объединяются в один SELECT ... IN на каждое поле; повторные запросы того же
+    пользователя отдаются из карты уже загруженных строк без обращения к БД.
+    Возвращаются строки с колонками PROFILE_COLUMNS (включая is_active).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._loaded: Dict[str, Dict[Hashable, "asyncio.Future[Optional[Row]]"]] = {field: {} for field in _BATCH_QUERIES}
+        self._pending: Dict[str, List[Hashable]] = {field: [] for field in _BATCH_QUERIES}
+        self._dispatch: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.queries = 0
+
+    @classmethod
+    def for_session(cls, db: AsyncSession) -> "UserLoader":
+        """
+        Загрузчик, привязанный к сессии: все зависимости запроса, получившие
+        одну сессию из get_db, делят и его.
+        """
+        loader = db.info.get(_SESSION_KEY)
+        if loader is None:
+            loader = db.info[_SESSION_KEY] = cls(db)
+        return loader
+
+    @classmethod
+    def clear_session(cls, db: AsyncSession) -> None:
+        """
+        Сбрасывает загруженные строки после изменения пользователей в этой сессии.
+        """
+        loader = db.info.get(_SESSION_KEY)
+        if loader is not None:
+            loader.clear()
+
+    async def load(self, user_id: int) -> Optional[Row]:
+        return await asyncio.shield(self._load("id", user_id))
+
+    async def load_by_username(self, username: str) -> Optional[Row]:
+        return await asyncio.shield(self._load("username", username))
+
+    async def load_by_email(self, email: str) -> Optional[Row]:
+        return await asyncio.shield(self._load("email", email))
+
+    async def load_many(self, user_ids: Iterable[int]) -> List[Optional[Row]]:
+        return list(await asyncio.gather(*(self.load(user_id) for user_id in user_ids)))
+
+    def clear(self) -> None:
+        # Незавершённые загрузки остаются у ожидающих, но больше не переиспользуются
+        for loaded in self._loaded.values():
+            for key in [key for key, future in loaded.items() if future.done()]:
+                del loaded[key]
+
+    def _load(self, field: str, key: Hashable) -> "asyncio.Future[Optional[Row]]":
+        future = self._loaded[field].get(key)
+        if future is None:
+            future = self._loaded[field][key] = asyncio.get_running_loop().create_future()
+            self._pending[field].append(key)
+            if self._dispatch is None:
+                # Пачка собирается до конца текущей итерации event loop
+                self._dispatch = asyncio.ensure_future(self._run_dispatch())
+        return future
+
+    async def _run_dispatch(self) -> None:
+        await asyncio.sleep(0)
+        self._dispatch = None
+        batches, self._pending = self._pending, {field: [] for field in _BATCH_QUERIES}
+        try:
+            # AsyncSession не допускает параллельных запросов — пачки загружаются по очереди
+            async with self._lock:
+                for field, query in _BATCH_QUERIES.items():
+                    # Ключи, уже найденные по другому полю или сброшенные clear(), повторно не запрашиваются
+                    keys = [key for key in batches[field] if not self._is_resolved(field, key)]
+                    if keys:
+                        await self._fetch(field, query, keys)
+        except Exception as e:
+            # Ожидающие не должны зависнуть: незавершённые загрузки пачки получают ошибку
+            for field, keys in batches.items():
+                self._fail(field, keys, e)
+        except asyncio.CancelledError:
+            for field, keys in batches.items():
+                self._fail(field, keys, None)
+            raise
+
+    def _is_resolved(self, field: str, key: Hashable) -> bool:
+        future = self._loaded[field].get(key)
+        return future is None or future.done()
+
+    async def _fetch(self, field: str, query: Callable[[List], StatementLambdaElement], keys: List[Hashable]) -> None:
+        futures = [self._loaded[field][key] for key in keys]
+        try:
+            self.queries += 1
+            rows = (await self.db.execute(query(keys))).all()
+        except Exception as e:
+            self._fail(field, keys, e)
+            return
+        found = {getattr(row, field): row for row in rows}
+        for row in rows:
+            self._remember(row)
+        for key, future in zip(keys, futures):
+            if not future.done():
+                future.set_result(found.get(key))
+
+    def _fail(self, field: str, keys: List[Hashable], error: Optional[Exception]) -> None:
+        """
+        Завершает незавершённые загрузки ошибкой (None — отменяет). Неудачная загрузка
+        не кэшируется: следующий запрос ключа пойдёт в БД заново.
+        """
+        for key in keys:
+            future = self._loaded[field].get(key)
+            if future is None or future.done():
+                continue
+            del self._loaded[field][key]
+            if error is None:
+                future.cancel()
+            else:
+                future.set_exception(error)
+
+    def _remember(self, row: Row) -> None:
+        # Строка, найденная по одному полю, сразу доступна и по остальным
+        for field, loaded in self._loaded.items():
+            key = getattr(row, field)
+            if key is None:
+                continue
+            future = loaded.get(key)
+            if future is None:
+                future = loaded[key] = asyncio.get_running_loop().create_future()
+            if not future.done():
+                future.set_result(row)
@@ -0,0 +1,99 @@
+"""
+Кэшируемые запросы к таблице users.
+
+Каждая функция возвращает lambda_stmt: SQLAlchemy строит и компилирует выражение
+один раз для места вызова, а значения аргументов подставляются как параметры.
+Проекции выбирают только нужные колонки, чтобы не собирать ORM-объекты с хэшем
+пароля и данными устройства там, где они не используются.
+"""
+from typing import Sequence
+
+from sqlalchemy import StatementLambdaElement, lambda_stmt, select, update
+
+from app.models.users import User
+
+# Вход и смена пароля
+AUTH_COLUMNS = (User.id, User.username, User.hashed_password, User.is_active, User.is_admin)
+# Подтверждение email
+ACTIVATION_COLUMNS = (User.id, User.email, User.is_active, User.activation_code)
+# Профиль пользователя (поля UserProfile) и отметка отзыва токенов для проверки статуса
+PROFILE_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.phone_number,
+    User.first_name,
+    User.last_name,
+    User.is_active,
+    User.tokens_revoked_before,
+)
+
+
+def user_by_id(user_id: int) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.id == user_id).limit(1))
+
+
+def user_by_username(username: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.username == username).limit(1))
+
+
+def user_by_email(email: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.email == email).limit(1))
+
+
+def auth_by_id(user_id: int) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(*AUTH_COLUMNS).where(User.id == user_id).limit(1))
+
+
+def auth_by_username(username: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(*AUTH_COLUMNS).where(User.username == username).limit(1))
+
+
+def activation_by_username(username: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(*ACTIVATION_COLUMNS).where(User.username == username).limit(1))
+
+
+def activation_by_email(email: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(*ACTIVATION_COLUMNS).where(User.email == email).limit(1))
+
+
+def profile_by_id(user_id: int) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(*PROFILE_COLUMNS).where(User.id == user_id).limit(1))
+
+
+def profiles_by_ids(user_ids: Sequence[int]) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(*PROFILE_COLUMNS).where(User.id.in_(user_ids)))
+
+
+def profiles_by_usernames(usernames: Sequence[str]) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(*PROFILE_COLUMNS).where(User.username.in_(usernames)))
+
+
+def profiles_by_emails(emails: Sequence[str]) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(*PROFILE_COLUMNS).where(User.email.in_(emails)))
+
+
+def is_active_by_id(user_id: int) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User.is_active).where(User.id == user_id).limit(1))
+
+
+def id_by_username(username: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User.id).where(User.username == username).limit(1))
+
+
+def set_activation_code(user_id: int, activation_code: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: update(User).where(User.id == user_id).values(activation_code=activation_code))
+
+
+def activate(user_id: int) -> StatementLambdaElement:
+    return lambda_stmt(lambda: update(User).where(User.id == user_id).values(is_active=True))
+
+
+def set_password(user_id: int, hashed_password: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: update(User).where(User.id == user_id).values(hashed_password=hashed_password))
+
+
+def revoke_tokens(user_ids: Sequence[int], revoked_before: int) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: update(User).where(User.id.in_(user_ids)).values(tokens_revoked_before=revoked_before)
+    )
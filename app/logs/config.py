@@ -6,6 +6,17 @@ class LogConfig(BaseSettings):
     MONGO_URI: str = Field(..., env="MONGO_URI", description="URI для подключения к MongoDB")
     DATABASE_NAME: str = Field(..., env="DATABASE_NAME", description="Имя базы данных для логов")
     COLLECTION_NAME: str = Field(..., env="COLLECTION_NAME", description="Имя коллекции для логов")
+    LOG_BATCH_SIZE: int = Field(100, env="LOG_BATCH_SIZE", description="Максимальный размер пачки для insert_many")
+    LOG_FLUSH_INTERVAL: float = Field(1.0, env="LOG_FLUSH_INTERVAL", description="Максимальное ожидание заполнения пачки, секунды")
+    LOG_QUEUE_MAXSIZE: int = Field(10000, env="LOG_QUEUE_MAXSIZE", description="Ёмкость очереди логов")
+    LOG_OVERFLOW_POLICY: str = Field(
+        "drop_new",
+        env="LOG_OVERFLOW_POLICY",
+        description="Поведение при переполнении очереди: drop_new или drop_oldest",
+    )
+    # По умолчанию TTL выключен: индекс с expireAfterSeconds сразу удаляет уже накопленные старые логи,
+    # поэтому срок хранения включается в деплое явно
+    LOG_TTL_DAYS: int = Field(0, env="LOG_TTL_DAYS", description="Срок хранения логов (TTL-индекс), дни; 0 — бессрочно")
 
     class Config:
         env_file = ".env"
@@ -1,5 +1,7 @@
 import logging
 import asyncio
+from collections import deque
+from typing import Deque, List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from .config import LogConfig
 from .models import LogEntry
@@ -7,16 +9,81 @@ from .models import LogEntry
 
 config = LogConfig()
 
+OVERFLOW_POLICIES = ("drop_new", "drop_oldest")
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
 class MongoDBLogHandler(logging.Handler):
-    def __init__(self, mongo_uri: str, database_name: str, collection_name: str):
+    """
+    Пишет логи в MongoDB пачками через insert_many(ordered=False).
+
+    Клиент Motor и фоновая задача создаются лениво — при первой записи внутри
+    работающего event loop; записи, сделанные до этого (например, при импорте
+    модулей), буферизуются. emit() вызывается синхронно и не может ждать, поэтому
+    очередь ограничена, а при переполнении запись отбрасывается по политике
+    ``overflow_policy``: ``drop_new`` — новая запись, ``drop_oldest`` — самая старая.
+    """
+
+    def __init__(
+        self,
+        mongo_uri: str,
+        database_name: str,
+        collection_name: str,
+        batch_size: int = config.LOG_BATCH_SIZE,
+        flush_interval: float = config.LOG_FLUSH_INTERVAL,
+        max_queue_size: int = config.LOG_QUEUE_MAXSIZE,
+        overflow_policy: str = config.LOG_OVERFLOW_POLICY,
+    ):
         super().__init__()
-        self.queue = asyncio.Queue()  # Очередь для логов
-        self.client = AsyncIOMotorClient(mongo_uri)
-        self.collection = self.client[database_name][collection_name]
-        self._is_running = True
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log overflow policy: {overflow_policy}")
+        self.mongo_uri = mongo_uri
+        self.database_name = database_name
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
 
-        self._loop = asyncio.get_event_loop()
-        self._loop.create_task(self._process_queue())
+        self._client: Optional[AsyncIOMotorClient] = None
+        self._collection = None
+        self.queue: Optional[asyncio.Queue] = None  # Очередь для логов
+        self._pending: Deque[LogEntry] = deque()  # Записи до запуска event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List[LogEntry] = []
+
+        # Метрики
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+        self.batches = 0
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._client = AsyncIOMotorClient(self.mongo_uri)
+            self._collection = self._client[self.database_name][self.collection_name]
+        return self._collection
+
+    def start(self) -> None:
+        """
+        Запускает фоновую запись в текущем event loop.
+        """
+        if self._task is not None and not self._loop.is_closed():
+            return
+        self._loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._batch = []
+        while self._pending:
+            self._enqueue(self._pending.popleft())
+        self._task = self._loop.create_task(self._process_queue())
 
     def emit(self, record):
 
@@ -26,31 +93,160 @@ class MongoDBLogHandler(logging.Handler):
             module=record.module,
         )
 
-        self.queue.put_nowait(log_entry)
+        loop = _running_loop()
+        if self._task is None or self._loop.is_closed():
+            if loop is None:
+                self._buffer(log_entry)
+                return
+            self.start()
+        elif loop is not self._loop:
+            # Запись из другого потока: очередь asyncio не потокобезопасна.
+            self._loop.call_soon_threadsafe(self._enqueue, log_entry)
+            return
+        self._enqueue(log_entry)
+
+    def _buffer(self, log_entry: LogEntry):
+        if len(self._pending) >= self.max_queue_size:
+            self.dropped += 1
+            if self.overflow_policy == "drop_new":
+                return
+            self._pending.popleft()
+        self._pending.append(log_entry)
+
+    def _enqueue(self, log_entry: LogEntry):
+        try:
+            self.queue.put_nowait(log_entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.overflow_policy == "drop_oldest":
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.queue.put_nowait(log_entry)
 
     async def _process_queue(self):
-        while self._is_running:
+        while True:
+            await self._collect_batch()
+            batch, self._batch = self._batch, []
+            await self._flush(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    async def _collect_batch(self):
+        """
+        Ждёт первую запись, затем добирает пачку до batch_size или до истечения flush_interval.
+        """
+        loop = asyncio.get_running_loop()
+        self._batch.append(await self.queue.get())
+        deadline = loop.time() + self.flush_interval
+        while len(self._batch) < self.batch_size:
+            try:
+                self._batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            # asyncio.wait вместо wait_for: wait_for может поглотить отмену задачи,
+            # если запись пришла одновременно с ней, и остановка зависнет
+            getter = asyncio.ensure_future(self.queue.get())
+            received = False
+            try:
+                await asyncio.wait({getter}, timeout=timeout)
+            finally:
+                if getter.done() and not getter.cancelled():
+                    self._batch.append(getter.result())
+                    received = True
+                else:
+                    getter.cancel()
+            if not received:
+                break
+
+    async def _flush(self, batch: List[LogEntry]):
+        if not batch:
+            return
+        try:
+            await self.collection.insert_many([entry.dict() for entry in batch], ordered=False)
+            self.flushed += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Ошибка записи логов в MongoDB: {e}")
+
+    async def aclose(self, timeout: float = 5.0):
+        """
+        Дожидается отправки накопленных логов, останавливает фоновую задачу и закрывает клиент.
+        """
+        leftover: List[LogEntry] = []
+        if self._task is not None and not self._loop.is_closed() and self._loop is _running_loop():
             try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            leftover.extend(self._batch)
+            while not self.queue.empty():
+                leftover.append(self.queue.get_nowait())
+        leftover.extend(self._pending)
+        self._pending.clear()
+        self._batch = []
+        self._task = None
+        self.queue = None
+
+        for start in range(0, len(leftover), self.batch_size):
+            await self._flush(leftover[start:start + self.batch_size])
 
-                log_entry = await self.queue.get()
-                await self.collection.insert_one(log_entry.dict())
-            except Exception as e:
-                print(f"Ошибка записи лога в MongoDB: {e}")
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            self._collection = None
 
-    def close(self):
-        self._is_running = False
-        super().close()
+    def metrics(self) -> dict:
+        return {
+            "queued": (self.queue.qsize() if self.queue is not None else 0) + len(self._pending),
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
 
 
 class Logger:
-    @staticmethod
-    def setup_logger():
-        log_handler = MongoDBLogHandler(
-            mongo_uri=config.MONGO_URI,
-            database_name=config.DATABASE_NAME,
-            collection_name=config.COLLECTION_NAME,
-        )
-        logging.basicConfig(level=logging.INFO)
+    _handler: Optional[MongoDBLogHandler] = None
+
+    @classmethod
+    def setup_logger(cls) -> logging.Logger:
+        """
+        Возвращает логгер приложения. Обработчик MongoDB (и его клиент)
+        создаётся один раз на процесс, повторные вызовы его не дублируют.
+        """
         logger = logging.getLogger("app_logger")
-        logger.addHandler(log_handler)
-        return logger
\ No newline at end of file
+        if cls._handler is None:
+            cls._handler = MongoDBLogHandler(
+                mongo_uri=config.MONGO_URI,
+                database_name=config.DATABASE_NAME,
+                collection_name=config.COLLECTION_NAME,
+            )
+            logging.basicConfig(level=logging.INFO)
+            logger.addHandler(cls._handler)
+        return logger
+
+    @classmethod
+    def database(cls):
+        """
+        База MongoDB, в которую пишутся логи (для управления индексами).
+        """
+        return cls._handler.collection.database if cls._handler is not None else None
+
+    @classmethod
+    def metrics(cls) -> dict:
+        return cls._handler.metrics() if cls._handler is not None else {}
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """
+        Отправляет оставшиеся логи и закрывает соединение с MongoDB (вызывается при остановке приложения).
+        """
+        if cls._handler is not None:
+            await cls._handler.aclose()
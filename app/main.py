@@ -1,31 +1,56 @@
+import asyncio
+
 from fastapi import FastAPI, Depends, HTTPException, Header, status
+from fastapi.responses import JSONResponse
 
 
 from fastapi_jwt import JwtAuthorizationCredentials, JwtAccessBearer
 from pydantic import BaseModel
 from datetime import timedelta
 
-from app.core.database import mongodb, connect, disconnect
+from app.core.database import mongodb, connect, disconnect, get_pool_stats, ping_database
 from app.core.security import JWTAuth, jwt_bearer, verify_api_key, SECRET_KEY, API_KEY
+from app.core.auth_context import user_status_cache
 from app.core.config import app
+from app.logs.logger import Logger
+from app.core.redis import close_redis
+from app.core.mongo_indexes import CHAT_INDEXES, apply_indexes, log_indexes
+from app.services.chat_service.chat_broadcaster import chat_broadcaster
+from app.services.password_service import password_hash_service
+from app.services.business_card.card_cache import business_card_cache
 
 from app.api.chat.routers import router as get_chat_router
 from app.api.users.routers import router as user_router
 from app.api.business_card.routers import router as get_business_card_router
 
+# Ожидание применения индексов логов при старте, секунды
+LOG_INDEXES_TIMEOUT = 10
+
 
 
 @app.on_event("startup")
 async def startup_event():
     await connect()
     await mongodb.connect()
+    # Индексы из реестра (app.core.mongo_indexes) создаются идемпотентно
+    await apply_indexes(mongodb.db, CHAT_INDEXES)
+    try:
+        # Логи пишутся в отдельный MongoDB: его недоступность не должна мешать старту
+        await asyncio.wait_for(apply_indexes(Logger.database(), log_indexes()), timeout=LOG_INDEXES_TIMEOUT)
+    except Exception as e:
+        Logger.setup_logger().error(f"Не удалось применить индексы коллекции логов: {e}")
+    await chat_broadcaster.start()
     print("Connected to PostgreSQL and MongoDB")
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await chat_broadcaster.stop()
     await disconnect()
     await mongodb.disconnect()
+    await close_redis()
+    password_hash_service.shutdown()
     print("Disconnected from PostgreSQL and MongoDB")
+    await Logger.shutdown()
 
 
 
@@ -42,6 +67,37 @@ async def read_root():
         "description": "API for managing salon bookings and virtual receptionist services."
     }
 
+@app.get("/health/db", tags=["Health"], dependencies=[Depends(verify_api_key)])
+async def database_health():
+    return get_pool_stats()
+
+@app.get("/health/mongo", tags=["Health"], dependencies=[Depends(verify_api_key)])
+async def mongo_health():
+    return {**mongodb.stats(), **await mongodb.readiness()}
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness():
+    """
+    Проба готовности: основная база и MongoDB чатов отвечают на ping.
+    """
+    checks = {"database": await ping_database(), "mongo": await mongodb.readiness()}
+    ready = all(check["ready"] for check in checks.values())
+    return JSONResponse(
+        {"ready": ready, **checks},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+@app.get("/health/auth", tags=["Health"], dependencies=[Depends(verify_api_key)])
+async def auth_health():
+    return {
+        "jwt_cache": jwt_bearer.token_cache.stats(),
+        "user_status_cache": user_status_cache.stats(),
+    }
+
+@app.get("/health/business-card-cache", tags=["Health"], dependencies=[Depends(verify_api_key)])
+async def business_card_cache_health():
+    return business_card_cache.stats()
+
 # Подключение роутера для пользователей
 # app.include_router(users.router, prefix="/api/v1", tags=["Users"])
 app.include_router(user_router, prefix="/api/v1", tags=["Users / Authorization"], dependencies=[Depends(verify_api_key)])
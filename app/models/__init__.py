@@ -1,4 +1,4 @@
-from .users import User, Token
+from .users import User, Token, RefreshToken
 
 # Теперь все модели используют один объект Base
 from app.core.database import Base  # Это тот же Base, который вы используете для миграций
\ No newline at end of file
@@ -14,6 +14,7 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=False)
+    is_admin = Column(Boolean, default=False, server_default="false", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     device_model = Column(String)
@@ -21,6 +22,8 @@ class User(Base):
     ip_address = Column(String)
     device_time = Column(DateTime)
     activation_code = Column(String, nullable=True)
+    # Токены с iat не позже этой отметки (unix-время) отозваны; дублирует кэш статусов на случай недоступности Redis
+    tokens_revoked_before = Column(Integer, nullable=True)
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
     # Связь с токенами
@@ -39,4 +42,20 @@ class Token(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship to the User model
-    user = relationship("User", back_populates="tokens")
\ No newline at end of file
+    user = relationship("User", back_populates="tokens")
+
+
+class RefreshToken(Base):
+    """
+    Выданные refresh-токены. Все токены одной сессии образуют семейство (family_id):
+    при ротации старый помечается used_at, повторное использование отзывает всё семейство.
+    """
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    family_id = Column(String(64), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
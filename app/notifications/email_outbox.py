@@ -0,0 +1,145 @@
+import json
+from typing import Dict, List
+
+from app.celery.celery_app import PRIORITY_NORMAL, PRIORITY_URGENT, QUEUE_AUTH, QUEUE_BULK, celery_app
+from app.core.config import (
+    MAIL_AUTH_BATCH_DELAY,
+    MAIL_BATCH_DELAY,
+    MAIL_BATCH_SIZE,
+    MAIL_MAX_RETRIES,
+    MAIL_RETRY_BACKOFF,
+    MAIL_RETRY_BACKOFF_MAX,
+)
+from app.core.redis import get_redis
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+SEND_EMAIL_BATCH_TASK = "app.celery.celery_tasks.send_email_batch_task"
+FLUSH_EMAIL_OUTBOX_TASK = "app.celery.celery_tasks.flush_email_outbox_task"
+
+# Сколько пачек задача отправляет за один запуск, прежде чем уступить воркер
+FLUSH_MAX_BATCHES = 20
+
+
+def retry_delay(attempt: int) -> int:
+    return min(MAIL_RETRY_BACKOFF_MAX, MAIL_RETRY_BACKOFF * 2 ** (attempt - 1))
+
+
+class EmailOutbox:
+    """
+    Очередь писем в списке Redis. Письма добавляются одной командой RPUSH, а задача
+    выгрузки планируется не чаще раза в delay секунд (флаг SET NX): всплеск из
+    тысяч писем превращается в несколько задач, каждая отправляет пачки по
+    batch_size писем через постоянные SMTP-соединения воркера.
+    Если Redis недоступен, письма сразу уходят в Celery одной задачей.
+
+    У каждой очереди писем своя очередь Celery: коды подтверждения не ждут
+    за письмами массового импорта.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        queue: str,
+        priority: int = PRIORITY_NORMAL,
+        batch_size: int = MAIL_BATCH_SIZE,
+        delay: float = MAIL_BATCH_DELAY,
+    ):
+        self.name = name
+        self.queue = queue
+        self.priority = priority
+        self.key = f"mail:outbox:{name}"
+        self.scheduled_key = f"{self.key}:scheduled"
+        self.batch_size = batch_size
+        self.delay = delay
+
+    def _schedule_flush(self, countdown: float = 0) -> None:
+        celery_app.send_task(
+            FLUSH_EMAIL_OUTBOX_TASK, args=[self.name], queue=self.queue, priority=self.priority, countdown=countdown
+        )
+
+    async def enqueue(self, messages: List[Dict]) -> None:
+        """
+        Ставит в очередь письма вида {"recipients", "subject", "body", "subtype"}.
+        """
+        if not messages:
+            return
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.rpush(self.key, *(json.dumps(message, ensure_ascii=False) for message in messages))
+                # Флаг истекает сам, если запланированная задача потеряется
+                pipe.set(self.scheduled_key, 1, nx=True, ex=int(self.delay) + 60)
+                _, scheduled = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis недоступен, {len(messages)} писем отправляются в Celery напрямую: {e}")
+            celery_app.send_task(
+                SEND_EMAIL_BATCH_TASK, args=[messages, self.name], queue=self.queue, priority=self.priority
+            )
+            return
+        if scheduled:
+            self._schedule_flush(countdown=self.delay)
+
+    async def pop_batch(self) -> List[Dict]:
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.lrange(self.key, 0, self.batch_size - 1)
+            pipe.ltrim(self.key, self.batch_size, -1)
+            raw, _ = await pipe.execute()
+        return [json.loads(item) for item in raw]
+
+    async def requeue(self, messages: List[Dict]) -> None:
+        await get_redis().lpush(self.key, *(json.dumps(m, ensure_ascii=False) for m in reversed(messages)))
+
+    def defer(self, messages: List[Dict]) -> int:
+        """
+        Планирует повторную отправку писем, получивших временную ошибку: задержка
+        растёт экспоненциально с номером попытки, после MAIL_MAX_RETRIES попыток
+        письмо отбрасывается. Возвращает число запланированных писем.
+        """
+        by_attempt: Dict[int, List[Dict]] = {}
+        for message in messages:
+            attempt = message.get("attempt", 0) + 1
+            if attempt > MAIL_MAX_RETRIES:
+                logger.error(f"Письмо для {message['recipients']} не отправлено за {MAIL_MAX_RETRIES} попыток")
+                continue
+            by_attempt.setdefault(attempt, []).append({**message, "attempt": attempt})
+        for attempt, retry in by_attempt.items():
+            celery_app.send_task(
+                SEND_EMAIL_BATCH_TASK,
+                args=[retry, self.name],
+                queue=self.queue,
+                priority=self.priority,
+                countdown=retry_delay(attempt),
+            )
+        return sum(len(retry) for retry in by_attempt.values())
+
+    async def flush(self, sender) -> Dict[str, int]:
+        """
+        Отправляет накопленные письма пачками. Если после FLUSH_MAX_BATCHES пачек
+        очередь не пуста, планирует следующий запуск. При ошибке отправки пачка
+        возвращается в начало очереди, а исключение пробрасывается для повтора задачи
+        (доставка «не менее одного раза»: письма пачки, ушедшие до ошибки, будут отправлены повторно).
+        """
+        await get_redis().delete(self.scheduled_key)
+        totals = {"sent": 0, "failed": 0, "deferred": 0}
+        for _ in range(FLUSH_MAX_BATCHES):
+            batch = await self.pop_batch()
+            if not batch:
+                return totals
+            try:
+                result = await sender.send_many(batch)
+            except Exception:
+                await self.requeue(batch)
+                raise
+            totals["sent"] += result["sent"]
+            totals["failed"] += result["failed"]
+            totals["deferred"] += self.defer(result.get("deferred", []))
+        if await get_redis().set(self.scheduled_key, 1, nx=True, ex=int(self.delay) + 60):
+            self._schedule_flush()
+        return totals
+
+
+# Коды подтверждения отправляются без ожидания пачки
+auth_email_outbox = EmailOutbox("auth", queue=QUEUE_AUTH, priority=PRIORITY_URGENT, delay=MAIL_AUTH_BATCH_DELAY)
+bulk_email_outbox = EmailOutbox("bulk", queue=QUEUE_BULK)
+EMAIL_OUTBOXES = {outbox.name: outbox for outbox in (auth_email_outbox, bulk_email_outbox)}
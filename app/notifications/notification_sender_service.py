@@ -1,7 +1,13 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi_mail import MessageSchema, FastMail
-from app.core.config import conf  # SMSClient для работы с SMS API
+from app.core.config import MAIL_BATCH_SIZE, conf  # SMSClient для работы с SMS API
+from app.notifications.smtp_pool import SmtpConnectionPool, build_message
+
+class EmailRejectedError(ValueError):
+    """SMTP-сервер окончательно отклонил письмо; повторять отправку бессмысленно"""
+
 
 class AbstractNotificationSender(ABC):
     @abstractmethod
@@ -35,3 +41,42 @@ class EmailNotificationSender(AbstractNotificationSender):
             raise
 
 
+class PooledEmailNotificationSender(AbstractNotificationSender):
+    """
+    Долгоживущий отправитель для воркера: письма уходят через пул постоянных
+    SMTP-соединений, пачка писем — по нескольку на соединение.
+    """
+
+    def __init__(self, pool: Optional[SmtpConnectionPool] = None, batch_size: int = MAIL_BATCH_SIZE):
+        self.pool = pool or SmtpConnectionPool()
+        self.batch_size = batch_size
+
+    async def send(self, recipients: List[str], subject: str, body: str, subtype: Optional[str] = "plain") -> None:
+        _, failed, deferred = await self.pool.send_messages([build_message(recipients, subject, body, subtype)])
+        if deferred:
+            # Исключение приводит к повтору задачи с экспоненциальной задержкой
+            raise ConnectionError(f"Email to {recipients} was deferred by the SMTP server")
+        if failed:
+            raise EmailRejectedError(f"Email to {recipients} was rejected by the SMTP server")
+
+    async def send_many(self, messages: List[Dict]) -> Dict:
+        """
+        Отправляет письма вида {"recipients", "subject", "body", "subtype"}, распределяя
+        их по соединениям пула. Возвращает число отправленных и отклонённых писем
+        и список писем, которые сервер попросил отправить позже.
+        """
+        prepared = [
+            build_message(m["recipients"], m["subject"], m["body"], m.get("subtype", "plain")) for m in messages
+        ]
+        # Не больше одной пачки на соединение пула, не меньше batch_size писем на пачку
+        chunk_size = max(self.batch_size, -(-len(prepared) // self.pool.size))
+        offsets = range(0, len(prepared), chunk_size)
+        results = await asyncio.gather(*(self.pool.send_messages(prepared[i:i + chunk_size]) for i in offsets))
+        return {
+            "sent": sum(sent for sent, _, _ in results),
+            "failed": sum(failed for _, failed, _ in results),
+            "deferred": [messages[offset + index] for offset, (_, _, deferred) in zip(offsets, results) for index in deferred],
+        }
+
+    async def close(self) -> None:
+        await self.pool.close()
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import List, Optional, Tuple
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
+
+from app.core.config import MAIL_POOL_MAX_IDLE, MAIL_POOL_SIZE, conf
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+
+def build_message(
+    recipients: List[str], subject: str, body: str, subtype: Optional[str] = "plain", config: ConnectionConfig = conf
+) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((config.MAIL_FROM_NAME or "", config.MAIL_FROM))
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = subject
+    message.set_content(body, subtype=subtype or "plain")
+    return message
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Ответ 4xx — временная ошибка (greylisting, лимит отправки), письмо стоит отправить позже.
+    """
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(400 <= r.code < 500 for r in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and 400 <= error.code < 500
+
+
+class SmtpConnectionPool:
+    """
+    Пул SMTP-соединений процесса. Соединение (TCP, STARTTLS, LOGIN) открывается
+    один раз и переиспользуется, пока не простоит дольше max_idle секунд или не
+    будет закрыто сервером. Одновременно открыто не больше size соединений.
+    Пул привязан к event loop, в котором используется впервые.
+    """
+
+    def __init__(self, config: ConnectionConfig = conf, size: int = MAIL_POOL_SIZE, max_idle: float = MAIL_POOL_MAX_IDLE):
+        self.config = config
+        self.size = size
+        self.max_idle = max_idle
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.opened = 0
+        self.reused = 0
+        self.sent = 0
+        self.failed = 0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+        )
+        await client.connect()
+        if self.config.USE_CREDENTIALS:
+            await client.login(self.config.MAIL_USERNAME, self.config.MAIL_PASSWORD.get_secret_value())
+        self.opened += 1
+        logger.info(f"Открыто SMTP-соединение с {self.config.MAIL_SERVER}:{self.config.MAIL_PORT}")
+        return client
+
+    @staticmethod
+    async def _discard(client: aiosmtplib.SMTP) -> None:
+        try:
+            if client.is_connected:
+                await client.quit()
+        except Exception:
+            client.close()
+
+    async def _checkout(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client, released_at = self._idle.pop()
+            if client.is_connected and time.monotonic() - released_at < self.max_idle:
+                self.reused += 1
+                return client
+            await self._discard(client)
+        return await self._connect()
+
+    @asynccontextmanager
+    async def connection(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+        async with self._semaphore:
+            client = await self._checkout()
+            try:
+                yield client
+            except BaseException:
+                await self._discard(client)
+                raise
+            self._idle.append((client, time.monotonic()))
+
+    async def send_messages(self, messages: List[EmailMessage]) -> Tuple[int, int, List[int]]:
+        """
+        Отправляет письма через одно соединение. Письмо, отклонённое сервером,
+        пропускается; при разрыве соединения отправка продолжается через новое
+        (один раз). Возвращает (отправлено, отклонено, индексы писем с временной ошибкой).
+        """
+        if self.config.SUPPRESS_SEND:
+            return len(messages), 0, []
+        sent = failed = 0
+        deferred: List[int] = []
+        pending = list(enumerate(messages))
+        for attempt in range(2):
+            try:
+                async with self.connection() as client:
+                    while pending:
+                        index, message = pending[0]
+                        try:
+                            await client.send_message(message)
+                            sent += 1
+                        except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused) as e:
+                            if is_transient(e):
+                                deferred.append(index)
+                                logger.warning(f"Временная ошибка отправки письма для {message['To']}: {e}")
+                            else:
+                                failed += 1
+                                logger.error(f"SMTP-сервер отклонил письмо для {message['To']}: {e}")
+                        pending.pop(0)
+                break
+            except aiosmtplib.SMTPServerDisconnected as e:
+                if attempt:
+                    raise
+                logger.warning(f"SMTP-соединение закрыто сервером, повторное подключение: {e}")
+        self.sent += sent
+        self.failed += failed
+        return sent, failed, deferred
+
+    async def close(self) -> None:
+        while self._idle:
+            client, _ = self._idle.pop()
+            await self._discard(client)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "opened": self.opened,
+            "reused": self.reused,
+            "sent": self.sent,
+            "failed": self.failed,
+        }
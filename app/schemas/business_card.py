@@ -15,4 +15,4 @@ class BusinessCardResponse(BaseModel):
     links: str
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        from_attributes = True
\ No newline at end of file
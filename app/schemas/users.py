@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 
 
 # Базовый класс с общей конфигурацией
@@ -37,6 +37,11 @@ class TokenRefresh(BaseSchema):
     refresh_token: str
 
 
+# Модель для массового отзыва сессий
+class SessionsRevokeRequest(BaseSchema):
+    user_ids: List[int] = Field(..., min_length=1, max_length=10000)
+
+
 # Модель для логина пользователя
 class UserLogin(BaseSchema):
     username: str
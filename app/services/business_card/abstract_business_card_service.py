@@ -1,6 +1,7 @@
 # app/services/business_card/abstract_business_card_service.py
 from abc import ABC, abstractmethod
 from app.schemas.business_card import BusinessCardCreate, BusinessCardResponse
+from app.services.business_card.card_cache import CachedCard
 from typing import Optional
 
 
@@ -34,4 +35,14 @@ class AbstractBusinessCardService(ABC):
         :param subdomain: Поддомен карточки.
         :return: Объект BusinessCardResponse или None, если карточка не найдена.
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_public_card(self, subdomain: str) -> Optional[CachedCard]:
+        """
+        Получает сериализованную карточку по поддомену вместе с её ETag.
+
+        :param subdomain: Поддомен карточки.
+        :return: Объект CachedCard или None, если карточка не найдена.
+        """
+        raise NotImplementedError
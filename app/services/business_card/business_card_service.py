@@ -1,30 +1,47 @@
 # app/services/business_card/business_card_service.py
 from typing import Optional
+from fastapi import HTTPException, status
 from app.services.business_card.abstract_business_card_service import AbstractBusinessCardService
+from app.services.business_card.card_cache import BusinessCardCache, CachedCard, business_card_cache
 from app.schemas.business_card import BusinessCardCreate, BusinessCardResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.business_card.business_card_crud import BusinessCardCRUD
 
 
 class BusinessCardService(AbstractBusinessCardService):
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, cache: BusinessCardCache = business_card_cache):
         self.db = db
         self.crud = BusinessCardCRUD(db)
+        self.cache = cache
+
+    @staticmethod
+    def _serialize(card: BusinessCardResponse) -> bytes:
+        return card.model_dump_json().encode()
 
     async def create_or_update_card(self, user_id: int, data: BusinessCardCreate) -> BusinessCardResponse:
         """
-        Создаёт или обновляет бизнес-карточку пользователя.
+        Создаёт или обновляет бизнес-карточку пользователя и обновляет её в кэше.
 
         :param user_id: ID пользователя.
         :param data: Данные для создания/обновления карточки.
         :return: Объект BusinessCardResponse.
         """
+        owner = await self.crud.get_card_by_subdomain(data.subdomain)
+        if owner and owner.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Subdomain already taken")
+
         card = await self.crud.get_card_by_user_id(user_id)
+        old_subdomain = card.subdomain if card else None
         if card:
-            updated_card = await self.crud.update_card(user_id, data)
-            return BusinessCardResponse(**updated_card.dict())
-        new_card = await self.crud.create_or_update_card(user_id, data)
-        return BusinessCardResponse(**new_card.dict())
+            card = await self.crud.update_card(card.id, data.model_dump())
+        else:
+            card = await self.crud.create_card(user_id, data.model_dump())
+
+        response = BusinessCardResponse.model_validate(card)
+        if old_subdomain and old_subdomain != card.subdomain:
+            await self.cache.invalidate(old_subdomain)
+        await self.cache.set(card.subdomain, self._serialize(response))
+        return response
 
     async def get_card(self, user_id: int) -> Optional[BusinessCardResponse]:
         """
@@ -35,9 +52,22 @@ class BusinessCardService(AbstractBusinessCardService):
         """
         card = await self.crud.get_card_by_user_id(user_id)
         if card:
-            return BusinessCardResponse(**card.dict())
+            return BusinessCardResponse.model_validate(card)
         return None
 
+    async def get_public_card(self, subdomain: str) -> Optional[CachedCard]:
+        """
+        Возвращает сериализованную карточку и её ETag из кэша, при промахе — из БД.
+
+        :param subdomain: Поддомен карточки.
+        :return: CachedCard или None, если карточка не найдена.
+        """
+        async def load() -> Optional[bytes]:
+            card = await self.crud.get_card_by_subdomain(subdomain)
+            return self._serialize(BusinessCardResponse.model_validate(card)) if card else None
+
+        return await self.cache.get_or_load(subdomain, load)
+
     async def get_card_by_subdomain(self, subdomain: str) -> Optional[BusinessCardResponse]:
         """
         Получает карточку по поддомену.
@@ -45,7 +75,7 @@ class BusinessCardService(AbstractBusinessCardService):
         :param subdomain: Поддомен карточки.
         :return: Объект BusinessCardResponse или None.
         """
-        card = await self.crud.get_card_by_url(subdomain)
-        if card:
-            return BusinessCardResponse(**card.dict())
-        return None
\ No newline at end of file
+        cached = await self.get_public_card(subdomain)
+        if cached:
+            return BusinessCardResponse.model_validate_json(cached.body)
+        return None
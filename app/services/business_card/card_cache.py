@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import (
+    BUSINESS_CARD_CACHE_SIZE,
+    BUSINESS_CARD_CACHE_TTL,
+    BUSINESS_CARD_CACHE_REDIS,
+    BUSINESS_CARD_CACHE_LOCAL_TTL,
+)
+from app.core.redis import get_redis
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+
+class CachedCard(NamedTuple):
+    body: bytes
+    etag: str
+
+
+# Отметка «карточки нет» в кэше процесса
+_MISSING = CachedCard(b"", "")
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match (список тегов, W/-теги, "*").
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class BusinessCardCache:
+    """
+    Кэш сериализованных ответов публичных карточек по поддомену: LRU+TTL внутри
+    процесса и, опционально, общий второй уровень в Redis. Хранится готовое JSON-тело
+    и его ETag, поэтому попадание в кэш не требует ни запроса к БД, ни сборки модели.
+
+    Одновременные промахи по одному поддомену в процессе объединяются: в БД идёт
+    один запрос, остальные ждут его результата. Отсутствие карточки кэшируется
+    в процессе на local_ttl секунд.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = BUSINESS_CARD_CACHE_SIZE,
+        ttl: float = BUSINESS_CARD_CACHE_TTL,
+        use_redis: bool = BUSINESS_CARD_CACHE_REDIS,
+        local_ttl: float = BUSINESS_CARD_CACHE_LOCAL_TTL,
+        key_prefix: str = "business_card:",
+    ):
+        self.local = TTLCache(maxsize=maxsize, ttl=min(ttl, local_ttl) if use_redis else ttl)
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.use_redis = use_redis
+        self.key_prefix = key_prefix
+        self._loading: Dict[str, "asyncio.Task[Optional[CachedCard]]"] = {}
+        # Счётчик инвалидаций: результат загрузки, начатой до изменения карточки, не кэшируется
+        self._generation = 0
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.loads = 0
+
+    async def get_or_load(
+        self, subdomain: str, load: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Optional[CachedCard]:
+        card = self.local.get(subdomain)
+        if card is not None:
+            return card if card is not _MISSING else None
+        task = self._loading.get(subdomain)
+        if task is None:
+            # Загрузка — отдельная задача: отмена одного запроса не прерывает её для остальных
+            task = asyncio.ensure_future(self._load(subdomain, load))
+            self._loading[subdomain] = task
+            task.add_done_callback(lambda done: self._finish_loading(subdomain, done))
+        return await asyncio.shield(task)
+
+    def _finish_loading(self, subdomain: str, task: asyncio.Task) -> None:
+        if self._loading.get(subdomain) is task:
+            del self._loading[subdomain]
+        if not task.cancelled():
+            # Ошибка уже передана ожидающим; иначе asyncio предупредит о непрочитанном исключении
+            task.exception()
+
+    async def _load(self, subdomain: str, load: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[CachedCard]:
+        generation = self._generation
+        if self.use_redis:
+            try:
+                body = await get_redis().get(self.key_prefix + subdomain)
+            except Exception as e:
+                logger.warning(f"Redis недоступен для кэша карточки {subdomain}: {e}")
+                body = None
+            if body is not None:
+                self.redis_hits += 1
+                body = body.encode() if isinstance(body, str) else body
+                card = CachedCard(body, make_etag(body))
+                if generation == self._generation:
+                    self.local.set(subdomain, card)
+                return card
+            self.redis_misses += 1
+        self.loads += 1
+        body = await load()
+        if generation != self._generation:
+            return CachedCard(body, make_etag(body)) if body is not None else None
+        if body is None:
+            self.local.set(subdomain, _MISSING, ttl=self.local_ttl)
+            return None
+        # NX: значение, записанное при изменении карточки, не перезаписывается прочитанным раньше
+        return await self._store(subdomain, body, only_if_absent=True)
+
+    async def set(self, subdomain: str, body: bytes) -> CachedCard:
+        """
+        Записывает актуальное тело карточки после её изменения.
+        """
+        self._forget(subdomain)
+        return await self._store(subdomain, body, only_if_absent=False)
+
+    async def _store(self, subdomain: str, body: bytes, only_if_absent: bool) -> CachedCard:
+        card = CachedCard(body, make_etag(body))
+        self.local.set(subdomain, card)
+        if self.use_redis:
+            try:
+                await get_redis().set(self.key_prefix + subdomain, body, ex=int(self.ttl), nx=only_if_absent)
+            except Exception as e:
+                logger.warning(f"Не удалось сохранить карточку {subdomain} в Redis: {e}")
+        return card
+
+    def _forget(self, subdomain: str) -> None:
+        self._generation += 1
+        self.local.pop(subdomain)
+        self._loading.pop(subdomain, None)
+
+    async def invalidate(self, *subdomains: str) -> None:
+        for subdomain in subdomains:
+            self._forget(subdomain)
+        if self.use_redis and subdomains:
+            try:
+                await get_redis().delete(*(self.key_prefix + subdomain for subdomain in subdomains))
+            except Exception as e:
+                logger.warning(f"Не удалось инвалидировать карточки {subdomains} в Redis: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            **self.local.stats(),
+            "redis_enabled": self.use_redis,
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "loads": self.loads,
+        }
+
+
+business_card_cache = BusinessCardCache()
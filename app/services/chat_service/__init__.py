@@ -1,4 +1,5 @@
 from .chat_service import ChatService
 from .abstract_chat_service import AbstractChatService
+from .exceptions import ChatNotFoundError, ChatAccessDeniedError
 
-__all__ = ["ChatService", "AbstractChatService"]
\ No newline at end of file
+__all__ = ["ChatService", "AbstractChatService", "ChatNotFoundError", "ChatAccessDeniedError"]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
 
 
 class AbstractChatService(ABC):
@@ -8,11 +8,31 @@ class AbstractChatService(ABC):
         pass
 
     @abstractmethod
-    async def add_message(self, chat_id: str, sender_id: Union[int, str], message: str) -> Dict:
+    async def get_chat(self, chat_id: str) -> Union[Dict, None]:
         pass
 
     @abstractmethod
-    async def get_messages(self, chat_id: str) -> List[Dict]:
+    async def check_membership(self, chat_id: str, user_id: Union[int, str]) -> None:
+        pass
+
+    @abstractmethod
+    async def add_message(
+        self,
+        chat_id: str,
+        sender_id: Union[int, str],
+        message: str,
+        user_id: Optional[Union[int, str]] = None,
+    ) -> Dict:
+        pass
+
+    @abstractmethod
+    async def get_messages(
+        self,
+        chat_id: str,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 50,
+    ) -> Dict:
         pass
 
     @abstractmethod
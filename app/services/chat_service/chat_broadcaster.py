@@ -0,0 +1,194 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+from app.core.config import CHAT_PUBSUB_BACKEND
+from app.core.redis import get_redis
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+
+MessageHandler = Callable[[str, str], Awaitable[None]]
+
+
+class AbstractPubSubBackend(ABC):
+    """
+    Транспорт событий чатов между процессами.
+    """
+
+    @abstractmethod
+    async def start(self, on_message: MessageHandler) -> None:
+        pass
+
+    @abstractmethod
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def subscribe(self, chat_id: str) -> None:
+        pass
+
+    @abstractmethod
+    async def unsubscribe(self, chat_id: str) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, chat_id: str, data: str) -> None:
+        pass
+
+
+class InMemoryPubSubBackend(AbstractPubSubBackend):
+    """
+    Рассылка только внутри текущего процесса (один воркер, тесты).
+    """
+
+    def __init__(self):
+        self._on_message: Optional[MessageHandler] = None
+        self._channels: Set[str] = set()
+
+    async def start(self, on_message: MessageHandler) -> None:
+        self._on_message = on_message
+
+    async def stop(self) -> None:
+        self._channels.clear()
+
+    async def subscribe(self, chat_id: str) -> None:
+        self._channels.add(chat_id)
+
+    async def unsubscribe(self, chat_id: str) -> None:
+        self._channels.discard(chat_id)
+
+    async def publish(self, chat_id: str, data: str) -> None:
+        if self._on_message and chat_id in self._channels:
+            await self._on_message(chat_id, data)
+
+
+class RedisPubSubBackend(AbstractPubSubBackend):
+    """
+    Рассылка между воркерами uvicorn через Redis pub/sub.
+    Процесс подписывается только на каналы чатов, у которых есть локальные подключения.
+    """
+
+    def __init__(self, channel_prefix: str = "chat:"):
+        self.channel_prefix = channel_prefix
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, on_message: MessageHandler) -> None:
+        self._pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        self._task = asyncio.create_task(self._listen(on_message))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def subscribe(self, chat_id: str) -> None:
+        await self._pubsub.subscribe(self.channel_prefix + chat_id)
+
+    async def unsubscribe(self, chat_id: str) -> None:
+        await self._pubsub.unsubscribe(self.channel_prefix + chat_id)
+
+    async def publish(self, chat_id: str, data: str) -> None:
+        await get_redis().publish(self.channel_prefix + chat_id, data)
+
+    async def _listen(self, on_message: MessageHandler) -> None:
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(0.5)
+                    continue
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    chat_id = message["channel"][len(self.channel_prefix):]
+                    await on_message(chat_id, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка чтения Redis pub/sub: {e}")
+                await asyncio.sleep(1.0)
+
+
+class ChatBroadcaster:
+    """
+    Рассылает события чатов подключённым по WebSocket участникам.
+
+    Событие сериализуется один раз при публикации; каждый воркер получает его
+    через pub/sub-бэкенд и раздаёт своим локальным подключениям.
+    """
+
+    def __init__(self, backend: AbstractPubSubBackend):
+        self.backend = backend
+        self._connections: Dict[str, Set[WebSocket]] = {}
+        self._lock = asyncio.Lock()
+        self._started = False
+
+    async def start(self) -> None:
+        if not self._started:
+            await self.backend.start(self._deliver)
+            self._started = True
+
+    async def stop(self) -> None:
+        if self._started:
+            await self.backend.stop()
+            self._started = False
+        self._connections.clear()
+
+    async def connect(self, chat_id: str, websocket: WebSocket) -> None:
+        await self.start()
+        async with self._lock:
+            sockets = self._connections.setdefault(chat_id, set())
+            if not sockets:
+                await self.backend.subscribe(chat_id)
+            sockets.add(websocket)
+
+    async def disconnect(self, chat_id: str, websocket: WebSocket) -> None:
+        async with self._lock:
+            sockets = self._connections.get(chat_id)
+            if not sockets:
+                return
+            sockets.discard(websocket)
+            if not sockets:
+                del self._connections[chat_id]
+                await self.backend.unsubscribe(chat_id)
+
+    async def publish(self, chat_id: str, event: Dict) -> None:
+        """
+        Публикует событие для всех подключённых участников чата на всех воркерах.
+        """
+        if not self._started:
+            await self.start()
+        await self.backend.publish(chat_id, json.dumps(event, default=str))
+
+    def connection_count(self, chat_id: str) -> int:
+        return len(self._connections.get(chat_id, ()))
+
+    async def _deliver(self, chat_id: str, data: str) -> None:
+        sockets = list(self._connections.get(chat_id, ()))
+        if not sockets:
+            return
+        results = await asyncio.gather(
+            *(websocket.send_text(data) for websocket in sockets), return_exceptions=True
+        )
+        for websocket, result in zip(sockets, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Не удалось доставить событие чата {chat_id}: {result}")
+                await self.disconnect(chat_id, websocket)
+
+
+def create_pubsub_backend(name: str = CHAT_PUBSUB_BACKEND) -> AbstractPubSubBackend:
+    if name == "redis":
+        return RedisPubSubBackend()
+    if name == "memory":
+        return InMemoryPubSubBackend()
+    raise ValueError(f"Unknown chat pub/sub backend: {name}")
+
+
+chat_broadcaster = ChatBroadcaster(create_pubsub_backend())
@@ -1,12 +1,25 @@
 from app.core.database import mongodb
 from bson.objectid import ObjectId
-from typing import List, Dict, Union
+from datetime import datetime
+from typing import FrozenSet, List, Dict, Optional, Union
 from pymongo.errors import PyMongoError
 
 from app.services.chat_service.abstract_chat_service import AbstractChatService
+from app.services.chat_service.chat_broadcaster import chat_broadcaster
+from app.services.chat_service.exceptions import ChatNotFoundError, ChatAccessDeniedError
+from app.services.chat_service.message_service import MessageService, DEFAULT_PAGE_SIZE
+from app.services.chat_service.membership_cache import chat_membership_cache
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
 
 
 class ChatService(AbstractChatService):
+    def __init__(self):
+        self.message_service = MessageService()
+        self.broadcaster = chat_broadcaster
+        self.membership_cache = chat_membership_cache
+
     async def create_chat(self, participants: List[Union[int, str]]) -> Dict:
         """
         Создает новый чат с участниками. Убирает дубли участников.
@@ -20,49 +33,108 @@ class ChatService(AbstractChatService):
             if mongodb.db is None:
                 raise ValueError("MongoDB connection is not initialized.")
             
-            chat_data = {"participants": participants, "messages": []}
+            chat_data = {"participants": participants}
             result = await mongodb.db["chats"].insert_one(chat_data)
-            return {"chat_id": str(result.inserted_id)}
+            chat_id = str(result.inserted_id)
+            await self.membership_cache.set(chat_id, participants)
+            return {"chat_id": chat_id}
         except PyMongoError as e:
             raise ValueError(f"Database error: {str(e)}")
         except Exception as e:
             raise ValueError(f"Unexpected error: {str(e)}")
 
-    async def add_message(self, chat_id: str, sender_id: Union[int, str], message: str) -> Dict:
+    async def get_chat(self, chat_id: str) -> Union[Dict, None]:
+        """
+        Возвращает чат без сообщений (только метаданные и участников).
+        """
+        return await mongodb.db["chats"].find_one({"_id": self._object_id(chat_id)}, {"messages": 0})
+
+    async def get_participants(self, chat_id: str) -> Optional[FrozenSet[Union[int, str]]]:
+        """
+        Возвращает участников чата из кэша; при промахе читает только поле participants.
+        :return: Множество участников или None, если чат не найден.
+        """
+        participants = await self.membership_cache.get(chat_id)
+        if participants is not None:
+            return participants
+        chat = await mongodb.db["chats"].find_one({"_id": self._object_id(chat_id)}, {"participants": 1})
+        if not chat:
+            return None
+        return await self.membership_cache.set(chat_id, chat["participants"])
+
+    async def check_membership(self, chat_id: str, user_id: Union[int, str]) -> None:
+        """
+        Проверяет участие пользователя в чате по кэшу участников.
+        """
+        participants = await self.get_participants(chat_id)
+        if participants is None:
+            raise ChatNotFoundError(f"Chat with ID {chat_id} not found.")
+        if user_id not in participants:
+            raise ChatAccessDeniedError(f"User {user_id} is not a participant of chat {chat_id}.")
+
+    async def add_message(
+        self,
+        chat_id: str,
+        sender_id: Union[int, str],
+        message: str,
+        user_id: Optional[Union[int, str]] = None,
+    ) -> Dict:
         """
         Добавляет сообщение в чат.
+
+        Существование чата и участие ``user_id`` проверяются одним условным обновлением
+        по ``_id`` и ``participants``, которое фиксирует время последнего сообщения.
+        Сообщение записывается в бакет только после совпадения, поэтому в удалённый чат
+        или от постороннего ничего не сохраняется. Дополнительное чтение нужно только
+        при отказе — чтобы отличить "чат не найден" от "нет доступа".
         """
         if not message.strip():
             raise ValueError("Message cannot be empty.")
 
-        chat = await mongodb.db["chats"].find_one({"_id": ObjectId(chat_id)})
-        if not chat:
-            raise ValueError(f"Chat with ID {chat_id} not found.")
-
-        message_data = {"sender_id": sender_id, "message": message}
+        chat_filter = {"_id": self._object_id(chat_id)}
+        if user_id is not None:
+            chat_filter["participants"] = user_id
         update_result = await mongodb.db["chats"].update_one(
-            {"_id": ObjectId(chat_id)},
-            {"$push": {"messages": message_data}}
+            chat_filter, {"$set": {"last_message_at": datetime.utcnow()}}
         )
-        if update_result.modified_count == 0:
-            raise ValueError("Failed to add message to chat.")
-        
-        return {"status": "message sent"}
+        if update_result.matched_count == 0:
+            await self.membership_cache.invalidate(chat_id)
+            if user_id is None or not await mongodb.db["chats"].find_one(
+                {"_id": chat_filter["_id"]}, {"_id": 1}
+            ):
+                raise ChatNotFoundError(f"Chat with ID {chat_id} not found.")
+            raise ChatAccessDeniedError(f"User {user_id} is not a participant of chat {chat_id}.")
+
+        saved = await self.message_service.save_message(chat_id, sender_id, message)
 
-    async def get_messages(self, chat_id: str) -> List[Dict]:
+        try:
+            await self.broadcaster.publish(chat_id, {"type": "message", "chat_id": chat_id, **saved})
+        except Exception as e:
+            # Сообщение уже сохранено, клиенты получат его при следующем чтении истории.
+            logger.error(f"Не удалось разослать сообщение чата {chat_id}: {e}")
+        return {"status": "message sent", "message_id": saved["message_id"]}
+
+    async def get_messages(
+        self,
+        chat_id: str,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Dict:
         """
-        Получает список сообщений из чата.
+        Получает страницу сообщений из чата.
         """
-        chat = await mongodb.db["chats"].find_one({"_id": ObjectId(chat_id)})
-        if not chat:
-            raise ValueError(f"Chat with ID {chat_id} not found.")
-        return chat["messages"]
+        if await self.get_participants(chat_id) is None:
+            raise ChatNotFoundError(f"Chat with ID {chat_id} not found.")
+        return await self.message_service.get_chat_messages(chat_id, before=before, after=after, limit=limit)
 
     async def get_chats_by_user(self, user_id: Union[int, str]) -> List[Dict]:
         """
         Возвращает список чатов, в которых участвует пользователь.
         """
-        chats = await mongodb.db["chats"].find({"participants": user_id}).to_list(length=None)
+        chats = await mongodb.db["chats"].find(
+            {"participants": user_id}, {"participants": 1}
+        ).to_list(length=None)
         return [{"chat_id": str(chat["_id"]), "participants": chat["participants"]} for chat in chats]
 
     async def get_user_id_by_username(self, username: str) -> Union[int, None]:
@@ -70,4 +142,10 @@ class ChatService(AbstractChatService):
         Находит ID пользователя по имени.
         """
         user = await mongodb.db["users"].find_one({"username": username})
-        return user["id"] if user else None
\ No newline at end of file
+        return user["id"] if user else None
+
+    @staticmethod
+    def _object_id(chat_id: str) -> ObjectId:
+        if not ObjectId.is_valid(chat_id):
+            raise ChatNotFoundError(f"Chat with ID {chat_id} not found.")
+        return ObjectId(chat_id)
@@ -0,0 +1,6 @@
+class ChatNotFoundError(ValueError):
+    """Чат с указанным идентификатором не существует."""
+
+
+class ChatAccessDeniedError(ValueError):
+    """Пользователь не является участником чата."""
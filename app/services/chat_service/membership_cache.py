@@ -0,0 +1,83 @@
+import json
+from typing import Dict, FrozenSet, List, Optional, Union
+
+from app.core.cache import TTLCache
+from app.core.config import (
+    CHAT_MEMBERSHIP_CACHE_SIZE,
+    CHAT_MEMBERSHIP_CACHE_TTL,
+    CHAT_MEMBERSHIP_CACHE_REDIS,
+)
+from app.core.redis import get_redis
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+
+Participants = FrozenSet[Union[int, str]]
+
+
+class ChatMembershipCache:
+    """
+    Кэш списков участников чатов: LRU+TTL внутри процесса и, опционально,
+    общий второй уровень в Redis, чтобы воркеры одинаково видели инвалидацию.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CHAT_MEMBERSHIP_CACHE_SIZE,
+        ttl: float = CHAT_MEMBERSHIP_CACHE_TTL,
+        use_redis: bool = CHAT_MEMBERSHIP_CACHE_REDIS,
+        key_prefix: str = "chat:participants:",
+    ):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self.key_prefix = key_prefix
+        self.redis_hits = 0
+        self.redis_misses = 0
+
+    async def get(self, chat_id: str) -> Optional[Participants]:
+        participants = self.local.get(chat_id)
+        if participants is not None or not self.use_redis:
+            return participants
+        try:
+            raw = await get_redis().get(self.key_prefix + chat_id)
+        except Exception as e:
+            logger.warning(f"Redis недоступен для кэша участников чата {chat_id}: {e}")
+            return None
+        if raw is None:
+            self.redis_misses += 1
+            return None
+        self.redis_hits += 1
+        participants = frozenset(json.loads(raw))
+        self.local.set(chat_id, participants)
+        return participants
+
+    async def set(self, chat_id: str, participants: List[Union[int, str]]) -> Participants:
+        participants = frozenset(participants)
+        self.local.set(chat_id, participants)
+        if self.use_redis:
+            try:
+                await get_redis().set(self.key_prefix + chat_id, json.dumps(list(participants)), ex=int(self.ttl))
+            except Exception as e:
+                logger.warning(f"Не удалось сохранить участников чата {chat_id} в Redis: {e}")
+        return participants
+
+    async def invalidate(self, chat_id: str) -> None:
+        self.local.pop(chat_id)
+        if self.use_redis:
+            try:
+                await get_redis().delete(self.key_prefix + chat_id)
+            except Exception as e:
+                logger.warning(f"Не удалось инвалидировать участников чата {chat_id} в Redis: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            **self.local.stats(),
+            "redis_enabled": self.use_redis,
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+        }
+
+
+chat_membership_cache = ChatMembershipCache()
@@ -1,13 +1,178 @@
 from app.core.database import mongodb
+from app.core.config import CHAT_MESSAGE_BUCKET_SIZE
 from bson.objectid import ObjectId
-from typing import List, Dict
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from typing import List, Dict, Optional, Union
+
+
+MESSAGE_BUCKETS_COLLECTION = "message_buckets"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Повторы записи при гонке за создание открытого бакета
+SAVE_ATTEMPTS = 3
+
 
 class MessageService:
-    async def save_message(self, chat_id: str, sender_id: int, message: str) -> Dict:
-        message_data = {"chat_id": chat_id, "sender_id": sender_id, "message": message}
-        result = await mongodb.db["messages"].insert_one(message_data)
-        return {"message_id": str(result.inserted_id)}
-
-    async def get_chat_messages(self, chat_id: str) -> List[Dict]:
-        messages = await mongodb.db["messages"].find({"chat_id": chat_id}).to_list(100)
-        return messages
\ No newline at end of file
+    """
+    Хранилище сообщений, сгруппированных в бакеты фиксированного размера.
+
+    Каждый документ коллекции ``message_buckets`` содержит не более ``bucket_size``
+    сообщений одного чата, поэтому стоимость записи не зависит от длины истории,
+    а документ чата не растёт до лимита MongoDB в 16 МБ.
+
+    Запись идёт только в открытый бакет чата — у него есть поле ``open_chat_id``;
+    уникальный разреженный индекс по нему (app.core.mongo_indexes) не даёт параллельным
+    записям создать второй. Заполненный бакет закрывается (поле удаляется), следующая
+    запись открывает новый.
+    """
+
+    def __init__(self, bucket_size: int = CHAT_MESSAGE_BUCKET_SIZE):
+        self.bucket_size = bucket_size
+
+    @property
+    def collection(self):
+        return mongodb.db[MESSAGE_BUCKETS_COLLECTION]
+
+    @property
+    def history_collection(self):
+        # История читается с вторичных узлов (CHAT_MONGO_HISTORY_READ_PREFERENCE), запись — через primary
+        return mongodb.history_db[MESSAGE_BUCKETS_COLLECTION]
+
+    async def save_message(self, chat_id: str, sender_id: Union[int, str], message: str) -> Dict:
+        """
+        Добавляет сообщение в открытый бакет чата.
+        Если такого бакета нет, он создаётся тем же запросом (upsert).
+        :return: Сохранённое сообщение.
+        """
+        message_id = ObjectId()
+        message_data = {
+            "_id": message_id,
+            "sender_id": sender_id,
+            "message": message,
+            "timestamp": datetime.utcnow(),
+        }
+        for attempt in range(SAVE_ATTEMPTS):
+            try:
+                bucket = await self.collection.find_one_and_update(
+                    {"open_chat_id": chat_id, "count": {"$lt": self.bucket_size}},
+                    {
+                        "$setOnInsert": {"chat_id": chat_id},
+                        "$push": {"messages": message_data},
+                        "$inc": {"count": 1},
+                        "$min": {"first_id": message_id},
+                        "$max": {"last_id": message_id},
+                    },
+                    projection={"count": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+                break
+            except DuplicateKeyError:
+                # Открытый бакет создан параллельной записью или заполнен, но ещё не закрыт
+                if attempt == SAVE_ATTEMPTS - 1:
+                    raise
+                await self._close_full_bucket({"open_chat_id": chat_id})
+        if bucket["count"] >= self.bucket_size:
+            await self._close_full_bucket({"_id": bucket["_id"]})
+        return self.serialize(message_data)
+
+    async def _close_full_bucket(self, bucket_filter: Dict) -> None:
+        await self.collection.update_one(
+            {**bucket_filter, "count": {"$gte": self.bucket_size}}, {"$unset": {"open_chat_id": ""}}
+        )
+
+    async def get_chat_messages(
+        self,
+        chat_id: str,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Dict:
+        """
+        Возвращает страницу сообщений чата (keyset-пагинация по ``message_id``).
+
+        :param before: Вернуть сообщения старше указанного (по умолчанию — самые новые).
+        :param after: Вернуть сообщения новее указанного.
+        :param limit: Максимальное количество сообщений на странице.
+        :return: Сообщения в порядке отправки и курсоры для соседних страниц.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        before_id = self._parse_cursor(before)
+        after_id = self._parse_cursor(after)
+        # Без курсора "before" и с курсором "after" листаем вперёд, иначе — назад от конца.
+        forward = after_id is not None and before_id is None
+
+        query = {"chat_id": chat_id}
+        if before_id is not None:
+            query["first_id"] = {"$lt": before_id}
+        if after_id is not None:
+            query["last_id"] = {"$gt": after_id}
+
+        # Бакеты могут пересекаться по диапазону _id (параллельные записи, миграция), поэтому
+        # чтение идёт до бакета, который целиком лежит за пределами собранного окна.
+        edge = "first_id" if forward else "last_id"
+        cursor = self.history_collection.find(query, {"messages": 1, "first_id": 1, "last_id": 1}).sort(
+            edge, ASCENDING if forward else DESCENDING
+        )
+        collected = []
+        async for bucket in cursor:
+            # Собираем на одно сообщение больше, чтобы понять, есть ли следующая страница.
+            if len(collected) > limit:
+                collected.sort(key=lambda m: m["_id"], reverse=not forward)
+                del collected[limit + 1:]
+                boundary = collected[limit]["_id"]
+                if (bucket[edge] >= boundary) if forward else (bucket[edge] <= boundary):
+                    break
+            for message in bucket["messages"]:
+                if before_id is not None and message["_id"] >= before_id:
+                    continue
+                if after_id is not None and message["_id"] <= after_id:
+                    continue
+                collected.append(message)
+
+        collected.sort(key=lambda m: m["_id"], reverse=not forward)
+        has_more = len(collected) > limit
+        page = sorted(collected[:limit], key=lambda m: m["_id"])
+        messages = [self.serialize(m) for m in page]
+
+        return {
+            "messages": messages,
+            "has_more": has_more,
+            "before": messages[0]["message_id"] if messages else before,
+            "after": messages[-1]["message_id"] if messages else after,
+        }
+
+    @staticmethod
+    def _parse_cursor(cursor: Optional[str]) -> Optional[ObjectId]:
+        if cursor is None:
+            return None
+        if not ObjectId.is_valid(cursor):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return ObjectId(cursor)
+
+    def build_buckets(self, chat_id: str, messages: List[Dict]) -> List[Dict]:
+        """
+        Раскладывает готовые сообщения по документам-бакетам (используется миграцией).
+        """
+        buckets = []
+        for start in range(0, len(messages), self.bucket_size):
+            chunk = messages[start:start + self.bucket_size]
+            buckets.append({
+                "chat_id": chat_id,
+                "count": len(chunk),
+                "first_id": chunk[0]["_id"],
+                "last_id": chunk[-1]["_id"],
+                "messages": chunk,
+            })
+        return buckets
+
+    @staticmethod
+    def serialize(message: Dict) -> Dict:
+        return {
+            "message_id": str(message["_id"]),
+            "sender_id": message["sender_id"],
+            "message": message["message"],
+            "timestamp": message.get("timestamp"),
+        }
@@ -0,0 +1,82 @@
+"""
+Миграция сообщений из встроенного массива ``chats.messages`` в коллекцию бакетов.
+
+Запуск: ``python -m app.services.chat_service.migrations``
+
+Миграция идемпотентна: бакеты, созданные предыдущим незавершённым запуском
+для того же чата, удаляются перед повторной вставкой.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict
+
+from bson.objectid import ObjectId
+
+from app.core.database import mongodb
+from app.core.mongo_indexes import CHAT_INDEXES, apply_indexes
+from app.services.chat_service.message_service import MessageService
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+
+def legacy_message_id(timestamp: datetime) -> ObjectId:
+    """
+    ObjectId со временем отправки сообщения: порядок _id (курсоры страниц, last_id бакетов)
+    совпадает с порядком сообщений, а не со временем миграции. Хвост берётся из нового
+    ObjectId — счётчик сохраняет порядок сообщений внутри одной секунды.
+    """
+    return ObjectId(ObjectId.from_datetime(timestamp).binary[:4] + ObjectId().binary[4:])
+
+
+async def migrate_embedded_messages(message_service: MessageService = None) -> Dict:
+    """
+    Переносит сообщения каждого чата в бакеты и удаляет массив ``messages`` из чата.
+    """
+    message_service = message_service or MessageService()
+    chats = mongodb.db["chats"].find({"messages": {"$exists": True}}, {"messages": 1})
+
+    migrated_chats = 0
+    migrated_messages = 0
+    async for chat in chats:
+        chat_id = str(chat["_id"])
+        legacy_messages = chat.get("messages") or []
+        created_at = chat["_id"].generation_time.replace(tzinfo=None)
+
+        messages = [
+            {
+                "_id": legacy_message_id(legacy.get("timestamp", created_at)),
+                "sender_id": legacy["sender_id"],
+                "message": legacy["message"],
+                "timestamp": legacy.get("timestamp", created_at),
+            }
+            for legacy in legacy_messages
+        ]
+        buckets = message_service.build_buckets(chat_id, messages)
+        for bucket in buckets:
+            bucket["migrated"] = True
+
+        await message_service.collection.delete_many({"chat_id": chat_id, "migrated": True})
+        if buckets:
+            await message_service.collection.insert_many(buckets, ordered=True)
+        await mongodb.db["chats"].update_one({"_id": chat["_id"]}, {"$unset": {"messages": ""}})
+
+        migrated_chats += 1
+        migrated_messages += len(messages)
+        logger.info(f"Чат {chat_id}: перенесено сообщений {len(messages)}")
+
+    logger.info(f"Миграция завершена: чатов {migrated_chats}, сообщений {migrated_messages}")
+    return {"chats": migrated_chats, "messages": migrated_messages}
+
+
+async def main():
+    await mongodb.connect()
+    try:
+        await apply_indexes(mongodb.db, CHAT_INDEXES)
+        await migrate_embedded_messages()
+    finally:
+        await mongodb.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
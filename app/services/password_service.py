@@ -0,0 +1,90 @@
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from passlib.hash import bcrypt
+
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS
+
+
+def _hash_password(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def _verify_password(password: str, hashed_password: str) -> bool:
+    return bcrypt.verify(password, hashed_password)
+
+
+class AbstractPasswordHashService(ABC):
+    @abstractmethod
+    async def hash(self, password: str) -> str:
+        """Асинхронное хэширование пароля"""
+        pass
+
+    @abstractmethod
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Асинхронная проверка пароля"""
+        pass
+
+
+class PasswordHashService(AbstractPasswordHashService):
+    """
+    Выполняет bcrypt в отдельном пуле потоков или процессов, чтобы хэширование
+    (100–300 мс на вызов) не блокировало event loop.
+    """
+
+    def __init__(
+        self,
+        rounds: int = BCRYPT_ROUNDS,
+        max_workers: int = PASSWORD_HASH_WORKERS,
+        executor: str = PASSWORD_HASH_EXECUTOR,
+    ):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.executor_type = executor
+        self._executor: Executor = None
+        self.in_flight = 0
+        self.completed = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            elif self.executor_type == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+            else:
+                raise ValueError(f"Unknown password hash executor: {self.executor_type}")
+        return self._executor
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(_verify_password, password, hashed_password)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def metrics(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.max_workers),
+            "completed": self.completed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hash_service = PasswordHashService()
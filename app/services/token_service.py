@@ -1,15 +1,40 @@
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 from jose import jwt
 from fastapi import HTTPException, status
-from app.core.security import SECRET_KEY, ALGORITHM
+from fastapi_jwt.jwt_backends.abstract_backend import BackendException
+from app.core.security import SECRET_KEY, ALGORITHM, jwt_bearer
 from abc import ABC, abstractmethod
 from app.schemas.users import TokenRefresh
+from app.core.auth_context import AuthContext, UserStatusCache, user_status_cache
+from app.services.token_store import AbstractTokenStore, TokenStoreUnavailableError
+from app.crud.users.abstract_cruds import AbstractUserCRUD
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+ACCESS_TOKEN_TTL = timedelta(minutes=15)
+REFRESH_TOKEN_TTL = timedelta(days=7)
+
+
+def user_roles(is_admin: bool) -> List[str]:
+    """
+    Роли для claims токена по флагу users.is_admin.
+    """
+    return ["user", "admin"] if is_admin else ["user"]
 
 
 class AbstractTokenService(ABC):
     @abstractmethod
-    async def _generate_token(self, user_id: int, expires_delta: Optional[timedelta] = None) -> str:
+    async def _generate_token(
+        self,
+        user_id: int,
+        expires_delta: Optional[timedelta] = None,
+        is_active: Optional[bool] = None,
+        roles: Optional[List[str]] = None,
+    ) -> str:
         """Асинхронная генерация JWT токена"""
         pass
 
@@ -18,36 +43,82 @@ class AbstractTokenService(ABC):
         """Асинхронное декодирование JWT токена"""
         pass
 
+    @abstractmethod
+    async def issue_tokens(self, user_id: int, is_active: bool, roles: Optional[List[str]] = None) -> dict:
+        """Выдача пары токенов при входе (новое семейство refresh-токенов)"""
+        pass
+
     @abstractmethod
     async def refresh_token(self, refresh: TokenRefresh) -> dict:
         """Асинхронное обновление токена"""
         pass
 
+    @abstractmethod
+    async def revoke_sessions(self, user_ids: Iterable[int]) -> dict:
+        """Отзыв всех сессий пользователей"""
+        pass
+
 
 class TokenService(AbstractTokenService):
-    def __init__(self, secret_key: str = SECRET_KEY, algorithm: str = ALGORITHM):
+    def __init__(
+        self,
+        secret_key: str = SECRET_KEY,
+        algorithm: str = ALGORITHM,
+        status_cache: UserStatusCache = user_status_cache,
+        token_store: Optional[AbstractTokenStore] = None,
+        user_crud: Optional[AbstractUserCRUD] = None,
+    ):
         self.secret_key = secret_key
         self.algorithm = algorithm
+        self.status_cache = status_cache
+        self.token_store = token_store
+        self.user_crud = user_crud
 
-    async def _generate_token(self, user_id: int, expires_delta: Optional[timedelta] = None) -> str:
+    async def _generate_token(
+        self,
+        user_id: int,
+        expires_delta: Optional[timedelta] = None,
+        is_active: Optional[bool] = None,
+        roles: Optional[List[str]] = None,
+        claims: Optional[Dict[str, str]] = None,
+    ) -> str:
         expire = datetime.utcnow() + (expires_delta or timedelta(minutes=30))
+        issued_at = int(time.time())
+        # Статус и роли в claims позволяют проверять доступ без запроса к БД
+        subject = {"id": user_id, "roles": roles or ["user"], "iat": issued_at}
+        if is_active is not None:
+            subject["is_active"] = is_active
         payload = {
-            "subject": {"id": user_id, "roles": ["user"]},
-            "exp": expire
+            "subject": subject,
+            "iat": issued_at,
+            "exp": expire,
+            **(claims or {}),
         }
         return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
+    async def issue_tokens(self, user_id: int, is_active: bool, roles: Optional[List[str]] = None) -> dict:
+        family_id, jti = uuid.uuid4().hex, uuid.uuid4().hex
+        access_token = await self._generate_token(user_id, ACCESS_TOKEN_TTL, is_active=is_active, roles=roles)
+        refresh_token = await self._generate_token(
+            user_id, REFRESH_TOKEN_TTL, is_active=is_active, roles=roles, claims={"jti": jti, "fid": family_id}
+        )
+        if self.token_store is not None:
+            await self.token_store.save_tokens(
+                user_id, access_token, refresh_token, ACCESS_TOKEN_TTL, REFRESH_TOKEN_TTL,
+                family_id=family_id, jti=jti,
+            )
+        return {"access_token": access_token, "refresh_token": refresh_token}
+
     async def decode_token(self, token: str) -> int:
+        # Общий с jwt_bearer слой проверки: подпись проверяется один раз до истечения exp
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            user_id = payload.get("sub")
-            if not user_id:
-                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-            return int(user_id)
-        except jwt.ExpiredSignatureError:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
-        except jwt.JWTError:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+            payload = jwt_bearer.decode_token(token)
+        except BackendException as e:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+        subject = payload.get("subject") if payload else None
+        if not isinstance(subject, dict) or "id" not in subject:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+        return AuthContext.from_subject(subject).user_id
 
     async def refresh_token(self, refresh: TokenRefresh) -> dict:
         try:
@@ -55,11 +126,60 @@ class TokenService(AbstractTokenService):
             subject = payload.get("subject")  # Извлекаем subject вместо sub
             if not subject or "id" not in subject:
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-            user_id = subject["id"]
+            auth = AuthContext.from_subject(subject)
+            jti, family_id = payload.get("jti"), payload.get("fid")
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
         except jwt.JWTError:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-        new_access_token = await self._generate_token(user_id, timedelta(minutes=15))
-        return {"access_token": new_access_token}
\ No newline at end of file
+        if not (jti and family_id):
+            # Токены, выданные до введения семейств, нельзя ротировать и отозвать — нужен повторный вход
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token is outdated, please log in again")
+
+        user_status = await self.status_cache.get(auth.user_id)
+        if self.status_cache.is_revoked(user_status, auth):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
+        is_active = user_status["is_active"] if user_status and "is_active" in user_status else auth.is_active
+        roles = auth.roles
+        if self.user_crud is not None:
+            # Роли и статус берутся из БД: снятая роль администратора не переживает ротацию
+            user = await self.user_crud.get_auth_by_id(auth.user_id)
+            if not user:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+            is_active, roles = user.is_active, user_roles(user.is_admin)
+
+        new_access_token = await self._generate_token(
+            auth.user_id, ACCESS_TOKEN_TTL, is_active=is_active, roles=roles
+        )
+        if self.token_store is None:
+            return {"access_token": new_access_token}
+
+        new_jti = uuid.uuid4().hex
+        try:
+            rotated = await self.token_store.rotate_refresh(auth.user_id, family_id, jti, new_jti, REFRESH_TOKEN_TTL)
+        except TokenStoreUnavailableError:
+            # Токен остаётся действительным: клиент повторит refresh после восстановления хранилища
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Token store is unavailable, try again later"
+            )
+        if not rotated:
+            logger.warning(f"Повторное использование refresh-токена пользователя {auth.user_id}, семейство {family_id} отозвано")
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked")
+        new_refresh_token = await self._generate_token(
+            auth.user_id, REFRESH_TOKEN_TTL, is_active=is_active, roles=roles,
+            claims={"jti": new_jti, "fid": family_id},
+        )
+        return {"access_token": new_access_token, "refresh_token": new_refresh_token}
+
+    async def revoke_sessions(self, user_ids: Iterable[int]) -> dict:
+        user_ids = sorted(set(user_ids))
+        revoked_before = int(time.time())
+        # Access-токены отзываются через кэш статусов (с копией в БД на случай недоступности Redis),
+        # refresh-токены — в хранилище
+        if self.user_crud is not None:
+            await self.user_crud.revoke_tokens(user_ids, revoked_before)
+        await self.status_cache.revoke_tokens_many(user_ids, revoked_before)
+        revoked = await self.token_store.revoke_users(user_ids) if self.token_store is not None else 0
+        logger.info(f"Отозваны сессии {len(user_ids)} пользователей")
+        return {"users": len(user_ids), "revoked_refresh_tokens": revoked}
\ No newline at end of file
@@ -0,0 +1,238 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from redis.exceptions import WatchError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import TOKEN_STORE_BACKEND
+from app.core.redis import get_redis
+from app.crud.users.token_crud import TokenCRUD
+from app.crud.users.refresh_token_crud import RefreshTokenCRUD
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+
+class TokenStoreUnavailableError(RuntimeError):
+    """Хранилище токенов недоступно, ротацию нельзя выполнить безопасно"""
+
+
+class AbstractTokenStore(ABC):
+    @abstractmethod
+    async def save_tokens(
+        self,
+        user_id: int,
+        access_token: str,
+        refresh_token: str,
+        access_ttl: timedelta,
+        refresh_ttl: timedelta,
+        family_id: Optional[str] = None,
+        jti: Optional[str] = None,
+    ) -> None:
+        """Сохраняет (ротирует) пару токенов пользователя и открывает семейство refresh-токенов"""
+        pass
+
+    @abstractmethod
+    async def get_tokens(self, user_id: int) -> Optional[Dict[str, str]]:
+        """Возвращает действующие токены пользователя"""
+        pass
+
+    @abstractmethod
+    async def revoke(self, user_id: int) -> None:
+        """Отзывает токены пользователя"""
+        pass
+
+    @abstractmethod
+    async def rotate_refresh(
+        self, user_id: int, family_id: str, old_jti: str, new_jti: str, ttl: timedelta
+    ) -> bool:
+        """
+        Заменяет текущий refresh-токен семейства. Возвращает False, если old_jti уже
+        использован или отозван; в этом случае всё семейство отзывается.
+        """
+        pass
+
+    @abstractmethod
+    async def revoke_family(self, user_id: int, family_id: str) -> None:
+        """Отзывает все refresh-токены семейства"""
+        pass
+
+    @abstractmethod
+    async def revoke_users(self, user_ids: Iterable[int]) -> int:
+        """Отзывает все сессии перечисленных пользователей, возвращает число отозванных записей"""
+        pass
+
+
+class SqlTokenStore(AbstractTokenStore):
+    """
+    Хранение токенов в таблице tokens (по одной строке на пользователя)
+    и семейств refresh-токенов в refresh_tokens (ключ — jti).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.token_crud = TokenCRUD(db)
+        self.refresh_token_crud = RefreshTokenCRUD(db)
+
+    async def save_tokens(
+        self, user_id, access_token, refresh_token, access_ttl, refresh_ttl, family_id=None, jti=None
+    ) -> None:
+        await self.token_crud.save_tokens_to_db(user_id, access_token, refresh_token)
+        if jti is not None:
+            await self.refresh_token_crud.create(jti, family_id, user_id, datetime.utcnow() + refresh_ttl)
+
+    async def get_tokens(self, user_id: int) -> Optional[Dict[str, str]]:
+        token_record = await self.token_crud.get_tokens(user_id)
+        if token_record is None:
+            return None
+        return {"access_token": token_record.access_token, "refresh_token": token_record.refresh_token}
+
+    async def revoke(self, user_id: int) -> None:
+        await self.token_crud.delete_tokens(user_id)
+        await self.refresh_token_crud.revoke_users([user_id])
+
+    async def rotate_refresh(self, user_id, family_id, old_jti, new_jti, ttl) -> bool:
+        return await self.refresh_token_crud.rotate(
+            user_id, family_id, old_jti, new_jti, datetime.utcnow() + ttl
+        )
+
+    async def revoke_family(self, user_id: int, family_id: str) -> None:
+        await self.refresh_token_crud.revoke_family(family_id)
+
+    async def revoke_users(self, user_ids: Iterable[int]) -> int:
+        return await self.refresh_token_crud.revoke_users(user_ids)
+
+
+class RedisTokenStore(AbstractTokenStore):
+    """
+    Хранение токенов в Redis: ключи живут ровно столько, сколько токены, ротация
+    и отзыв — одна транзакция MULTI/EXEC без блокировок строк в PostgreSQL.
+
+    Семейство refresh-токенов — ключ с jti текущего токена; множество семейств
+    пользователя позволяет отозвать все его сессии без сканирования.
+    При недоступности Redis сохранение, чтение и отзыв выполняются через
+    fallback-хранилище. Ротация при ошибке Redis не выполняется
+    (TokenStoreUnavailableError): в fallback нет семейств, открытых в Redis,
+    и ротация там приняла бы их за повторное использование. Семейство, которого
+    нет в Redis (открыто в fallback во время сбоя), ротируется в fallback.
+    """
+
+    def __init__(self, fallback: Optional[AbstractTokenStore] = None, key_prefix: str = "tokens:"):
+        self.fallback = fallback
+        self.key_prefix = key_prefix
+
+    def _keys(self, user_id: int):
+        return f"{self.key_prefix}{user_id}:access", f"{self.key_prefix}{user_id}:refresh"
+
+    def _family_key(self, family_id: str) -> str:
+        return f"{self.key_prefix}family:{family_id}"
+
+    def _families_key(self, user_id: int) -> str:
+        return f"{self.key_prefix}{user_id}:families"
+
+    async def _use_fallback(self, operation: str, user_id, error: Exception, *args):
+        if self.fallback is None:
+            raise error
+        logger.warning(f"Redis недоступен, {operation} для пользователя {user_id} выполняется в БД: {error}")
+        return await getattr(self.fallback, operation)(*args)
+
+    async def save_tokens(
+        self, user_id, access_token, refresh_token, access_ttl, refresh_ttl, family_id=None, jti=None
+    ) -> None:
+        access_key, refresh_key = self._keys(user_id)
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                pipe.set(access_key, access_token, ex=access_ttl)
+                pipe.set(refresh_key, refresh_token, ex=refresh_ttl)
+                if jti is not None:
+                    pipe.set(self._family_key(family_id), jti, ex=refresh_ttl)
+                    pipe.sadd(self._families_key(user_id), family_id)
+                    pipe.expire(self._families_key(user_id), refresh_ttl)
+                await pipe.execute()
+        except Exception as e:
+            await self._use_fallback(
+                "save_tokens", user_id, e,
+                user_id, access_token, refresh_token, access_ttl, refresh_ttl, family_id, jti,
+            )
+
+    async def get_tokens(self, user_id: int) -> Optional[Dict[str, str]]:
+        try:
+            access_token, refresh_token = await get_redis().mget(*self._keys(user_id))
+        except Exception as e:
+            return await self._use_fallback("get_tokens", user_id, e, user_id)
+        if access_token is None and refresh_token is None:
+            return None
+        return {"access_token": access_token, "refresh_token": refresh_token}
+
+    async def revoke(self, user_id: int) -> None:
+        await self.revoke_users([user_id])
+
+    async def rotate_refresh(self, user_id, family_id, old_jti, new_jti, ttl) -> bool:
+        family_key = self._family_key(family_id)
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                await pipe.watch(family_key)
+                current_jti = await pipe.get(family_key)
+                if current_jti is None and self.fallback is not None:
+                    # Семейство могло быть открыто в fallback, пока Redis был недоступен
+                    await pipe.unwatch()
+                    return await self.fallback.rotate_refresh(user_id, family_id, old_jti, new_jti, ttl)
+                pipe.multi()
+                if current_jti != old_jti:
+                    # Токен уже ротирован или семейство отозвано: повторное использование
+                    pipe.delete(family_key)
+                    pipe.srem(self._families_key(user_id), family_id)
+                    await pipe.execute()
+                    return False
+                pipe.set(family_key, new_jti, ex=ttl)
+                pipe.expire(self._families_key(user_id), ttl)
+                await pipe.execute()
+                return True
+        except WatchError:
+            # Тот же токен одновременно ротирован другим запросом
+            await self.revoke_family(user_id, family_id)
+            return False
+        except Exception as e:
+            logger.error(f"Redis недоступен, ротация refresh-токена пользователя {user_id} отклонена: {e}")
+            raise TokenStoreUnavailableError("Token store is unavailable") from e
+
+    async def revoke_family(self, user_id: int, family_id: str) -> None:
+        logger.warning(f"Отзыв семейства refresh-токенов {family_id} пользователя {user_id}")
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                pipe.delete(self._family_key(family_id))
+                pipe.srem(self._families_key(user_id), family_id)
+                await pipe.execute()
+        except Exception as e:
+            await self._use_fallback("revoke_family", user_id, e, user_id, family_id)
+
+    async def revoke_users(self, user_ids: Iterable[int]) -> int:
+        user_ids = list(user_ids)
+        try:
+            redis = get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.smembers(self._families_key(user_id))
+                families = await pipe.execute()
+            keys = [self._family_key(family_id) for members in families for family_id in members]
+            keys += [self._families_key(user_id) for user_id in user_ids]
+            keys += [key for user_id in user_ids for key in self._keys(user_id)]
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(*keys)
+                await pipe.execute()
+        except Exception as e:
+            return await self._use_fallback("revoke_users", f"({len(user_ids)} шт.)", e, user_ids)
+        revoked = sum(len(members) for members in families)
+        logger.info(f"Отозвано семейств refresh-токенов: {revoked} для {len(user_ids)} пользователей")
+        if self.fallback is not None:
+            # Семейства, открытые в fallback во время сбоя Redis
+            revoked += await self.fallback.revoke_users(user_ids)
+        return revoked
+
+
+def create_token_store(db: AsyncSession, backend: str = TOKEN_STORE_BACKEND) -> AbstractTokenStore:
+    if backend == "redis":
+        return RedisTokenStore(fallback=SqlTokenStore(db))
+    if backend == "sql":
+        return SqlTokenStore(db)
+    raise ValueError(f"Unknown token store backend: {backend}")
@@ -0,0 +1,213 @@
+import asyncio
+import codecs
+import csv
+import io
+import json
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import USER_EXPORT_BATCH_SIZE, USER_IMPORT_BATCH_SIZE
+from app.core.database import SessionLocal
+from app.crud.users.user_crud import UserCRUD
+from app.schemas.users import UserCreate
+from app.services.password_service import AbstractPasswordHashService, password_hash_service
+from app.notifications.email_outbox import bulk_email_outbox
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+USER_BULK_FORMATS = ("csv", "ndjson")
+USER_EXPORT_COLUMNS = (
+    "id", "username", "email", "phone_number", "first_name", "last_name", "is_active", "created_at",
+)
+# Сколько ошибок по строкам возвращать в отчёте
+MAX_REPORTED_ERRORS = 100
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in USER_BULK_FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}. Expected one of: {', '.join(USER_BULK_FORMATS)}")
+    return fmt
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Разбивает поток байтов на строки, не собирая весь файл в памяти.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], fmt: str
+) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Возвращает (номер строки, запись, ошибка разбора). Первая строка CSV — заголовок;
+    значения с переводом строки внутри кавычек не поддерживаются.
+    """
+    check_format(fmt)
+    header = None
+    line_number = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            yield line_number, record, None
+        elif header is None:
+            header = [name.strip() for name in next(csv.reader([line]))]
+        else:
+            yield line_number, dict(zip(header, next(csv.reader([line])))), None
+
+
+class AbstractUserBulkService(ABC):
+    @abstractmethod
+    async def import_users(self, chunks: AsyncIterator[bytes], fmt: str, send_verification: bool = True) -> dict:
+        """Импортирует пользователей из потока CSV/NDJSON, возвращает отчёт"""
+        pass
+
+    @abstractmethod
+    def export_users(self, fmt: str) -> AsyncIterator[bytes]:
+        """Отдаёт всех пользователей потоком CSV/NDJSON"""
+        pass
+
+
+class UserBulkService(AbstractUserBulkService):
+    """
+    Массовый импорт и экспорт пользователей.
+
+    Импорт идёт пачками: пароли пачки хэшируются параллельно в пуле
+    password_hash_service, пачка вставляется одним INSERT ... ON CONFLICT DO NOTHING,
+    письма с кодами активации добавляются в очередь bulk_email_outbox одной командой.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        hash_service: AbstractPasswordHashService = password_hash_service,
+        import_batch_size: int = USER_IMPORT_BATCH_SIZE,
+        export_batch_size: int = USER_EXPORT_BATCH_SIZE,
+    ):
+        self.user_crud = UserCRUD(db)
+        self.hash_service = hash_service
+        self.import_batch_size = import_batch_size
+        self.export_batch_size = export_batch_size
+
+    async def import_users(self, chunks: AsyncIterator[bytes], fmt: str, send_verification: bool = True) -> dict:
+        logger.info(f"Начало массового импорта пользователей ({fmt})")
+        report = {"total": 0, "created": 0, "skipped": 0, "invalid": 0, "emails_queued": 0, "errors": []}
+        batch: List[Tuple[UserCreate, Dict]] = []
+        async for line_number, record, error in iter_records(chunks, fmt):
+            report["total"] += 1
+            if error is None:
+                try:
+                    batch.append((UserCreate.model_validate(record), record))
+                except ValidationError as e:
+                    error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            if error is not None:
+                report["invalid"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append({"line": line_number, "error": error})
+                continue
+            if len(batch) >= self.import_batch_size:
+                await self._import_batch(batch, send_verification, report)
+                batch = []
+        if batch:
+            await self._import_batch(batch, send_verification, report)
+        logger.info(
+            f"Импорт завершён: создано {report['created']}, пропущено {report['skipped']}, "
+            f"с ошибками {report['invalid']} из {report['total']}"
+        )
+        return report
+
+    async def _import_batch(self, batch: List[Tuple[UserCreate, Dict]], send_verification: bool, report: dict) -> None:
+        hashed_passwords = await asyncio.gather(*(self.hash_service.hash(user.password) for user, _ in batch))
+        rows = [
+            {
+                "username": user.username,
+                "email": user.email,
+                "phone_number": user.phone_number,
+                "first_name": record.get("first_name") or None,
+                "last_name": record.get("last_name") or None,
+                "hashed_password": hashed_password,
+                "activation_code": str(uuid.uuid4())[:4],
+                "is_active": False,
+            }
+            for (user, record), hashed_password in zip(batch, hashed_passwords)
+        ]
+        inserted = await self.user_crud.bulk_insert_users(rows)
+        report["created"] += len(inserted)
+        report["skipped"] += len(rows) - len(inserted)
+        if send_verification and inserted:
+            report["emails_queued"] += await self._queue_verification_emails(inserted)
+
+    @staticmethod
+    async def _queue_verification_emails(users: List[Dict]) -> int:
+        try:
+            await bulk_email_outbox.enqueue([
+                {
+                    "recipients": [user["email"]],
+                    "subject": "MyReception - Activation Code",
+                    "body": f"Ваш код активации: {user['activation_code']}",
+                    "subtype": "plain",
+                }
+                for user in users
+            ])
+        except Exception as e:
+            # Пользователи уже сохранены: код можно запросить повторно через /send-verification-code
+            logger.error(f"Не удалось поставить в очередь {len(users)} писем с кодами активации: {e}")
+            return 0
+        return len(users)
+
+    async def export_users(self, fmt: str) -> AsyncIterator[bytes]:
+        check_format(fmt)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(USER_EXPORT_COLUMNS)
+        rows = 0
+        async for user in self.user_crud.stream_users(USER_EXPORT_COLUMNS, self.export_batch_size):
+            values = {key: value.isoformat() if isinstance(value, datetime) else value for key, value in user.items()}
+            if fmt == "csv":
+                writer.writerow(values[column] for column in USER_EXPORT_COLUMNS)
+            else:
+                buffer.write(json.dumps(values, ensure_ascii=False) + "\n")
+            rows += 1
+            if rows % self.export_batch_size == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        logger.info(f"Экспортировано пользователей: {rows} ({fmt})")
+
+
+async def export_users_stream(fmt: str, session_factory=SessionLocal) -> AsyncIterator[bytes]:
+    """
+    Экспорт с собственной сессией: она должна жить, пока отдаётся потоковый ответ,
+    то есть дольше зависимости get_db.
+    """
+    async with session_factory() as session:
+        async for chunk in UserBulkService(session).export_users(fmt):
+            yield chunk
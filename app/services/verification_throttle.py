@@ -0,0 +1,70 @@
+import math
+import time
+
+from app.core.cache import TTLCache
+from app.core.config import VERIFICATION_RESEND_WINDOW
+from app.core.redis import get_redis
+from app.logs.logger import Logger
+
+logger = Logger.setup_logger()
+
+
+class VerificationCodeThrottle:
+    """
+    Окно повторной отправки кода подтверждения по email. Пока окно открыто,
+    повторный запрос не меняет код в БД и не ставит новое письмо в очередь.
+
+    Окно — ключ SET NX EX в Redis, общий для всех воркеров; если Redis
+    недоступен, окно ведётся в памяти процесса.
+    """
+
+    def __init__(self, window: int = VERIFICATION_RESEND_WINDOW, maxsize: int = 10000, key_prefix: str = "verification:sent:"):
+        self.window = window
+        self.key_prefix = key_prefix
+        self.local = TTLCache(maxsize=maxsize, ttl=window)
+
+    def _key(self, email: str) -> str:
+        return f"{self.key_prefix}{email.strip().lower()}"
+
+    def _local_pending(self, key: str) -> int:
+        expires_at = self.local.get(key)
+        return max(0, math.ceil(expires_at - time.monotonic())) if expires_at else 0
+
+    async def pending(self, email: str) -> int:
+        """
+        Сколько секунд осталось до возможности повторной отправки (0 — можно отправлять).
+        """
+        key = self._key(email)
+        try:
+            return max(0, await get_redis().ttl(key))
+        except Exception as e:
+            logger.warning(f"Redis недоступен для окна отправки кода, используется память процесса: {e}")
+            return self._local_pending(key)
+
+    async def acquire(self, email: str) -> bool:
+        """
+        Открывает окно; False — окно уже открыто другим запросом.
+        """
+        key = self._key(email)
+        try:
+            return bool(await get_redis().set(key, 1, nx=True, ex=self.window))
+        except Exception as e:
+            logger.warning(f"Redis недоступен для окна отправки кода, используется память процесса: {e}")
+            if self._local_pending(key):
+                return False
+            self.local.set(key, time.monotonic() + self.window)
+            return True
+
+    async def release(self, email: str) -> None:
+        """
+        Закрывает окно, если код так и не был отправлен.
+        """
+        key = self._key(email)
+        self.local.pop(key)
+        try:
+            await get_redis().delete(key)
+        except Exception as e:
+            logger.warning(f"Не удалось снять окно отправки кода в Redis: {e}")
+
+
+verification_code_throttle = VerificationCodeThrottle()
@@ -0,0 +1,171 @@
+"""
+Локальное окружение для нагрузочных тестов: SQLite (или временный Postgres)
+вместо основной базы и in-memory MongoDB вместо чатов и логов.
+"""
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Значения по умолчанию для переменных, без которых приложение не импортируется.
+_BENCHMARK_ENV_DEFAULTS = {
+    "SECRET_KEY": "benchmark-secret",
+    "ALGORITHM": "HS256",
+    "API_KEY": "benchmark-api-key",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "15",
+    "REFRESH_TOKEN_EXPIRE_DAYS": "7",
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "MAIL_USERNAME": "benchmark",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+    "MAIL_PORT": "587",
+    "MAIL_SERVER": "localhost",
+    "MONGO_URI": "mongodb://localhost:27017",
+    "DATABASE_NAME": "benchmark_logs",
+    "COLLECTION_NAME": "logs",
+    "CHAT_DATABASE_NAME": "benchmark_chat",
+    "CHAT_PUBSUB_BACKEND": "memory",
+}
+for _name, _value in _BENCHMARK_ENV_DEFAULTS.items():
+    os.environ.setdefault(_name, _value)
+
+import httpx  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+from sqlalchemy import update  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.database import Base, get_db, mongodb  # noqa: E402
+from app.core.security import API_KEY  # noqa: E402
+from app.logs.logger import Logger  # noqa: E402
+from app.models.users import User  # noqa: E402
+from app.models.business_card import BusinessCard  # noqa: E402
+from app.services.chat_service.chat_broadcaster import InMemoryPubSubBackend, chat_broadcaster  # noqa: E402
+
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+class BenchmarkEnvironment:
+    """
+    Поднимает приложение на локальных заменах внешних сервисов и готовит тестовые данные:
+    активных пользователей с токенами, чаты между ними и бизнес-карточку.
+    """
+
+    def __init__(self, database_url: Optional[str] = None, users: int = 20):
+        self._tmpdir = None
+        if database_url is None:
+            self._tmpdir = tempfile.TemporaryDirectory()
+            database_url = f"sqlite+aiosqlite:///{self._tmpdir.name}/benchmark.db"
+        self.database_url = database_url
+        self.user_count = users
+        self.engine = None
+        self.client: Optional[httpx.AsyncClient] = None
+        self.users: List[Dict] = []
+        self.chats: List[str] = []
+        self.card_subdomain = "benchmark-salon"
+
+    async def __aenter__(self) -> "BenchmarkEnvironment":
+        connect_args = {"timeout": 30} if self.database_url.startswith("sqlite") else {}
+        self.engine = create_async_engine(self.database_url, connect_args=connect_args)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_get_db():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.session_factory = session_factory
+
+        mongo_client = AsyncMongoMockClient()
+        mongodb.client = mongo_client
+        mongodb.db = mongo_client[os.environ["CHAT_DATABASE_NAME"]]
+        chat_broadcaster.backend = InMemoryPubSubBackend()
+        # Логи пишутся в in-memory MongoDB, чтобы их стоимость оставалась в замерах.
+        Logger.setup_logger()
+        Logger._handler._collection = mongo_client["benchmark_logs"]["logs"]
+
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://benchmark",
+            headers={"x-api-key": API_KEY},
+            timeout=60,
+        )
+        await self._seed()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.client.aclose()
+        app.dependency_overrides.pop(get_db, None)
+        await Logger.shutdown()
+        await self.engine.dispose()
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+
+    async def _seed(self) -> None:
+        for i in range(self.user_count):
+            username = f"bench_user_{i}"
+            response = await self.client.post("/api/v1/register", json=self.register_payload(username, i))
+            response.raise_for_status()
+
+        async with self.session_factory() as session:
+            await session.execute(update(User).values(is_active=True))
+            await session.commit()
+
+        for i in range(self.user_count):
+            username = f"bench_user_{i}"
+            response = await self.client.post("/api/v1/login", json=self.login_payload(username))
+            response.raise_for_status()
+            tokens = response.json()
+            self.users.append({"username": username, **tokens})
+
+        async with self.session_factory() as session:
+            result = await session.execute(User.__table__.select().order_by(User.id))
+            for user, row in zip(self.users, result.mappings()):
+                user["id"] = row["id"]
+            session.add(BusinessCard(
+                user_id=self.users[0]["id"],
+                subdomain=self.card_subdomain,
+                title="Benchmark salon",
+                description="Benchmark business card",
+                links="https://example.com",
+            ))
+            await session.commit()
+
+        for i, user in enumerate(self.users):
+            partner = self.users[(i + 1) % len(self.users)]
+            response = await self.client.post(
+                "/api/v1/chats/", json={"participants": [partner["id"]]}, headers=self.auth_headers(i)
+            )
+            response.raise_for_status()
+            self.chats.append(response.json()["chat_id"])
+
+    def auth_headers(self, user_index: int) -> Dict[str, str]:
+        user = self.users[user_index % len(self.users)]
+        return {"Authorization": f"Bearer {user['access_token']}"}
+
+    @staticmethod
+    def register_payload(username: str, index: int) -> Dict:
+        return {
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": BENCHMARK_PASSWORD,
+            "phone_number": f"+1{index:010d}",
+        }
+
+    @staticmethod
+    def login_payload(username: str) -> Dict:
+        return {
+            "username": username,
+            "password": BENCHMARK_PASSWORD,
+            "device_model": "benchmark",
+            "os_version": "1.0",
+            "ip_address": "127.0.0.1",
+            "device_time": datetime.utcnow().isoformat(),
+            "latitude": 0.0,
+            "longitude": 0.0,
+        }
@@ -0,0 +1,225 @@
+"""
+Нагрузочный тест основных эндпоинтов API.
+
+Запуск:
+    python -m tests.benchmarks.run --concurrency 20 --requests 200
+    python -m tests.benchmarks.run --endpoints login,profile --save-baseline before
+    python -m tests.benchmarks.run --compare before
+
+По умолчанию используется временная SQLite-база и in-memory MongoDB; для замеров на
+Postgres передайте --database-url postgresql+asyncpg://... (база будет пересоздана).
+Для каждого эндпоинта выводятся p50/p95/p99 задержки и число запросов в секунду.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from tests.benchmarks.environment import BenchmarkEnvironment
+
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+Scenario = Callable[[BenchmarkEnvironment, int], Awaitable[httpx.Response]]
+
+
+async def _register(env: BenchmarkEnvironment, i: int) -> httpx.Response:
+    username = f"bench_new_{time.time_ns()}_{i}"
+    return await env.client.post("/api/v1/register", json=env.register_payload(username, 10_000_000 + i))
+
+
+async def _login(env: BenchmarkEnvironment, i: int) -> httpx.Response:
+    user = env.users[i % len(env.users)]
+    return await env.client.post("/api/v1/login", json=env.login_payload(user["username"]))
+
+
+async def _refresh(env: BenchmarkEnvironment, i: int) -> httpx.Response:
+    user = env.users[i % len(env.users)]
+    # Refresh-токен одноразовый: запросы одного пользователя идут последовательно с ротацией
+    async with user.setdefault("refresh_lock", asyncio.Lock()):
+        response = await env.client.post("/api/v1/refresh", json={"refresh_token": user["refresh_token"]})
+        if response.status_code == 200:
+            user["refresh_token"] = response.json().get("refresh_token", user["refresh_token"])
+    return response
+
+
+async def _profile(env: BenchmarkEnvironment, i: int) -> httpx.Response:
+    return await env.client.get("/api/v1/profile", headers=env.auth_headers(i))
+
+
+async def _send_message(env: BenchmarkEnvironment, i: int) -> httpx.Response:
+    user_index = i % len(env.users)
+    return await env.client.post(
+        f"/api/v1/chats/{env.chats[user_index]}/messages/",
+        json={"sender_id": env.users[user_index]["id"], "message": f"benchmark message {i}"},
+        headers=env.auth_headers(user_index),
+    )
+
+
+async def _view_messages(env: BenchmarkEnvironment, i: int) -> httpx.Response:
+    user_index = i % len(env.users)
+    return await env.client.post(
+        f"/api/v1/chats/{env.chats[user_index]}/messages/view/", headers=env.auth_headers(user_index)
+    )
+
+
+async def _list_chats(env: BenchmarkEnvironment, i: int) -> httpx.Response:
+    return await env.client.get("/api/v1/chats/", headers=env.auth_headers(i))
+
+
+async def _business_card(env: BenchmarkEnvironment, i: int) -> httpx.Response:
+    return await env.client.get(f"/api/v1/business-card/{env.card_subdomain}")
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "register": _register,
+    "login": _login,
+    "refresh": _refresh,
+    "profile": _profile,
+    "chat_send": _send_message,
+    "chat_view": _view_messages,
+    "chat_list": _list_chats,
+    "business_card": _business_card,
+}
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """
+    Перцентиль методом ближайшего ранга.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(percent / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(env: BenchmarkEnvironment, scenario: Scenario, requests: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            started = time.perf_counter()
+            try:
+                response = await scenario(env, i)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def run_benchmarks(
+    endpoints: List[str], requests: int, concurrency: int, users: int, database_url: Optional[str]
+) -> Dict[str, Dict]:
+    results = {}
+    async with BenchmarkEnvironment(database_url=database_url, users=users) as env:
+        for name in endpoints:
+            results[name] = await run_scenario(env, SCENARIOS[name], requests, concurrency)
+            print(format_row(name, results[name]), flush=True)
+    return results
+
+
+def format_row(name: str, result: Dict, baseline: Optional[Dict] = None) -> str:
+    row = (
+        f"{name:<14} {result['requests']:>7} {result['errors']:>6} {result['rps']:>9.1f} "
+        f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+    )
+    if baseline:
+        deltas = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            if baseline.get(key):
+                deltas.append(f"{key} {100 * (result[key] - baseline[key]) / baseline[key]:+.1f}%")
+        row += "   vs baseline: " + ", ".join(deltas)
+    return row
+
+
+HEADER = f"{'endpoint':<14} {'reqs':>7} {'errors':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+
+
+def save_baseline(name: str, results: Dict, args: argparse.Namespace) -> Path:
+    BASELINES_DIR.mkdir(exist_ok=True)
+    path = BASELINES_DIR / f"{name}.json"
+    payload = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "database": "sqlite" if args.database_url is None else args.database_url.split(":", 1)[0],
+        },
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False))
+    return path
+
+
+def load_baseline(name: str) -> Dict:
+    return json.loads((BASELINES_DIR / f"{name}.json").read_text())["results"]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="MyReception API benchmark")
+    parser.add_argument("--endpoints", default=",".join(SCENARIOS), help="Список эндпоинтов через запятую")
+    parser.add_argument("--requests", type=int, default=200, help="Запросов на эндпоинт")
+    parser.add_argument("--concurrency", type=int, default=10, help="Одновременных клиентов")
+    parser.add_argument("--users", type=int, default=20, help="Подготовленных пользователей")
+    parser.add_argument("--database-url", default=None, help="URL базы (по умолчанию временная SQLite)")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Сохранить результаты как baseline")
+    parser.add_argument("--compare", metavar="NAME", help="Сравнить с сохранённым baseline")
+    args = parser.parse_args(argv)
+    unknown = set(args.endpoints.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    endpoints = args.endpoints.split(",")
+    print(HEADER)
+    results = asyncio.run(
+        run_benchmarks(endpoints, args.requests, args.concurrency, args.users, args.database_url)
+    )
+
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        print(f"\nСравнение с baseline '{args.compare}':")
+        print(HEADER)
+        for name, result in results.items():
+            print(format_row(name, result, baseline.get(name)))
+
+    if args.save_baseline:
+        path = save_baseline(args.save_baseline, results, args)
+        print(f"\nBaseline сохранён: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,15 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from httpx import AsyncClient
+from mongomock_motor import AsyncMongoMockClient
 
 from app.main import app
 from app.core.database import Base, get_db
+from app.logs.logger import Logger
+
+# Логи приложения в тестах пишутся в in-memory MongoDB
+Logger.setup_logger()
+Logger._handler._collection = AsyncMongoMockClient()["test_logs"]["logs"]
 
 # Настройки тестовой базы данных
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
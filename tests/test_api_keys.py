@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+from app.core.api_keys import ApiKeyError, ApiKeyRateLimitError, ApiKeyRegistry, hash_api_key
+
+
+def test_registry_accepts_all_active_keys_and_counts_usage(tmp_path):
+    """
+    Принимаются ключ по умолчанию, ключи из API_KEYS и из файла (в том числе заданные только хэшем).
+    """
+    keys_file = tmp_path / "keys.json"
+    keys_file.write_text(json.dumps([{"name": "mobile", "key_sha256": hash_api_key("mobile-key")}]))
+    registry = ApiKeyRegistry(default_key="main-key", keys="web:web-key", keys_file=str(keys_file))
+
+    assert registry.authenticate("main-key").name == "default"
+    assert registry.authenticate("web-key").name == "web"
+    assert registry.authenticate("mobile-key").name == "mobile"
+    with pytest.raises(ApiKeyError):
+        registry.authenticate("unknown")
+
+    stats = registry.stats()
+    assert {key["name"]: key["requests"] for key in stats["keys"]} == {"default": 1, "web": 1, "mobile": 1}
+    assert stats["unknown"] == 1
+
+
+def test_rate_limit_and_rotation_without_restart(tmp_path):
+    """
+    Лимит ключа ограничивает запросы в минуту; после reload новый ключ работает, а удалённый — нет.
+    """
+    keys_file = tmp_path / "keys.json"
+    keys_file.write_text(json.dumps([{"name": "partner", "key": "old-key", "rate_limit": 2}]))
+    registry = ApiKeyRegistry(keys="", keys_file=str(keys_file))
+
+    registry.authenticate("old-key")
+    registry.authenticate("old-key")
+    with pytest.raises(ApiKeyRateLimitError):
+        registry.authenticate("old-key")
+
+    keys_file.write_text(json.dumps([{"name": "partner", "key": "new-key"}]))
+    assert registry.reload() == 1
+    assert registry.authenticate("new-key").name == "partner"
+    with pytest.raises(ApiKeyError):
+        registry.authenticate("old-key")
+
+
+def test_workers_pick_up_rotated_file_and_env_keys(tmp_path, monkeypatch):
+    """
+    Каждый реестр (воркер) сам перечитывает изменившийся файл ключей; reload берёт API_KEYS из окружения.
+    """
+    keys_file = tmp_path / "keys.json"
+    keys_file.write_text(json.dumps([{"name": "partner", "key": "old-key"}]))
+    workers = [ApiKeyRegistry(keys_file=str(keys_file), check_interval=0) for _ in range(2)]
+
+    keys_file.write_text(json.dumps([{"name": "partner", "key": "new-key"}]))
+    mtime = os.stat(keys_file).st_mtime_ns + 1_000_000_000
+    os.utime(keys_file, ns=(mtime, mtime))
+    for registry in workers:
+        assert registry.authenticate("new-key").name == "partner"
+        with pytest.raises(ApiKeyError):
+            registry.authenticate("old-key")
+
+    keys_file.write_text("[")
+    os.utime(keys_file, ns=(mtime + 1_000_000_000, mtime + 1_000_000_000))
+    assert workers[0].authenticate("new-key").name == "partner"
+
+    monkeypatch.setenv("API_KEYS", "web:web-key")
+    keys_file.unlink()
+    assert workers[1].reload() == 1
+    assert workers[1].authenticate("web-key").name == "web"
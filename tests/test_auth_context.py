@@ -0,0 +1,156 @@
+import time
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import auth_context
+from app.core.auth_context import AuthContext, UserStatusCache
+from app.core.database import Base
+from app.crud.users.user_crud import UserCRUD
+from app.models.users import User
+from app.core.security import JWTAuth, UserStatusChecker, jwt_bearer
+from app.services.token_service import TokenService
+
+
+class FailingSession:
+    async def execute(self, *args, **kwargs):
+        raise AssertionError("Проверка статуса не должна обращаться к БД")
+
+
+@pytest_asyncio.fixture
+async def sql_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(User(id=1, username="oleg", email="oleg@example.com", is_active=False))
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+async def auth_from_token(token_service: TokenService, **claims) -> AuthContext:
+    token = await token_service._generate_token(1, **claims)
+    payload = jwt_bearer.jwt_backend.decode(token, jwt_bearer.secret_key)
+    return AuthContext.from_subject(payload["subject"])
+
+
+@pytest.mark.asyncio
+async def test_active_claim_skips_database():
+    """
+    Для токена с is_active=True проверка статуса проходит без запроса к БД.
+    """
+    status_cache = UserStatusCache(maxsize=10, ttl=60)
+    auth = await auth_from_token(TokenService(status_cache=status_cache), is_active=True)
+
+    assert auth.user_id == 1
+    assert auth.roles == ["user"]
+    await UserStatusChecker(status_cache).check_user_active(1, FailingSession(), auth)
+
+
+@pytest.mark.asyncio
+async def test_deactivation_and_revocation_override_claims():
+    """
+    Деактивация и отзыв токенов из кэша статусов имеют приоритет над claims токена.
+    """
+    status_cache = UserStatusCache(maxsize=10, ttl=60)
+    checker = UserStatusChecker(status_cache)
+    auth = await auth_from_token(TokenService(status_cache=status_cache), is_active=True)
+
+    await status_cache.set_active(1, False)
+    with pytest.raises(HTTPException) as exc:
+        await checker.check_user_active(1, FailingSession(), auth)
+    assert exc.value.status_code == 403
+
+    await status_cache.set_active(1, True)
+    auth.issued_at = int(time.time()) - 10
+    await status_cache.revoke_tokens(1)
+    with pytest.raises(HTTPException) as exc:
+        await checker.check_user_active(1, FailingSession(), auth)
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_revocation_covers_tokens_issued_in_same_second():
+    """
+    Токен, выпущенный в ту же секунду, что и отзыв, тоже считается отозванным.
+    """
+    status_cache = UserStatusCache(maxsize=10, ttl=60)
+    auth = await auth_from_token(TokenService(status_cache=status_cache), is_active=True)
+    await status_cache.revoke_tokens(1)
+    auth.issued_at = (await status_cache.get(1))["revoked_before"]
+
+    with pytest.raises(HTTPException) as exc:
+        await UserStatusChecker(status_cache).check_user_active(1, FailingSession(), auth)
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_unavailable_redis_falls_back_to_database(sql_session, monkeypatch):
+    """
+    Если Redis недоступен, статус проверяется по БД, а не по claim is_active из токена.
+    """
+    def broken_redis():
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(auth_context, "get_redis", broken_redis)
+    status_cache = UserStatusCache(maxsize=10, ttl=60, use_redis=True)
+    auth = await auth_from_token(TokenService(status_cache=status_cache), is_active=True)
+
+    assert await status_cache.get(1) is None
+    with pytest.raises(HTTPException) as exc:
+        await UserStatusChecker(status_cache).check_user_active(1, sql_session, auth)
+    assert exc.value.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_role_check_rejects_revoked_and_deactivated_admins():
+    """
+    Проверка ролей сначала учитывает отзыв токенов и деактивацию, а не только claim roles.
+    """
+    status_cache = UserStatusCache(maxsize=10, ttl=60)
+    require_admin = JWTAuth().require_roles("admin", status_checker=UserStatusChecker(status_cache))
+    auth = await auth_from_token(TokenService(status_cache=status_cache), is_active=True, roles=["user", "admin"])
+    assert await require_admin(auth=auth, db=FailingSession()) is auth
+
+    await status_cache.set_active(1, False)
+    with pytest.raises(HTTPException) as exc:
+        await require_admin(auth=auth, db=FailingSession())
+    assert exc.value.status_code == 403
+
+    await status_cache.set_active(1, True)
+    await status_cache.revoke_tokens(1)
+    with pytest.raises(HTTPException) as exc:
+        await require_admin(auth=auth, db=FailingSession())
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_revocation_survives_redis_outage(sql_session, monkeypatch):
+    """
+    Отзыв сессий при недоступном Redis не теряет прежних полей статуса в процессе
+    и проверяется по БД в других воркерах, где статус неизвестен.
+    """
+    def broken_redis():
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(auth_context, "get_redis", broken_redis)
+    await sql_session.execute(update(User).where(User.id == 1).values(is_active=True))
+    await sql_session.commit()
+    status_cache = UserStatusCache(maxsize=10, ttl=60, use_redis=True)
+    token_service = TokenService(status_cache=status_cache, user_crud=UserCRUD(sql_session))
+    auth = await auth_from_token(token_service, is_active=True)
+
+    await status_cache.set_active(1, False)
+    await token_service.revoke_sessions([1])
+    status = status_cache.local.get(1)
+    assert status["is_active"] is False and status["revoked_before"] >= auth.issued_at
+
+    other_worker = UserStatusCache(maxsize=10, ttl=60, use_redis=True)
+    with pytest.raises(HTTPException) as exc:
+        await UserStatusChecker(other_worker).check_user_active(1, sql_session, auth)
+    assert exc.value.status_code == 401
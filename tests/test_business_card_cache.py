@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from fakeredis import aioredis
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.users import User
+from app.schemas.business_card import BusinessCardCreate
+from app.services.business_card import card_cache
+from app.services.business_card.business_card_service import BusinessCardService
+from app.services.business_card.card_cache import BusinessCardCache, etag_matches
+
+
+@pytest_asyncio.fixture
+async def sql_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(User(id=1, username="salon", email="salon@example.com", phone_number="+10000000000"))
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+def card(subdomain: str, title: str) -> BusinessCardCreate:
+    return BusinessCardCreate(subdomain=subdomain, title=title, description="Салон", links="")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once_and_writes_refresh_cache(sql_session, monkeypatch):
+    """
+    Всплеск запросов к одной карточке даёт одну загрузку из БД; изменение карточки обновляет кэш и ETag.
+    """
+    redis = aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(card_cache, "get_redis", lambda: redis)
+    service = BusinessCardService(sql_session, cache=BusinessCardCache(maxsize=10, ttl=60, use_redis=True))
+    await service.create_or_update_card(1, card("salon", "Old"))
+    await service.cache.invalidate("salon")
+
+    cards = await asyncio.gather(*(service.get_public_card("salon") for _ in range(20)))
+    assert service.cache.loads == 1 and len({c.etag for c in cards}) == 1
+
+    await service.create_or_update_card(1, card("salon-new", "New"))
+    assert await service.get_public_card("salon") is None
+    updated = await service.get_card_by_subdomain("salon-new")
+    assert updated.title == "New" and service.cache.loads == 2
+    assert (await service.get_public_card("salon-new")).etag != cards[0].etag
+    assert await redis.get("business_card:salon") is None
+
+
+def test_if_none_match_accepts_lists_and_weak_tags():
+    """
+    If-None-Match совпадает с ETag из списка, со слабым тегом и с "*".
+    """
+    etag = '"abc"'
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"x"', etag) and not etag_matches(None, etag)
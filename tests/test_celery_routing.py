@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import fakeredis
+from kombu import Connection
+from kombu.transport import redis as kombu_redis
+
+from app.celery.celery_app import (
+    PRIORITY_URGENT,
+    QUEUE_AUTH,
+    QUEUE_BULK,
+    celery_app,
+    configure_worker_concurrency,
+    worker_concurrency_for,
+)
+from app.celery.celery_tasks import flush_email_outbox_task, send_email_batch_task, send_verification_email_task
+from app.notifications.email_outbox import bulk_email_outbox
+
+
+def test_tasks_are_routed_to_priority_lanes_with_limits():
+    """
+    Коды подтверждения уходят в очередь auth, массовая отправка — в bulk с ограничением частоты.
+    """
+    route = celery_app.amqp.router.route({}, send_verification_email_task.name)
+    assert route["queue"].name == QUEUE_AUTH and route["priority"] == PRIORITY_URGENT
+    assert celery_app.amqp.router.route({}, send_email_batch_task.name)["queue"].name == QUEUE_BULK
+
+    annotations = celery_app.conf.task_annotations
+    assert annotations[send_email_batch_task.name]["rate_limit"]
+    assert annotations[send_verification_email_task.name]["soft_time_limit"] < annotations[send_email_batch_task.name]["soft_time_limit"]
+
+
+def test_worker_concurrency_is_sum_of_queue_sizes():
+    """
+    Воркер с несколькими очередями получает сумму их размеров, явный --concurrency не меняется.
+    """
+    assert worker_concurrency_for(["auth", "notifications"], "auth=4,notifications=3") == 7
+    assert worker_concurrency_for(["unknown"], "auth=4") == 1
+
+    conf = SimpleNamespace(worker_concurrency=None)
+    configure_worker_concurrency(conf=conf, options={"queues": "auth,bulk", "concurrency": None})
+    assert conf.worker_concurrency == worker_concurrency_for(["auth", "bulk"])
+
+    configure_worker_concurrency(conf=conf, options={"queues": ["auth"], "concurrency": 16})
+    assert conf.worker_concurrency == worker_concurrency_for(["auth", "bulk"])
+
+
+def test_urgent_tasks_are_consumed_first_from_redis(monkeypatch):
+    """
+    В брокере Redis код подтверждения забирается из очереди раньше поставленной до него обычной задачи.
+    """
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        kombu_redis.Channel, "_create_client", lambda self, asynchronous=False: fakeredis.FakeStrictRedis(server=server)
+    )
+    with Connection("redis://localhost/0", transport_options=celery_app.conf.broker_transport_options) as connection:
+        with celery_app.amqp.Producer(connection) as producer:
+            celery_app.send_task(
+                flush_email_outbox_task.name, args=["bulk"], queue=QUEUE_AUTH,
+                priority=bulk_email_outbox.priority, producer=producer,
+            )
+            celery_app.send_task(send_verification_email_task.name, args=["oleg@example.com"], producer=producer)
+
+        channel = connection.default_channel
+        consumed = [channel.basic_get(QUEUE_AUTH, no_ack=True).headers["task"] for _ in range(2)]
+    assert consumed == [send_verification_email_task.name, flush_email_outbox_task.name]
@@ -0,0 +1,209 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson.objectid import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from app.core.database import mongodb
+from app.core.mongo_indexes import CHAT_INDEXES, apply_indexes
+from app.services.chat_service import ChatService, ChatNotFoundError, ChatAccessDeniedError
+from app.services.chat_service.message_service import MessageService
+from app.services.chat_service.membership_cache import chat_membership_cache
+from app.services.chat_service.migrations import migrate_embedded_messages
+
+
+@pytest.fixture
+def chat_db(monkeypatch):
+    """
+    Подменяет базу чатов на in-memory MongoDB.
+    """
+    db = AsyncMongoMockClient()["test_chat"]
+    monkeypatch.setattr(mongodb, "db", db)
+    chat_membership_cache.local.clear()
+    return db
+
+
+@pytest.mark.asyncio
+async def test_messages_are_split_into_buckets(chat_db):
+    """
+    Сообщения раскладываются по бакетам фиксированного размера и читаются по порядку.
+    """
+    service = ChatService()
+    service.message_service = MessageService(bucket_size=3)
+    chat_id = (await service.create_chat([1, 2]))["chat_id"]
+
+    for i in range(7):
+        await service.add_message(chat_id, 1, f"message {i}")
+
+    counts = [b["count"] async for b in chat_db["message_buckets"].find({"chat_id": chat_id})]
+    assert sorted(counts) == [1, 3, 3]
+
+    page = await service.get_messages(chat_id)
+    assert [m["message"] for m in page["messages"]] == [f"message {i}" for i in range(7)]
+    assert page["has_more"] is False
+
+    chat = await chat_db["chats"].find_one({})
+    assert "messages" not in chat
+
+
+@pytest.mark.asyncio
+async def test_each_chat_has_one_open_bucket(chat_db):
+    """
+    Запись идёт в единственный открытый бакет; заполненный, но не закрытый бакет закрывается следующей записью.
+    """
+    await apply_indexes(chat_db, CHAT_INDEXES)
+    service = MessageService(bucket_size=3)
+    await asyncio.gather(*(service.save_message("chat", 1, f"message {i}") for i in range(7)))
+
+    buckets = await chat_db["message_buckets"].find({}).sort("first_id", 1).to_list(length=None)
+    assert [b["count"] for b in buckets] == [3, 3, 1]
+    assert [b.get("open_chat_id") for b in buckets] == [None, None, "chat"]
+
+    # Сбой между заполнением бакета и его закрытием
+    await chat_db["message_buckets"].update_one({"_id": buckets[-1]["_id"]}, {"$set": {"count": 3}})
+    await service.save_message("chat", 1, "after crash")
+    open_buckets = await chat_db["message_buckets"].find({"open_chat_id": "chat"}).to_list(length=None)
+    assert len(open_buckets) == 1 and open_buckets[0]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_migration_moves_embedded_messages(chat_db):
+    """
+    Миграция переносит встроенный массив сообщений в бакеты и удаляет его из чата.
+    """
+    sent_at = datetime(2024, 1, 1)
+    legacy = [{"sender_id": 1, "message": f"old {i}", "timestamp": sent_at} for i in range(5)]
+    result = await chat_db["chats"].insert_one({"participants": [1, 2], "messages": legacy})
+    chat_id = str(result.inserted_id)
+    # Сообщение, отправленное после выкладки, но до миграции, остаётся последним
+    await MessageService(bucket_size=2).save_message(chat_id, 2, "new")
+
+    stats = await migrate_embedded_messages(MessageService(bucket_size=2))
+    # Повторный запуск не должен дублировать сообщения.
+    await migrate_embedded_messages(MessageService(bucket_size=2))
+
+    assert stats == {"chats": 1, "messages": 5}
+    assert await chat_db["message_buckets"].count_documents({"chat_id": chat_id, "migrated": True}) == 3
+    chat = await chat_db["chats"].find_one({"_id": result.inserted_id})
+    assert "messages" not in chat
+
+    page = await ChatService().get_messages(chat_id)
+    assert [m["message"] for m in page["messages"]] == [f"old {i}" for i in range(5)] + ["new"]
+    assert ObjectId(page["messages"][0]["message_id"]).generation_time.year == 2024
+
+
+@pytest.mark.asyncio
+async def test_messages_keyset_pagination(chat_db):
+    """
+    Курсоры before/after позволяют листать историю страницами фиксированного размера.
+    """
+    service = ChatService()
+    service.message_service = MessageService(bucket_size=4)
+    chat_id = (await service.create_chat([1, 2]))["chat_id"]
+    for i in range(10):
+        await service.add_message(chat_id, 1, f"message {i}")
+
+    latest = await service.get_messages(chat_id, limit=3)
+    assert [m["message"] for m in latest["messages"]] == ["message 7", "message 8", "message 9"]
+    assert latest["has_more"] is True
+
+    older = await service.get_messages(chat_id, before=latest["before"], limit=5)
+    assert [m["message"] for m in older["messages"]] == [f"message {i}" for i in range(2, 7)]
+
+    oldest = await service.get_messages(chat_id, before=older["before"], limit=5)
+    assert [m["message"] for m in oldest["messages"]] == ["message 0", "message 1"]
+    assert oldest["has_more"] is False
+
+    newer = await service.get_messages(chat_id, after=oldest["after"], limit=2)
+    assert [m["message"] for m in newer["messages"]] == ["message 2", "message 3"]
+    assert newer["has_more"] is True
+
+    with pytest.raises(ValueError):
+        await service.get_messages(chat_id, before="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_pages_include_messages_from_overlapping_buckets(chat_db):
+    """
+    Два незаполненных бакета с чередующимися сообщениями дают страницы без пропусков.
+    """
+    ids = [ObjectId() for _ in range(6)]
+    service = MessageService(bucket_size=10)
+    for bucket_ids in (ids[0::2], ids[1::2]):
+        messages = [{"_id": i, "sender_id": 1, "message": f"m{ids.index(i)}"} for i in bucket_ids]
+        bucket = service.build_buckets("chat", messages)[0]
+        await chat_db["message_buckets"].insert_one(bucket)
+
+    newest = await service.get_chat_messages("chat", limit=2)
+    assert [m["message"] for m in newest["messages"]] == ["m4", "m5"] and newest["has_more"]
+    older = await service.get_chat_messages("chat", before=newest["before"], limit=3)
+    assert [m["message"] for m in older["messages"]] == ["m1", "m2", "m3"] and older["has_more"]
+
+    forward = await service.get_chat_messages("chat", after=str(ids[0]), limit=2)
+    assert [m["message"] for m in forward["messages"]] == ["m1", "m2"] and forward["has_more"]
+    rest = await service.get_chat_messages("chat", after=forward["after"], limit=5)
+    assert [m["message"] for m in rest["messages"]] == ["m3", "m4", "m5"] and not rest["has_more"]
+
+
+@pytest.mark.asyncio
+async def test_add_message_distinguishes_missing_chat_and_non_member(chat_db):
+    """
+    Отправка проверяет участие условным обновлением и различает "не найден" и "нет доступа".
+    """
+    service = ChatService()
+    chat_id = (await service.create_chat([1, 2]))["chat_id"]
+
+    await service.add_message(chat_id, 1, "hello", user_id=1)
+
+    with pytest.raises(ChatAccessDeniedError):
+        await service.add_message(chat_id, 3, "intruder", user_id=3)
+    with pytest.raises(ChatNotFoundError):
+        await service.add_message("0" * 24, 1, "hello", user_id=1)
+    with pytest.raises(ChatNotFoundError):
+        await service.add_message("not-an-id", 1, "hello", user_id=1)
+
+    page = await service.get_messages(chat_id)
+    assert [m["message"] for m in page["messages"]] == ["hello"]
+
+
+@pytest.mark.asyncio
+async def test_refused_sends_store_no_messages(chat_db):
+    """
+    Отправка в удалённый чат или от постороннего отклоняется до записи сообщения в бакет.
+    """
+    service = ChatService()
+    chat_id = (await service.create_chat([1, 2]))["chat_id"]
+    await service.add_message(chat_id, 1, "hello", user_id=1)
+    assert (await chat_db["chats"].find_one({}))["last_message_at"]
+
+    with pytest.raises(ChatAccessDeniedError):
+        await service.add_message(chat_id, 3, "intruder", user_id=3)
+    # Кэш участников ещё помнит чат, но условное обновление видит, что документа нет
+    await chat_db["chats"].delete_many({})
+    with pytest.raises(ChatNotFoundError):
+        await service.add_message(chat_id, 1, "orphan", user_id=1)
+
+    messages = [m["message"] async for b in chat_db["message_buckets"].find({}) for m in b["messages"]]
+    assert messages == ["hello"]
+
+
+@pytest.mark.asyncio
+async def test_membership_checks_are_served_from_cache(chat_db):
+    """
+    Проверка участия после create_chat не обращается к MongoDB.
+    """
+    service = ChatService()
+    chat_id = (await service.create_chat([1, 2]))["chat_id"]
+    hits_before = chat_membership_cache.local.hits
+
+    # Документ чата удалён напрямую — ответ может прийти только из кэша.
+    await chat_db["chats"].delete_many({})
+    await service.check_membership(chat_id, 1)
+    with pytest.raises(ChatAccessDeniedError):
+        await service.check_membership(chat_id, 3)
+    assert chat_membership_cache.local.hits == hits_before + 2
+
+    await chat_membership_cache.invalidate(chat_id)
+    with pytest.raises(ChatNotFoundError):
+        await service.check_membership(chat_id, 1)
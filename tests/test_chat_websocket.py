@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+from app.main import app
+from app.core.database import mongodb
+from app.core.security import API_KEY, jwt_bearer
+from app.services.chat_service import ChatService
+from app.services.chat_service.chat_broadcaster import ChatBroadcaster, InMemoryPubSubBackend, chat_broadcaster
+from app.services.chat_service.membership_cache import chat_membership_cache
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, data: str):
+        self.sent.append(json.loads(data))
+
+
+class BrokenWebSocket:
+    async def send_text(self, data: str):
+        raise RuntimeError("connection closed")
+
+
+@pytest.fixture
+def chat_db(monkeypatch):
+    db = AsyncMongoMockClient()["test_chat"]
+    monkeypatch.setattr(mongodb, "db", db)
+    chat_membership_cache.local.clear()
+    return db
+
+
+@pytest.fixture
+def memory_broadcaster(monkeypatch):
+    monkeypatch.setattr(chat_broadcaster, "backend", InMemoryPubSubBackend())
+    monkeypatch.setattr(chat_broadcaster, "_started", False)
+    yield chat_broadcaster
+    chat_broadcaster._connections.clear()
+
+
+@pytest.mark.asyncio
+async def test_broadcaster_fans_out_to_chat_participants():
+    """
+    Событие получают только подключения нужного чата; сломанные подключения удаляются.
+    """
+    broadcaster = ChatBroadcaster(InMemoryPubSubBackend())
+    first, second, other = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    await broadcaster.connect("chat-1", first)
+    await broadcaster.connect("chat-1", second)
+    await broadcaster.connect("chat-1", BrokenWebSocket())
+    await broadcaster.connect("chat-2", other)
+
+    await broadcaster.publish("chat-1", {"type": "message", "message": "hello"})
+
+    assert first.sent == [{"type": "message", "message": "hello"}]
+    assert second.sent == first.sent
+    assert other.sent == []
+    assert broadcaster.connection_count("chat-1") == 2
+
+
+@pytest.mark.asyncio
+async def test_add_message_is_pushed_to_connected_participants(chat_db, memory_broadcaster):
+    """
+    ChatService.add_message рассылает сохранённое сообщение подключённым участникам.
+    """
+    service = ChatService()
+    chat_id = (await service.create_chat([1, 2]))["chat_id"]
+    websocket = FakeWebSocket()
+    await memory_broadcaster.connect(chat_id, websocket)
+
+    result = await service.add_message(chat_id, 1, "hi")
+
+    assert websocket.sent[0]["message_id"] == result["message_id"]
+    assert websocket.sent[0]["message"] == "hi"
+
+
+def test_websocket_endpoint_requires_participant(chat_db, memory_broadcaster):
+    """
+    WebSocket принимает только участников чата и рассылает отправленные через него сообщения.
+    """
+    client = TestClient(app)
+    headers = {"x-api-key": API_KEY}
+    chat = asyncio.run(chat_db["chats"].insert_one({"participants": [1, 2]}))
+    chat_id = str(chat.inserted_id)
+
+    member_token = jwt_bearer.create_access_token(subject={"id": 1})
+    with client.websocket_connect(f"/api/v1/ws/chats/{chat_id}?token={member_token}", headers=headers) as ws:
+        ws.send_text(json.dumps({"message": "hello"}))
+        event = ws.receive_json()
+    assert event["type"] == "message"
+    assert event["sender_id"] == 1
+    assert event["message"] == "hello"
+
+    stranger_token = jwt_bearer.create_access_token(subject={"id": 3})
+    with pytest.raises(Exception):
+        with client.websocket_connect(f"/api/v1/ws/chats/{chat_id}?token={stranger_token}", headers=headers) as ws:
+            ws.receive_json()
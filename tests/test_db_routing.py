@@ -0,0 +1,123 @@
+import sqlite3
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.db_routing import ReplicaSet, RoutingSession, set_read_your_writes_key, use_primary
+from app.crud.users.user_crud import UserCRUD
+from app.models.users import User
+
+
+@pytest_asyncio.fixture
+async def databases(tmp_path):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine, username in ((primary, "on_primary"), (replica, "on_replica")):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(User.__table__.insert().values(id=1, username=username))
+    replicas = ReplicaSet([replica], retry_after=60, sticky_seconds=60)
+    factory = sessionmaker(class_=AsyncSession, sync_session_class=RoutingSession, primary=primary, replicas=replicas)
+    yield factory, replicas
+    set_read_your_writes_key(None)
+    await primary.dispose()
+    await replica.dispose()
+
+
+async def username(session: AsyncSession) -> str:
+    return (await session.execute(select(User.username).where(User.id == 1))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_until_client_writes(databases):
+    """
+    Чтения идут на реплику; после записи сессия и клиент читают из основной базы.
+    """
+    factory, _ = databases
+    set_read_your_writes_key("user:1")
+
+    async with factory() as session:
+        assert await username(session) == "on_replica"
+        await UserCRUD(session).activate_user(1)
+        assert await username(session) == "on_primary"
+
+    async with factory() as session:
+        assert await username(session) == "on_primary"
+
+    set_read_your_writes_key("user:2")
+    async with factory() as session:
+        assert await username(session) == "on_replica"
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_replica_falls_back_to_primary(databases):
+    """
+    Недоступная реплика исключается из выбора, чтения идут в основную базу.
+    """
+    factory, replicas = databases
+    replicas.mark_unhealthy(replicas.engines[0].sync_engine)
+
+    async with factory() as session:
+        assert await username(session) == "on_primary"
+    assert replicas.stats()[0]["healthy"] is False
+
+
+@pytest.mark.asyncio
+async def test_read_is_retried_on_primary_after_replica_disconnect(databases):
+    """
+    Чтение, упавшее на реплике из-за обрыва соединения, повторяется в основной базе; сессия остаётся рабочей.
+    """
+    factory, replicas = databases
+
+    @event.listens_for(replicas.engines[0].sync_engine, "before_cursor_execute")
+    def drop_connection(*args):
+        # Диалект SQLite распознаёт это сообщение как обрыв соединения
+        raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+
+    async with factory() as session:
+        assert await username(session) == "on_primary"
+        assert replicas.stats()[0]["healthy"] is False
+        session.add(User(id=2, username="new"))
+        await session.commit()
+        assert (await session.get(User, 2)).username == "new"
+
+
+@pytest.mark.asyncio
+async def test_read_with_pending_changes_is_not_retried(databases):
+    """
+    Повтор откатывает транзакцию, поэтому при несохранённых объектах ошибка реплики не скрывается.
+    """
+    factory, replicas = databases
+
+    @event.listens_for(replicas.engines[0].sync_engine, "before_cursor_execute")
+    def drop_connection(*args):
+        raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+
+    async with factory() as session:
+        session.add(User(id=2, username="new"))
+        with pytest.raises(DBAPIError):
+            await session.execute(select(User.username).where(User.id == 1).execution_options(autoflush=False))
+        assert replicas.stats()[0]["healthy"] is False
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_and_pinned_sessions_read_primary(tmp_path, databases):
+    """
+    Ошибка подключения к реплике не доходит до клиента; сессия с use_primary не читает реплику.
+    """
+    factory, replicas = databases
+    async with factory() as session:
+        use_primary(session)
+        assert await username(session) == "on_primary"
+
+    unreachable = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    broken = ReplicaSet([unreachable], retry_after=60)
+    async with AsyncSession(sync_session_class=RoutingSession, primary=factory.kw["primary"], replicas=broken) as session:
+        assert await username(session) == "on_primary"
+    assert broken.stats()[0]["healthy"] is False
+    await unreachable.dispose()
@@ -0,0 +1,121 @@
+import pytest
+import pytest_asyncio
+from fakeredis import aioredis
+
+from app.celery.celery_app import QUEUE_BULK
+from app.core.config import conf
+from app.notifications import email_outbox as email_outbox_module
+from app.notifications import smtp_pool
+from app.notifications.email_outbox import FLUSH_EMAIL_OUTBOX_TASK, EmailOutbox
+from app.notifications.notification_sender_service import PooledEmailNotificationSender
+from app.notifications.smtp_pool import SmtpConnectionPool
+
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.is_connected = False
+        self.sent = []
+        FakeSMTP.instances.append(self)
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def login(self, username, password):
+        pass
+
+    async def send_message(self, message):
+        if message["To"].startswith("greylisted"):
+            raise smtp_pool.aiosmtplib.SMTPResponseException(451, "Try again later")
+        if message["To"].startswith("unknown"):
+            raise smtp_pool.aiosmtplib.SMTPResponseException(550, "No such user")
+        self.sent.append(message["To"])
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+@pytest_asyncio.fixture
+async def fake_redis(monkeypatch):
+    redis = aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(email_outbox_module, "get_redis", lambda: redis)
+    return redis
+
+
+def message(i: int) -> dict:
+    return {"recipients": [f"user{i}@example.com"], "subject": "Code", "body": str(i), "subtype": "plain"}
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_connection_and_reconnects_after_disconnect(monkeypatch):
+    """
+    Повторные отправки идут через уже открытое соединение; закрытое сервером заменяется новым.
+    """
+    FakeSMTP.instances = []
+    monkeypatch.setattr(smtp_pool.aiosmtplib, "SMTP", FakeSMTP)
+    sender = PooledEmailNotificationSender(SmtpConnectionPool(conf.model_copy(update={"SUPPRESS_SEND": 0}), size=2))
+
+    assert await sender.send_many([message(i) for i in range(3)]) == {"sent": 3, "failed": 0, "deferred": []}
+    await sender.send(["late@example.com"], "Code", "1")
+    assert len(FakeSMTP.instances) == 1 and sender.pool.reused == 1
+
+    FakeSMTP.instances[0].is_connected = False
+    await sender.send(["again@example.com"], "Code", "2")
+    assert len(FakeSMTP.instances) == 2 and FakeSMTP.instances[1].sent == ["again@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_outbox_schedules_one_flush_and_sends_in_batches(fake_redis, monkeypatch):
+    """
+    Всплеск писем планирует одну задачу выгрузки, которая отправляет их пачками.
+    """
+    scheduled = []
+    monkeypatch.setattr(
+        email_outbox_module.celery_app, "send_task", lambda name, **kwargs: scheduled.append((name, kwargs["queue"]))
+    )
+    outbox = EmailOutbox("test", queue=QUEUE_BULK, batch_size=2, delay=1)
+
+    await outbox.enqueue([message(0), message(1)])
+    await outbox.enqueue([message(2)])
+    assert scheduled == [(FLUSH_EMAIL_OUTBOX_TASK, QUEUE_BULK)]
+
+    batches = []
+
+    class RecordingSender:
+        async def send_many(self, messages):
+            batches.append([m["body"] for m in messages])
+            return {"sent": len(messages), "failed": 0}
+
+    assert await outbox.flush(RecordingSender()) == {"sent": 3, "failed": 0, "deferred": 0}
+    assert batches == [["0", "1"], ["2"]]
+    assert await fake_redis.llen("mail:outbox:test") == 0
+
+
+@pytest.mark.asyncio
+async def test_transient_smtp_errors_are_retried_with_exponential_backoff(monkeypatch):
+    """
+    Письма с ответом 4xx планируются повторно с растущей задержкой, ответ 5xx не повторяется.
+    """
+    monkeypatch.setattr(smtp_pool.aiosmtplib, "SMTP", FakeSMTP)
+    scheduled = []
+    monkeypatch.setattr(email_outbox_module.celery_app, "send_task", lambda name, **kwargs: scheduled.append(kwargs))
+    sender = PooledEmailNotificationSender(SmtpConnectionPool(conf.model_copy(update={"SUPPRESS_SEND": 0})))
+    messages = [
+        {"recipients": ["greylisted@example.com"], "subject": "Code", "body": "1"},
+        {"recipients": ["unknown@example.com"], "subject": "Code", "body": "2"},
+        {"recipients": ["ok@example.com"], "subject": "Code", "body": "3"},
+    ]
+
+    result = await sender.send_many(messages)
+    assert (result["sent"], result["failed"]) == (1, 1)
+    assert result["deferred"] == [messages[0]]
+
+    outbox = EmailOutbox("test", queue=QUEUE_BULK)
+    outbox.defer(result["deferred"])
+    outbox.defer([{**messages[0], "attempt": 3}])
+    assert [task["args"][0][0]["attempt"] for task in scheduled] == [1, 4]
+    assert scheduled[1]["countdown"] == 8 * scheduled[0]["countdown"]
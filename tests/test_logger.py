@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+
+from app.logs.logger import Logger, MongoDBLogHandler
+
+
+class FakeCollection:
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, documents, ordered=True):
+        assert ordered is False
+        self.batches.append(documents)
+
+
+def make_handler(**kwargs) -> MongoDBLogHandler:
+    handler = MongoDBLogHandler("mongodb://localhost:1", "logs", "logs", **kwargs)
+    handler._collection = FakeCollection()
+    return handler
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("app_logger", logging.INFO, __file__, 1, message, None, None)
+
+
+@pytest.mark.asyncio
+async def test_logs_are_written_in_batches():
+    """
+    Записи отправляются пачками не больше batch_size; при закрытии очередь дописывается.
+    """
+    handler = make_handler(batch_size=100, flush_interval=0.05)
+
+    for i in range(250):
+        handler.emit(make_record(f"line {i}"))
+    await handler.aclose()
+
+    assert sorted(len(batch) for batch in handler._collection.batches) == [50, 100, 100]
+    assert handler.metrics()["flushed"] == 250
+    assert handler.metrics()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_overflow_policy_drops_records():
+    """
+    При переполнении очереди записи отбрасываются по выбранной политике и учитываются в метриках.
+    """
+    handler = make_handler(max_queue_size=2, overflow_policy="drop_oldest")
+    for i in range(5):
+        handler.emit(make_record(f"line {i}"))
+    await handler.aclose()
+
+    assert handler.dropped == 3
+    written = [entry["message"] for batch in handler._collection.batches for entry in batch]
+    assert written == ["line 3", "line 4"]
+
+    with pytest.raises(ValueError):
+        MongoDBLogHandler("mongodb://localhost:1", "logs", "logs", overflow_policy="block")
+
+
+def test_records_before_event_loop_are_buffered():
+    """
+    Записи до запуска event loop буферизуются, а клиент MongoDB не создаётся.
+    """
+    handler = MongoDBLogHandler("mongodb://localhost:1", "logs", "logs")
+    handler.emit(make_record("at import time"))
+
+    assert handler._client is None
+    assert handler.metrics()["queued"] == 1
+
+
+def test_setup_logger_attaches_single_handler():
+    """
+    Повторные вызовы setup_logger возвращают тот же логгер с одним обработчиком MongoDB.
+    """
+    first = Logger.setup_logger()
+    second = Logger.setup_logger()
+
+    assert first is second
+    assert sum(isinstance(h, MongoDBLogHandler) for h in first.handlers) == 1
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+from pymongo.read_preferences import SecondaryPreferred
+
+from app.core import database
+from app.core.database import MongoDB
+from app.core.mongo_monitoring import MongoPoolMetrics
+
+
+def test_pool_metrics_track_connections_per_server():
+    """
+    События пула учитываются по узлам: открытые и выданные соединения, ошибки выдачи.
+    """
+    metrics = MongoPoolMetrics()
+    primary = SimpleNamespace(address=("mongo1", 27017))
+    for handler in (metrics.connection_created, metrics.connection_created, metrics.connection_checked_out):
+        handler(primary)
+    metrics.connection_check_out_failed(SimpleNamespace(address=("mongo2", 27017)))
+
+    assert metrics.stats()["mongo1:27017"] == {
+        "open": 2, "checked_out": 1, "created": 2, "closed": 0, "checkout_failed": 0, "cleared": 0,
+    }
+    assert metrics.stats()["mongo2:27017"]["checkout_failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_connect_fails_fast_and_readiness_reports_error(monkeypatch):
+    """
+    Недоступный кластер обнаруживается пингом при старте за serverSelectionTimeoutMS.
+    """
+    monkeypatch.setattr(database, "CHAT_MONGO_SERVER_SELECTION_TIMEOUT_MS", 100)
+    monkeypatch.setattr(database, "CHAT_MONGO_WRITE_CONCERN", "2")
+    client = MongoDB()
+    client.uri, client.database_name = "mongodb://127.0.0.1:1", "chat"
+
+    with pytest.raises(ServerSelectionTimeoutError):
+        await client.connect()
+
+    assert client.db.write_concern.document["w"] == 2
+    assert isinstance(client.history_db.read_preference, SecondaryPreferred)
+    assert (await client.readiness())["ready"] is False
+    await client.disconnect()
@@ -0,0 +1,46 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.core.mongo_indexes import CHAT_INDEXES, IndexSpec, apply_indexes, check_indexes, log_indexes
+from app.logs.config import LogConfig
+
+
+@pytest.mark.asyncio
+async def test_apply_is_idempotent_and_check_reports_missing():
+    """
+    Повторное применение реестра ничего не создаёт; check находит недостающие индексы без изменений.
+    """
+    db = AsyncMongoMockClient()["chat"]
+    assert (await check_indexes(db, CHAT_INDEXES))["missing"] == [
+        "chats.participants_1",
+        "message_buckets.open_chat_id_1",
+        "message_buckets.chat_id_1_last_id_-1",
+        "message_buckets.chat_id_1_first_id_1",
+        "users.username_1",
+    ]
+
+    first = await apply_indexes(db, CHAT_INDEXES)
+    second = await apply_indexes(db, CHAT_INDEXES)
+
+    assert len(first["created"]) == len(CHAT_INDEXES)
+    assert second["created"] == [] and len(second["ok"]) == len(CHAT_INDEXES)
+    assert "participants_1" in await db["chats"].index_information()
+
+
+@pytest.mark.asyncio
+async def test_log_ttl_index_and_conflicting_options():
+    """
+    Для логов создаётся TTL-индекс по timestamp, если срок хранения задан явно; индекс с другими параметрами попадает в conflicts.
+    """
+    config = LogConfig(MONGO_URI="mongodb://localhost", DATABASE_NAME="logs", COLLECTION_NAME="logs", LOG_TTL_DAYS=7)
+    db = AsyncMongoMockClient()["logs"]
+
+    await apply_indexes(db, log_indexes(config))
+    assert (await db["logs"].index_information())["timestamp_1"]["expireAfterSeconds"] == 7 * 24 * 3600
+    assert log_indexes(config.model_copy(update={"LOG_TTL_DAYS": 0})) == ()
+    # Без явного LOG_TTL_DAYS накопленные логи не удаляются
+    assert log_indexes(LogConfig(MONGO_URI="mongodb://localhost", DATABASE_NAME="logs", COLLECTION_NAME="logs")) == ()
+
+    await db["users"].create_index("username")
+    result = await apply_indexes(db, [IndexSpec("users", (("username", 1),), {"unique": True})])
+    assert result["conflicts"][0]["changes"] == {"unique": {"expected": True, "actual": None}}
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from app.services.password_service import PasswordHashService
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_run_in_pool():
+    """
+    Хэширование и проверка выполняются в пуле и не блокируют event loop.
+    """
+    service = PasswordHashService(rounds=4, max_workers=2, executor="thread")
+    try:
+        hashed = await service.hash("secret")
+        results = await asyncio.gather(
+            service.verify("secret", hashed),
+            service.verify("wrong", hashed),
+            service.verify("secret", hashed),
+        )
+    finally:
+        service.shutdown()
+
+    assert hashed.startswith("$2b$04$")
+    assert results == [True, False, True]
+    metrics = service.metrics()
+    assert metrics["completed"] == 4
+    assert metrics["in_flight"] == 0
+    assert metrics["queue_depth"] == 0
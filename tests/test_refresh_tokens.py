@@ -0,0 +1,143 @@
+import pytest
+import pytest_asyncio
+from fakeredis import aioredis
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.auth_context import UserStatusCache
+from app.core.database import Base
+from app.crud.users.user_crud import UserCRUD
+from app.models.users import RefreshToken, User
+from app.schemas.users import TokenRefresh
+from app.services import token_store
+from app.core.security import jwt_bearer
+from app.services.token_service import TokenService
+from app.services.token_store import RedisTokenStore, SqlTokenStore
+
+
+@pytest_asyncio.fixture
+async def redis_token_service(monkeypatch):
+    redis = aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(token_store, "get_redis", lambda: redis)
+    return TokenService(status_cache=UserStatusCache(maxsize=10, ttl=60), token_store=RedisTokenStore())
+
+
+@pytest_asyncio.fixture
+async def sql_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(User(id=1, username="user", email="user@example.com", phone_number="+10000000000"))
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+async def assert_revoked(service: TokenService, refresh_token: str):
+    with pytest.raises(HTTPException) as exc:
+        await service.refresh_token(TokenRefresh(refresh_token=refresh_token))
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotation_and_reuse_detection_in_redis(redis_token_service):
+    """
+    Каждый refresh выдаёт новый refresh-токен; повторное использование старого отзывает всё семейство.
+    """
+    issued = await redis_token_service.issue_tokens(1, is_active=True)
+    rotated = await redis_token_service.refresh_token(TokenRefresh(refresh_token=issued["refresh_token"]))
+    assert rotated["refresh_token"] != issued["refresh_token"]
+
+    await assert_revoked(redis_token_service, issued["refresh_token"])
+    await assert_revoked(redis_token_service, rotated["refresh_token"])
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotation_and_reuse_detection_in_sql(sql_session):
+    """
+    В SQL-хранилище ротация помечает токен использованным, а повторное использование отзывает семейство.
+    """
+    service = TokenService(status_cache=UserStatusCache(maxsize=10, ttl=60), token_store=SqlTokenStore(sql_session))
+    issued = await service.issue_tokens(1, is_active=True)
+    rotated = await service.refresh_token(TokenRefresh(refresh_token=issued["refresh_token"]))
+
+    await assert_revoked(service, issued["refresh_token"])
+    await assert_revoked(service, rotated["refresh_token"])
+    tokens = (await sql_session.execute(select(RefreshToken))).scalars().all()
+    assert len(tokens) == 2
+    assert all(token.revoked_at is not None for token in tokens)
+
+
+@pytest.mark.asyncio
+async def test_revoke_sessions_revokes_refresh_and_access_tokens(redis_token_service):
+    """
+    Массовый отзыв закрывает все семейства refresh-токенов и отзывает уже выданные access-токены.
+    """
+    first = await redis_token_service.issue_tokens(1, is_active=True)
+    second = await redis_token_service.issue_tokens(2, is_active=True)
+
+    result = await redis_token_service.revoke_sessions([1, 2])
+
+    assert result == {"users": 2, "revoked_refresh_tokens": 2}
+    await assert_revoked(redis_token_service, first["refresh_token"])
+    await assert_revoked(redis_token_service, second["refresh_token"])
+    assert "revoked_before" in await redis_token_service.status_cache.get(1)
+
+
+@pytest.mark.asyncio
+async def test_refresh_rereads_roles_and_rejects_legacy_tokens(sql_session):
+    """
+    Роли при ротации берутся из БД; refresh-токен без семейства отклоняется.
+    """
+    service = TokenService(
+        status_cache=UserStatusCache(maxsize=10, ttl=60),
+        token_store=SqlTokenStore(sql_session),
+        user_crud=UserCRUD(sql_session),
+    )
+    issued = await service.issue_tokens(1, is_active=True, roles=["user", "admin"])
+
+    rotated = await service.refresh_token(TokenRefresh(refresh_token=issued["refresh_token"]))
+    assert (await service.decode_token(rotated["access_token"])) == 1
+    assert jwt_bearer.decode_token(rotated["access_token"])["subject"]["roles"] == ["user"]
+
+    legacy = await service._generate_token(1, is_active=True)
+    await assert_revoked(service, legacy)
+
+
+@pytest.mark.asyncio
+async def test_rotation_survives_redis_outage(sql_session, monkeypatch):
+    """
+    Пока Redis недоступен, refresh отвечает 503 и не отзывает семейство; семейство, открытое
+    во время сбоя в БД, ротируется после восстановления Redis.
+    """
+    redis = aioredis.FakeRedis(decode_responses=True)
+    redis_up = True
+
+    def get_redis():
+        if not redis_up:
+            raise ConnectionError("redis is down")
+        return redis
+
+    monkeypatch.setattr(token_store, "get_redis", get_redis)
+    service = TokenService(
+        status_cache=UserStatusCache(maxsize=10, ttl=60),
+        token_store=RedisTokenStore(fallback=SqlTokenStore(sql_session)),
+    )
+    issued = await service.issue_tokens(1, is_active=True)
+
+    redis_up = False
+    with pytest.raises(HTTPException) as exc:
+        await service.refresh_token(TokenRefresh(refresh_token=issued["refresh_token"]))
+    assert exc.value.status_code == 503
+    during_outage = await service.issue_tokens(1, is_active=True)
+
+    redis_up = True
+    rotated = await service.refresh_token(TokenRefresh(refresh_token=issued["refresh_token"]))
+    rotated_in_sql = await service.refresh_token(TokenRefresh(refresh_token=during_outage["refresh_token"]))
+
+    assert (await service.revoke_sessions([1]))["revoked_refresh_tokens"] >= 2
+    await assert_revoked(service, rotated["refresh_token"])
+    await assert_revoked(service, rotated_in_sql["refresh_token"])
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from app.core.token_cache import VerifiedTokenCache
+from app.services.token_service import TokenService
+
+
+def test_payload_is_decoded_once_until_exp():
+    """
+    Повторная проверка того же токена берёт payload из кэша; токен без exp не кэшируется.
+    """
+    cache = VerifiedTokenCache(maxsize=10)
+    decoded = []
+
+    def decode(token):
+        decoded.append(token)
+        return {"subject": {"id": 1}, "exp": time.time() + 60} if token == "with-exp" else {"subject": {"id": 1}}
+
+    for _ in range(3):
+        cache.get_or_decode("with-exp", decode)
+        cache.get_or_decode("without-exp", decode)
+
+    assert decoded.count("with-exp") == 1
+    assert decoded.count("without-exp") == 3
+    assert cache.stats()["hits"] == 2
+
+
+def test_expired_entry_is_verified_again():
+    """
+    После exp запись удаляется из кэша и токен снова проходит полную проверку.
+    """
+    cache = VerifiedTokenCache(maxsize=10)
+    cache.get_or_decode("token", lambda token: {"exp": time.time() - 1})
+
+    assert len(cache.local) == 0
+
+
+@pytest.mark.asyncio
+async def test_token_service_shares_verification_cache():
+    """
+    TokenService.decode_token использует тот же кэш, что и jwt_bearer.
+    """
+    service = TokenService()
+    token = await service._generate_token(42, is_active=True)
+
+    assert await service.decode_token(token) == 42
+    assert await service.decode_token(token) == 42
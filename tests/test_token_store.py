@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+import pytest
+from fakeredis import aioredis
+
+from app.services import token_store
+from app.services.token_store import AbstractTokenStore, RedisTokenStore
+
+
+class RecordingStore(AbstractTokenStore):
+    def __init__(self):
+        self.saved = {}
+
+    async def save_tokens(self, user_id, access_token, refresh_token, access_ttl, refresh_ttl, family_id=None, jti=None):
+        self.saved[user_id] = (access_token, refresh_token)
+
+    async def get_tokens(self, user_id):
+        return None
+
+    async def revoke(self, user_id):
+        self.saved.pop(user_id, None)
+
+    async def rotate_refresh(self, user_id, family_id, old_jti, new_jti, ttl):
+        return False
+
+    async def revoke_family(self, user_id, family_id):
+        pass
+
+    async def revoke_users(self, user_ids):
+        return 0
+
+
+@pytest.mark.asyncio
+async def test_redis_store_rotates_and_revokes_with_ttl(monkeypatch):
+    """
+    Токены хранятся в Redis с TTL по сроку жизни, повторный вход заменяет пару, отзыв удаляет её.
+    """
+    redis = aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(token_store, "get_redis", lambda: redis)
+    store = RedisTokenStore()
+
+    await store.save_tokens(1, "access-1", "refresh-1", timedelta(minutes=15), timedelta(days=7))
+    await store.save_tokens(1, "access-2", "refresh-2", timedelta(minutes=15), timedelta(days=7))
+
+    assert await store.get_tokens(1) == {"access_token": "access-2", "refresh_token": "refresh-2"}
+    assert 0 < await redis.ttl("tokens:1:access") <= 15 * 60
+    assert await redis.ttl("tokens:1:refresh") > 6 * 24 * 3600
+
+    await store.revoke(1)
+    assert await store.get_tokens(1) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_store_falls_back_when_redis_is_unavailable(monkeypatch):
+    """
+    При недоступности Redis токены сохраняются в резервное хранилище.
+    """
+    def unavailable():
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(token_store, "get_redis", unavailable)
+    fallback = RecordingStore()
+
+    await RedisTokenStore(fallback=fallback).save_tokens(
+        1, "access", "refresh", timedelta(minutes=15), timedelta(days=7)
+    )
+
+    assert fallback.saved == {1: ("access", "refresh")}
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.users import User
+from app.services import user_bulk_service
+from app.services.password_service import PasswordHashService
+from app.services.user_bulk_service import UserBulkService
+
+
+@pytest_asyncio.fixture
+async def sql_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(User(username="taken", email="taken@example.com", phone_number="+10000000000"))
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+async def as_chunks(data: str, size: int = 7):
+    raw = data.encode()
+    for start in range(0, len(raw), size):
+        yield raw[start:start + size]
+
+
+@pytest.mark.asyncio
+async def test_csv_import_skips_conflicts_and_reports_invalid_rows(sql_session):
+    """
+    Импорт идёт пачками: занятые username/email пропускаются, невалидные строки попадают в отчёт.
+    """
+    data = (
+        "username,email,password,phone_number,first_name\n"
+        "anna,anna@example.com,secret,+10000000001,Анна\n"
+        "taken,other@example.com,secret,+10000000002,\n"
+        "bad,not-an-email,secret,+10000000003,\n"
+        "oleg,oleg@example.com,secret,+10000000004,Олег\n"
+    )
+    service = UserBulkService(sql_session, hash_service=PasswordHashService(rounds=4), import_batch_size=2)
+
+    report = await service.import_users(as_chunks(data), "csv", send_verification=False)
+
+    assert (report["total"], report["created"], report["skipped"], report["invalid"]) == (4, 2, 1, 1)
+    assert report["errors"][0]["line"] == 4
+    user = (await sql_session.execute(select(User).where(User.username == "anna"))).scalars().one()
+    assert user.first_name == "Анна" and user.hashed_password.startswith("$2")
+
+
+@pytest.mark.asyncio
+async def test_ndjson_import_queues_emails_and_export_streams_rows(sql_session, monkeypatch):
+    """
+    Письма созданным пользователям ставятся в очередь одним вызовом; экспорт отдаёт всех пользователей.
+    """
+    queued = []
+
+    class FakeOutbox:
+        async def enqueue(self, messages):
+            queued.append(messages)
+
+    monkeypatch.setattr(user_bulk_service, "bulk_email_outbox", FakeOutbox())
+    lines = [
+        {"username": f"user{i}", "email": f"user{i}@example.com", "password": "secret", "phone_number": f"+1000000010{i}"}
+        for i in range(3)
+    ]
+    service = UserBulkService(sql_session, hash_service=PasswordHashService(rounds=4), export_batch_size=2)
+
+    report = await service.import_users(as_chunks("\n".join(map(json.dumps, lines))), "ndjson")
+    exported = b"".join([chunk async for chunk in service.export_users("ndjson")]).decode().splitlines()
+
+    assert report["emails_queued"] == 3
+    assert len(queued) == 1 and queued[0][0]["recipients"] == ["user0@example.com"]
+    assert [json.loads(line)["username"] for line in exported] == ["taken", "user0", "user1", "user2"]
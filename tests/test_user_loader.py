@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.security import UserStatusChecker
+from app.crud.users.user_loader import UserLoader
+from app.models.users import User
+from app.services.profile_service import ProfileService
+from app.core.auth_context import UserStatusCache
+
+
+@pytest_asyncio.fixture
+async def sql_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add_all([
+            User(username=f"user{i}", email=f"user{i}@example.com", is_active=True) for i in range(3)
+        ])
+        await session.commit()
+        session.statements = []
+        event.listen(
+            engine.sync_engine, "before_cursor_execute", lambda *args: session.statements.append(args[2])
+        )
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_batched_and_deduplicated(sql_session):
+    """
+    Загрузки в одной итерации event loop объединяются в один запрос на поле, повторы берутся из карты.
+    """
+    loader = UserLoader.for_session(sql_session)
+
+    by_id = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(42))
+    assert [row and row.username for row in by_id] == ["user0", "user1", "user0", None]
+    assert len(sql_session.statements) == 1
+
+    assert (await loader.load_by_email("user1@example.com")).id == 2
+    assert (await loader.load_by_username("user2")).id == 3
+    assert len(sql_session.statements) == 2 and UserLoader.for_session(sql_session) is loader
+
+
+@pytest.mark.asyncio
+async def test_profile_view_costs_one_query(sql_session, monkeypatch):
+    """
+    Проверка активности и сборка профиля в одном запросе делят одну загрузку пользователя.
+    """
+    checker = UserStatusChecker(status_cache=UserStatusCache(maxsize=10, ttl=60, use_redis=False))
+
+    await checker.check_user_active(1, sql_session)
+    profile = await ProfileService(sql_session).get_profile(1)
+
+    assert profile.username == "user0" and profile.is_active
+    assert len(sql_session.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatch_errors_resolve_all_waiters(sql_session, monkeypatch):
+    """
+    Ошибка пачки (в том числе clear() во время загрузки) не оставляет ожидающих без ответа.
+    """
+    loader = UserLoader.for_session(sql_session)
+    remember = loader._remember
+
+    def remember_and_clear(row):
+        remember(row)
+        loader.clear()
+
+    monkeypatch.setattr(loader, "_remember", remember_and_clear)
+    by_id, by_username = await asyncio.wait_for(asyncio.gather(loader.load(1), loader.load_by_username("user0")), 1)
+    assert by_id.username == by_username.username == "user0"
+
+    def broken_remember(row):
+        raise RuntimeError("broken row")
+
+    monkeypatch.setattr(loader, "_remember", broken_remember)
+    results = await asyncio.wait_for(
+        asyncio.gather(loader.load(2), loader.load_by_email("user2@example.com"), return_exceptions=True), 1
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    monkeypatch.setattr(loader, "_remember", remember)
+    assert (await loader.load(2)).username == "user1"
@@ -0,0 +1,53 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.crud.users import user_queries
+from app.crud.users.user_crud import UserCRUD
+from app.models.users import User
+
+
+@pytest_asyncio.fixture
+async def sql_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add_all([
+            User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="hash", device_model="phone")
+            for i in range(3)
+        ])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+def test_statements_share_cache_key_across_arguments():
+    """
+    Запрос с другими значениями аргументов переиспользует скомпилированное выражение.
+    """
+    first = user_queries.auth_by_username("anna")._generate_cache_key()
+    second = user_queries.auth_by_username("oleg")._generate_cache_key()
+
+    assert first.key == second.key
+    assert [p.value for p in second.bindparams] == ["oleg"]
+
+
+@pytest.mark.asyncio
+async def test_projected_and_bulk_lookups(sql_session):
+    """
+    Проекции возвращают только нужные колонки, пакетная выборка — профили по id.
+    """
+    crud = UserCRUD(sql_session)
+
+    auth = await crud.get_auth_by_username("user1")
+    assert set(auth._fields) == {"id", "username", "hashed_password", "is_active", "is_admin"}
+    assert await crud.username_exists("user2") and not await crud.username_exists("nobody")
+
+    users = await crud.get_users_by_ids([auth.id, 3, auth.id, 42])
+    assert sorted(users) == [auth.id, 3] and "device_model" not in users[3]._fields
+
+    await crud.activate_user(auth.id)
+    assert await crud.get_is_active(auth.id) is True and await crud.get_is_active(42) is None
@@ -0,0 +1,68 @@
+import pytest
+import pytest_asyncio
+from fakeredis import aioredis
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.users import User
+from app.services import user_service, verification_throttle
+from app.services.user_service import UserService
+from app.services.verification_throttle import VerificationCodeThrottle
+
+
+@pytest_asyncio.fixture
+async def sql_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(User(username="user", email="user@example.com", phone_number="+10000000000"))
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_resend_within_window_does_not_write_or_enqueue(sql_session, monkeypatch):
+    """
+    Повторный запрос кода в окне отправки возвращает состояние без нового кода и письма.
+    """
+    redis = aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(verification_throttle, "get_redis", lambda: redis)
+    queued = []
+
+    class FakeOutbox:
+        async def enqueue(self, messages):
+            queued.extend(messages)
+
+    monkeypatch.setattr(user_service, "auth_email_outbox", FakeOutbox())
+    service = UserService(sql_session)
+    service.verification_throttle = VerificationCodeThrottle(window=60)
+
+    first = await service.send_confirm_email_code("user@example.com")
+    user = await service.user_crud.get_user_by_email("user@example.com")
+    code = user.activation_code
+    second = await service.send_confirm_email_code("USER@example.com")
+
+    assert first["message"] == "Verification code sent"
+    assert second["message"] == "Verification code already sent" and 0 < second["retry_after"] <= 60
+    assert len(queued) == 1 and user.activation_code == code
+
+
+@pytest.mark.asyncio
+async def test_window_falls_back_to_process_memory_without_redis(monkeypatch):
+    """
+    Без Redis окно ведётся в памяти процесса; release снова разрешает отправку.
+    """
+    def unavailable():
+        raise ValueError("REDIS_URL is not configured.")
+
+    monkeypatch.setattr(verification_throttle, "get_redis", unavailable)
+    throttle = VerificationCodeThrottle(window=60)
+
+    assert await throttle.acquire("user@example.com")
+    assert not await throttle.acquire("user@example.com")
+    assert await throttle.pending("user@example.com") > 0
+    await throttle.release("user@example.com")
+    assert await throttle.pending("user@example.com") == 0